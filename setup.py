@@ -6,6 +6,9 @@ builtin_plugins = [
     'ExitCodeReporter = contexts.plugins.reporting:ExitCodeReporter',
     'ArgvForwarder = contexts.plugins.argv_forwarder:ArgvForwarder',
     'Shuffler = contexts.plugins.shuffling:Shuffler',
+    'DurationScheduler = contexts.plugins.scheduling:DurationScheduler',
+    'CollectionCache = contexts.plugins.caching:CollectionCache',
+    'ThreadedWalker = contexts.plugins.walking:ThreadedWalker',
     'Importer = contexts.plugins.importing:Importer',
     'AssertionRewritingImporter = contexts.plugins.importing.assertion_rewriting:AssertionRewritingImporter',
     'DecoratorBasedIdentifier = contexts.plugins.identification.decorators:DecoratorBasedIdentifier',
@@ -22,6 +25,14 @@ builtin_plugins = [
     'FinalCountsReporter = contexts.plugins.reporting.cli:FinalCountsReporter',
     'TimedReporter = contexts.plugins.reporting.cli:TimedReporter',
     'XmlReporter = contexts.plugins.reporting.xml:XmlReporter',
+    'JsonLinesReporter = contexts.plugins.reporting.jsonl:JsonLinesReporter',
+    'ProcessPoolRunner = contexts.plugins.parallel:ProcessPoolRunner',
+    'AsyncioRunner = contexts.plugins.parallel:AsyncioRunner',
+    'ThreadPoolRunner = contexts.plugins.parallel:ThreadPoolRunner',
+    'ShardSelector = contexts.plugins.sharding:ShardSelector',
+    'TestLister = contexts.plugins.listing:TestLister',
+    'LazyImporter = contexts.plugins.importing.lazy:LazyImporter',
+    'Precompiler = contexts.plugins.importing.precompiling:Precompiler',
 ]
 
 
@@ -35,6 +46,7 @@ setup(
     long_description="""See the Github project page (https://github.com/benjamin-hodgson/Contexts) for more information.""",
     package_dir={'': 'src'},
     packages=find_packages('src'),
+    python_requires=">=3.8",
     install_requires=["setuptools >= 1.0"],
     extras_require={'colour': ["colorama >= 0.2.7"]},
     entry_points={
@@ -44,9 +56,13 @@ setup(
     classifiers=[
         "Development Status :: 4 - Beta",
         "Programming Language :: Python",
-        "Programming Language :: Python :: 3.3",
-        "Programming Language :: Python :: 3.4",
-        "Programming Language :: Python :: 3.5",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
         "License :: OSI Approved :: MIT License",
         "Intended Audience :: Developers",
         "Intended Audience :: Information Technology",
@@ -1,9 +1,7 @@
+import importlib
 import sys
-from . import core
-from .plugin_discovery import load_plugins
 from .tools import catch, set_trace, time
 from .plugins.identification.decorators import context, spec, scenario, examples, setup, action, assertion, teardown
-from .plugins.test_target_suppliers import ObjectSupplier
 
 
 __all__ = [
@@ -12,6 +10,24 @@ __all__ = [
     'context', 'spec', 'scenario', 'examples', 'setup', 'action', 'assertion', 'teardown'
 ]
 
+# Test files only need the decorators and the tools, so the machinery for running tests
+# is imported the first time it's asked for rather than whenever a test file does `import contexts`.
+LAZY_ATTRIBUTES = {
+    'load_plugins': '.plugin_discovery',
+    'ObjectSupplier': '.plugins.test_target_suppliers'
+}
+
+
+def __getattr__(name):
+    if name in LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(LAZY_ATTRIBUTES[name], __name__), name)
+    try:
+        return importlib.import_module('.' + name, __name__)
+    except ModuleNotFoundError as e:
+        if e.name != __name__ + '.' + name:
+            raise
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
 
 def main():
     """
@@ -31,6 +47,8 @@ def run():
         The default behaviour (which may be overridden by plugins) is to return a 0
         exit code if the test run succeeded, and 1 if it failed.
     """
+    from .plugin_discovery import load_plugins
+    from .plugins.test_target_suppliers import ObjectSupplier
     plugin_list = load_plugins()
 
     module = sys.modules['__main__']
@@ -50,6 +68,7 @@ def run_with_plugins(plugin_list):
         The default behaviour (which may be overridden by plugins) is to return a 0
         exit code if the test run succeeded, and 1 if it failed.
     """
+    from . import core
     composite = core.PluginComposite(plugin_list)
 
     to_run = composite.get_object_to_run()
@@ -21,8 +21,8 @@ def cmd():
 
 
 def print_version():
-    import pkg_resources
-    version = pkg_resources.require('contexts')[0].version
+    import importlib.metadata
+    version = importlib.metadata.version('contexts')
     py_version = '.'.join(str(i) for i in sys.version_info[0:3])
 
     print("Contexts version " + version)
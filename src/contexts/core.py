@@ -1,10 +1,14 @@
+import asyncio
+import concurrent.futures
 import inspect
 import os
+import threading
+import time
 import types
 from contextlib import contextmanager
 from . import discovery
 from . import errors
-from .plugin_interface import PluginInterface, TEST_FOLDER, CONTEXT, EXAMPLES, SETUP, ACTION, ASSERTION, TEARDOWN, NO_EXAMPLE
+from .plugin_interface import PluginInterface, CONTEXT, EXAMPLES, SETUP, ACTION, ASSERTION, TEARDOWN, NO_EXAMPLE
 
 
 class TestRun(object):
@@ -12,25 +16,40 @@ class TestRun(object):
         self.source = source
         self.plugin_composite = plugin_composite
         self.exception_handler = ExceptionHandler(self.plugin_composite)
+        self.directories = discovery.DirectoryCache(self.plugin_composite)
 
     def run(self):
         with self.exception_handler.run_test_run(self):
-            if isinstance(self.source, type):
-                test_class = TestClass(self.source, self.plugin_composite)
-                test_class.run()
-            else:
-                modules = self.import_modules()
-                self.plugin_composite.process_module_list(modules)
-                for module in modules:
-                    suite = Suite(module, self.plugin_composite)
-                    suite.run()
+            try:
+                self.run_tests()
+            finally:
+                close_event_loop()
+
+    def run_tests(self):
+        if isinstance(self.source, type):
+            test_class = TestClass(self.source, self.plugin_composite)
+            test_class.run()
+        else:
+            self.process_identifiers()
+            modules = self.import_modules()
+            self.plugin_composite.process_module_list(modules)
+            suites = [Suite(module, self.plugin_composite) for module in modules]
+            self.plugin_composite.run_suites(suites)
+            for suite in suites:
+                suite.run()
+
+    def process_identifiers(self):
+        identifiers = {name: getattr(self.plugin_composite, name) for name in IDENTIFICATION_HOOKS + COLLECTION_FUNCTIONS}
+        self.plugin_composite.process_identifiers(identifiers)
+        for name, identify in identifiers.items():
+            setattr(self.plugin_composite, name, identify)
 
     def import_modules(self):
         if isinstance(self.source, types.ModuleType):
             return [self.source]
         if os.path.isfile(self.source):
             folder, filename = os.path.split(self.source)
-            importer = discovery.create_importer(folder, self.plugin_composite, self.exception_handler)
+            importer = discovery.create_importer(folder, self.plugin_composite, self.exception_handler, self.directories)
             module = importer.import_file(filename)
             if module is None:
                 return []
@@ -41,23 +60,14 @@ class TestRun(object):
     def import_modules_from_folder(self, directory):
         module_list = discovery.ModuleList(self.plugin_composite, self.exception_handler)
 
-        for folder, dirnames, _ in os.walk(directory):
-            self.remove_non_test_folders(folder, dirnames)
-            importer = discovery.create_importer(folder, self.plugin_composite, self.exception_handler)
+        self.plugin_composite.scan_folder(directory, self.directories)
+        for folder in discovery.walk(directory, self.directories):
+            importer = discovery.create_importer(folder, self.plugin_composite, self.exception_handler, self.directories)
             for folder, filename in importer.module_specs():
                 module_list.add(folder, filename)
 
         return [m for m in module_list.modules if m is not None]
 
-    def remove_non_test_folders(self, parent, dirnames):
-        replacement = []
-        for dirname in dirnames:
-            full_path = os.path.realpath(os.path.join(parent, dirname))
-            reply = self.plugin_composite.identify_folder(full_path)
-            if reply is TEST_FOLDER:
-                replacement.append(dirname)
-        dirnames[:] = replacement
-
 
 class Suite(object):
     def __init__(self, module, plugin_composite):
@@ -76,12 +86,7 @@ class Suite(object):
                 test_class.run()
 
     def get_classes(self):
-        classes = []
-        for _, cls in inspect.getmembers(self.module, inspect.isclass):
-            response = self.plugin_composite.identify_class(cls)
-            if response is CONTEXT:
-                classes.append(cls)
-        return classes
+        return list(self.plugin_composite.collect_classes(self.module))
 
 
 class TestClass(object):
@@ -111,17 +116,33 @@ class TestClass(object):
             return
 
         with self.exception_handler.run_class(self):
+            plan = self.compile()
             for example in self.get_examples():
-                context = Context(
-                    self.cls(), example,
-                    self.unbound_setups,
-                    self.unbound_action,
-                    self.unbound_assertions,
-                    self.unbound_teardowns,
-                    self.plugin_composite
-                )
+                context = plan.create_context(example)
                 context.run()
 
+    async def run_async(self):
+        if not self.unbound_assertions:
+            return
+
+        with self.exception_handler.run_class(self):
+            plan = self.compile()
+            for example in self.get_examples():
+                context = plan.create_context(example)
+                await context.run_async()
+
+    def compile(self):
+        assertions = list(self.unbound_assertions)
+        self.plugin_composite.process_assertion_list(self.cls, assertions)
+        return ExecutionPlan(
+            self.cls,
+            self.unbound_setups,
+            self.unbound_action,
+            assertions,
+            self.unbound_teardowns,
+            self.plugin_composite
+        )
+
     def get_examples(self):
         examples = self.examples_method()
         return examples if examples is not None else [NO_EXAMPLE]
@@ -132,28 +153,25 @@ class TestClass(object):
         class_setup = None
         class_teardown = None
 
-        for name in cls.__dict__:
+        for name, response in self.plugin_composite.collect_methods(cls):
             val = getattr(cls, name)
 
-            if callable(val) and not isprivate(name):
-                response = self.plugin_composite.identify_method(val)
-
-                if response is EXAMPLES and bottom_of_tree:
-                    assert_not_too_many_special_methods(self.examples_method, cls, val)
-                    self.examples_method = val
-                elif response is SETUP:
-                    assert_not_too_many_special_methods(class_setup, cls, val)
-                    class_setup = val
-                    self.unbound_setups.append(val)
-                elif response is ACTION and bottom_of_tree:
-                    assert_not_too_many_special_methods(self.unbound_action, cls, val)
-                    self.unbound_action = val
-                elif response is ASSERTION and bottom_of_tree:
-                    self.unbound_assertions.append(val)
-                elif response is TEARDOWN:
-                    assert_not_too_many_special_methods(class_teardown, cls, val)
-                    class_teardown = val
-                    self.unbound_teardowns.append(val)
+            if response is EXAMPLES and bottom_of_tree:
+                assert_not_too_many_special_methods(self.examples_method, cls, val)
+                self.examples_method = val
+            elif response is SETUP:
+                assert_not_too_many_special_methods(class_setup, cls, val)
+                class_setup = val
+                self.unbound_setups.append(val)
+            elif response is ACTION and bottom_of_tree:
+                assert_not_too_many_special_methods(self.unbound_action, cls, val)
+                self.unbound_action = val
+            elif response is ASSERTION and bottom_of_tree:
+                self.unbound_assertions.append(val)
+            elif response is TEARDOWN:
+                assert_not_too_many_special_methods(class_teardown, cls, val)
+                class_teardown = val
+                self.unbound_teardowns.append(val)
 
 
 def isprivate(name):
@@ -167,77 +185,217 @@ def assert_not_too_many_special_methods(previously_found, cls, just_found):
         raise errors.TooManySpecialMethodsError(msg)
 
 
-# This class and its relationship to TestClass is becoming awkward - figure out how best to split them up
-class Context(object):
-    def __init__(self, instance, example,
-                 unbound_setups, unbound_action, unbound_assertions, unbound_teardowns,
-                 plugin_composite):
+class ExecutionPlan(object):
+    """
+    Everything about a test class which is the same for every example,
+    so that it only needs to be worked out once however many examples there are.
+    """
+    def __init__(self, cls, unbound_setups, unbound_action, unbound_assertions, unbound_teardowns, plugin_composite):
+        self.cls = cls
         self.plugin_composite = plugin_composite
         self.exception_handler = ExceptionHandler(self.plugin_composite)
 
+        self.setups = [Step(f) for f in unbound_setups]
+        self.action = Step(unbound_action)
+        self.assertions = [Step(f) for f in unbound_assertions]
+        self.teardowns = [Step(f) for f in unbound_teardowns]
+
+    def create_context(self, example):
+        return Context(self, self.cls(), example)
+
+
+class Step(object):
+    """
+    A method on a test class, which can be run against any instance of the class.
+    How to pass the test data into the method is worked out from its signature the first time it's run.
+    """
+    def __init__(self, func):
+        self.func = func
+        self.parameter_count = None
+
+    def bind(self, instance):
+        return types.MethodType(self.func, instance)
+
+    def run(self, instance, test_data):
+        result = self.call(instance, test_data)
+        if inspect.iscoroutine(result):
+            run_coroutine(result)
+
+    async def run_async(self, instance, test_data):
+        result = self.call(instance, test_data)
+        if inspect.iscoroutine(result):
+            await result
+
+    def call(self, instance, test_data):
+        parameter_count = self.count_parameters()
+        if test_data is not NO_EXAMPLE and parameter_count:
+            if isinstance(test_data, tuple) and parameter_count == len(test_data):
+                return self.func(instance, *test_data)
+            else:
+                return self.func(instance, test_data)
+        else:
+            return self.func(instance)
+
+    def count_parameters(self):
+        if self.parameter_count is None:
+            # the signature of the bound method doesn't depend on which instance it's bound to
+            sig = inspect.signature(self.bind(object()))
+            self.parameter_count = len(sig.parameters)
+        return self.parameter_count
+
+
+class Context(object):
+    def __init__(self, plan, instance, example):
+        self.plan = plan
+        self.plugin_composite = plan.plugin_composite
+        self.exception_handler = plan.exception_handler
+
         self.instance = instance
         self.example = example
         self.name = instance.__class__.__name__
 
-        self.plugin_composite.process_assertion_list(self.instance.__class__, unbound_assertions)
-        bound_assertions = bind_methods(unbound_assertions, self.instance)
-
-        # Refactoring hint: Maybe these method attributes belong in an extracted class
-        self.setups = bind_methods(unbound_setups, self.instance)
-        self.action = types.MethodType(unbound_action, self.instance)
-        self.assertions = [Assertion(f, self.plugin_composite) for f in bound_assertions]
-        self.teardowns = bind_methods(unbound_teardowns, self.instance)
-
     def run(self):
+        stopwatch = PhaseStopwatch()
         with self.exception_handler.run_context(self):
             try:
+                stopwatch.start('setup')
                 self.run_setup()
+                stopwatch.start('action')
                 self.run_action()
+                stopwatch.start('assertions')
                 self.run_assertions()
             finally:
-                self.run_teardown()
+                stopwatch.start('teardown')
+                try:
+                    self.run_teardown()
+                finally:
+                    self.report_timings(stopwatch)
+
+    async def run_async(self):
+        stopwatch = PhaseStopwatch()
+        with self.exception_handler.run_context(self):
+            try:
+                stopwatch.start('setup')
+                for setup in self.plan.setups:
+                    await setup.run_async(self.instance, self.example)
+                stopwatch.start('action')
+                await self.plan.action.run_async(self.instance, self.example)
+                stopwatch.start('assertions')
+                for step in self.plan.assertions:
+                    await Assertion(step, self.instance, self.exception_handler).run_async(self.example)
+            finally:
+                stopwatch.start('teardown')
+                try:
+                    for teardown in self.plan.teardowns:
+                        await teardown.run_async(self.instance, self.example)
+                finally:
+                    self.report_timings(stopwatch)
+
+    def report_timings(self, stopwatch):
+        stopwatch.stop()
+        self.plugin_composite.context_timed(self.instance.__class__, self.example, stopwatch.timings)
 
     def run_setup(self):
-        for setup in self.setups:
-            run_with_test_data(setup, self.example)
+        for setup in self.plan.setups:
+            setup.run(self.instance, self.example)
 
     def run_action(self):
-        run_with_test_data(self.action, self.example)
+        self.plan.action.run(self.instance, self.example)
 
     def run_assertions(self):
-        for assertion in self.assertions:
-            assertion.run(self.example)
+        for step in self.plan.assertions:
+            Assertion(step, self.instance, self.exception_handler).run(self.example)
 
     def run_teardown(self):
-        for teardown in self.teardowns:
-            run_with_test_data(teardown, self.example)
+        for teardown in self.plan.teardowns:
+            teardown.run(self.instance, self.example)
+
 
+class PhaseStopwatch(object):
+    """Times each phase of a context in nanoseconds. Starting a phase stops the previous one."""
+    def __init__(self):
+        self.timings = {}
+        self.phase = None
+        self.started = None
 
-def bind_methods(funcs, instance):
-    return [types.MethodType(func, instance) for func in funcs]
+    def start(self, phase):
+        self.stop()
+        self.phase = phase
+        self.started = time.perf_counter_ns()
+
+    def stop(self):
+        if self.phase is not None:
+            self.timings[self.phase] = time.perf_counter_ns() - self.started
+            self.phase = None
 
 
 class Assertion(object):
-    def __init__(self, func, plugin_composite):
-        self.func = func
-        self.name = func.__name__
-        self.plugin_composite = plugin_composite
-        self.exception_handler = ExceptionHandler(self.plugin_composite)
+    def __init__(self, step, instance, exception_handler):
+        self.step = step
+        self.instance = instance
+        self.func = step.bind(instance)
+        self.name = self.func.__name__
+        self.exception_handler = exception_handler
 
     def run(self, test_data):
         with self.exception_handler.run_assertion(self):
-            run_with_test_data(self.func, test_data)
+            self.step.run(self.instance, test_data)
+
+    async def run_async(self, test_data):
+        with self.exception_handler.run_assertion(self):
+            await self.step.run_async(self.instance, test_data)
 
 
-def run_with_test_data(func, test_data):
-    sig = inspect.signature(func)
-    if test_data is not NO_EXAMPLE and sig.parameters:
-        if isinstance(test_data, tuple) and len(sig.parameters) == len(test_data):
-            func(*test_data)
-        else:
-            func(test_data)
-    else:
-        func()
+# one event loop per thread, created when the first coroutine needs running
+# and reused for every coroutine until the end of the test run
+event_loops = threading.local()
+
+
+def run_coroutine(coroutine):
+    if not event_loop_is_running():
+        return get_event_loop().run_until_complete(coroutine)
+
+    # We've been called synchronously by code which is itself running on the event loop
+    # (such as a test run nested inside an async test). The loop can't be re-entered,
+    # so run the coroutine on another thread's loop and wait for it.
+    helper = getattr(event_loops, 'helper', None)
+    if helper is None:
+        helper = event_loops.helper = concurrent.futures.ThreadPoolExecutor(1)
+    return helper.submit(run_coroutine, coroutine).result()
+
+
+def get_event_loop():
+    loop = getattr(event_loops, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = event_loops.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop
+
+
+def event_loop_is_running():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def close_event_loop():
+    helper = getattr(event_loops, 'helper', None)
+    if helper is not None:
+        helper.submit(close_event_loop).result()
+        helper.shutdown()
+        event_loops.helper = None
+
+    loop = getattr(event_loops, 'loop', None)
+    if loop is None or loop.is_running():
+        return
+    try:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+        event_loops.loop = None
 
 
 class ExceptionHandler(object):
@@ -300,16 +458,59 @@ class ExceptionHandler(object):
 
 
 class PluginComposite(object):
+    """
+    Forwards each hook to the plugins in turn, until one of them returns something other than None.
+    Which plugins implement which hooks is worked out once, when the composite is created,
+    so the plugins should all be in the list by then.
+    """
     def __init__(self, plugins):
         self.plugins = plugins
+        for name in HOOK_NAMES:
+            setattr(self, name, create_dispatcher(name, self.plugins))
+
+    def collect_classes(self, module):
+        """The classes in the module which the plugins identify as test classes, in name order."""
+        return [cls for _, cls in inspect.getmembers(module, inspect.isclass) if self.identify_class(cls) is CONTEXT]
+
+    def collect_methods(self, cls):
+        """The names of the methods defined by the class which the plugins identify, with what they were identified as."""
+        methods = []
+        for name in cls.__dict__:
+            if isprivate(name):
+                continue
+            val = getattr(cls, name)
+            if callable(val):
+                response = self.identify_method(val)
+                if response is not None:
+                    methods.append((name, response))
+        return methods
 
     def __getattr__(self, name):
-        if name not in PluginInterface.__dict__:  # not expecting this to happen
-            raise AttributeError('The method {} is not part of the plugin interface'.format(name))
-
-        def plugin_method(*args, **kwargs):
-            for plugin in self.plugins:
-                reply = getattr(plugin, name, lambda *_: None)(*args, **kwargs)
-                if reply is not None:
-                    return reply
-        return plugin_method
+        # every hook was given a dispatcher by __init__, so anything else isn't part of the plugin interface
+        raise AttributeError('The method {} is not part of the plugin interface'.format(name))
+
+
+IDENTIFICATION_HOOKS = ('identify_folder', 'identify_file', 'identify_class', 'identify_method')
+# these aren't hooks, but plugins may replace them along with the identify_* hooks (see process_identifiers)
+COLLECTION_FUNCTIONS = ('collect_classes', 'collect_methods')
+HOOK_NAMES = frozenset(name for name, value in PluginInterface.__dict__.items() if inspect.isfunction(value))
+
+
+def create_dispatcher(name, plugins):
+    implementations = [getattr(p, name) for p in plugins if hasattr(p, name)]
+
+    if not implementations:
+        return do_nothing
+    if len(implementations) == 1:
+        return implementations[0]
+
+    def dispatch(*args, **kwargs):
+        for implementation in implementations:
+            reply = implementation(*args, **kwargs)
+            if reply is not None:
+                return reply
+    return dispatch
+
+
+def do_nothing(*args, **kwargs):
+    pass
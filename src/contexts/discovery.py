@@ -1,35 +1,111 @@
 import os
 from collections import namedtuple
-from .plugin_interface import TEST_FILE
+from .plugin_interface import TEST_FILE, TEST_FOLDER
 
 
 PackageSpecification = namedtuple('PackageSpecification', ['parent_folder', 'package_name'])
 ModuleSpecification = namedtuple('ModuleSpecification', ['parent_folder', 'module_name'])
+DirectoryEntry = namedtuple('DirectoryEntry', ['name', 'real_path', 'is_file', 'is_dir', 'is_symlink'])
 
 
-def create_importer(folder, plugin_composite, exception_handler):
-    if ispackage(folder):
-        return PackageModuleImporter(folder, plugin_composite, exception_handler)
+class DirectoryCache(object):
+    """
+    Remembers what is in each directory, so that each one is only read (by a single os.scandir call) once per test run.
+    The file types come from the directory listing itself, so only symlinks need to be stat-ed.
+    The plugins' answers about which folders and files are tests are remembered alongside the listings,
+    so a plugin which fills in the cache ahead of time (see the ``scan_folder`` hook) need not ask twice.
+    """
+    def __init__(self, plugin_composite):
+        self.plugin_composite = plugin_composite
+        self.listings = {}
+        self.folder_replies = {}
+        self.file_replies = {}
+
+    def list(self, directory):
+        try:
+            return self.listings[directory]
+        except KeyError:
+            pass
+
+        real_directory = os.path.realpath(directory)
+        entries = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    is_symlink = entry.is_symlink()
+                    # the path of anything other than a symlink can't be changed by resolving it
+                    real_path = os.path.realpath(entry.path) if is_symlink else os.path.join(real_directory, entry.name)
+                    entries.append(DirectoryEntry(entry.name, real_path, entry.is_file(), entry.is_dir(), is_symlink))
+        except OSError:
+            # like os.walk, skip folders which can't be read (or have disappeared) rather than giving up on the whole run
+            entries = []
+        self.listings[directory] = entries
+        return entries
+
+    def ispackage(self, directory):
+        return any(entry.name == "__init__.py" for entry in self.list(directory))
+
+    def test_subfolders(self, directory):
+        # like os.walk, symlinks to folders are not followed
+        return [
+            os.path.join(directory, entry.name) for entry in self.list(directory)
+            if entry.is_dir and not entry.is_symlink and self.is_test_folder(entry.real_path)
+        ]
+
+    def test_files(self, directory):
+        return [
+            entry.name for entry in self.list(directory)
+            if entry.is_file and entry.name != '__init__.py' and self.is_test_file(entry.real_path)
+        ]
+
+    def is_test_folder(self, path):
+        try:
+            return self.folder_replies[path]
+        except KeyError:
+            pass
+        reply = self.plugin_composite.identify_folder(path) is TEST_FOLDER
+        self.folder_replies[path] = reply
+        return reply
+
+    def is_test_file(self, path):
+        try:
+            return self.file_replies[path]
+        except KeyError:
+            pass
+        reply = self.plugin_composite.identify_file(path) is TEST_FILE
+        self.file_replies[path] = reply
+        return reply
+
+
+def create_importer(folder, plugin_composite, exception_handler, directories=None):
+    if directories is None:
+        directories = DirectoryCache(plugin_composite)
+    if directories.ispackage(folder):
+        return PackageModuleImporter(folder, plugin_composite, exception_handler, directories)
     else:
-        return FolderModuleImporter(folder, plugin_composite, exception_handler)
+        return FolderModuleImporter(folder, plugin_composite, exception_handler, directories)
+
+
+def walk(directory, directories):
+    """Yield the directory and every test folder beneath it, parents first."""
+    yield directory
+    for subfolder in directories.test_subfolders(directory):
+        yield from walk(subfolder, directories)
 
 
 class Importer(object):
     def get_file_details(self):
         specs = []
-        for filename in os.listdir(self.directory):
-            full_path = os.path.realpath(os.path.join(self.directory, filename))
-            if not os.path.isfile(full_path) or filename == '__init__.py':
-                continue
-            if self.plugin_composite.identify_file(full_path) is TEST_FILE:
-                module_name = self.module_prefix + remove_extension(filename)
-                specs.append(ModuleSpecification(self.location, module_name))
+        for filename in self.directories.test_files(self.directory):
+            module_name = self.module_prefix + remove_extension(filename)
+            specs.append(ModuleSpecification(self.location, module_name))
         return specs
 
 
 class FolderModuleImporter(Importer):
-    def __init__(self, directory, plugin_composite, exception_handler):
+    def __init__(self, directory, plugin_composite, exception_handler, directories):
         self.directory = directory
+        self.directories = directories
         self.location = self.directory
         self.module_prefix = ''
         self.plugin_composite = plugin_composite
@@ -45,11 +121,12 @@ class FolderModuleImporter(Importer):
 
 
 class PackageModuleImporter(Importer):
-    def __init__(self, directory, plugin_composite, exception_handler):
+    def __init__(self, directory, plugin_composite, exception_handler, directories):
         directory = os.path.realpath(directory)
-        self.package_spec = get_package_specification(directory)
+        self.package_spec = get_package_specification(directory, directories)
 
         self.directory = directory
+        self.directories = directories
         self.location = self.package_spec[0]
         self.module_prefix = self.package_spec[1] + '.'
         self.plugin_composite = plugin_composite
@@ -102,11 +179,11 @@ class ModuleList(object):
             self.modules.append(module)
 
 
-def get_package_specification(directory):
+def get_package_specification(directory, directories):
     current_parent = os.path.dirname(directory)
     package_names = [os.path.basename(directory)]
 
-    while ispackage(current_parent):
+    while directories.ispackage(current_parent):
         dirpath, current_parent = current_parent, os.path.dirname(current_parent)
         package_names.append(os.path.basename(dirpath))
 
@@ -114,9 +191,5 @@ def get_package_specification(directory):
     return PackageSpecification(current_parent, full_package_name)
 
 
-def ispackage(directory):
-    return "__init__.py" in os.listdir(directory)
-
-
 def remove_extension(filename):
     return os.path.splitext(filename)[0]
@@ -4,3 +4,16 @@ class MethodNamingError(Exception):
 
 class TooManySpecialMethodsError(Exception):
     pass
+
+
+class RemoteError(Exception):
+    """
+    Stands in for an exception which was raised in another process.
+    The original traceback is preserved as a list of formatted lines.
+    """
+    def __init__(self, message, formatted):
+        super().__init__(message)
+        self.formatted = formatted
+
+    def __reduce__(self):
+        return (type(self), (str(self), self.formatted))
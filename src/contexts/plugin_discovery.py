@@ -1,9 +1,15 @@
 import argparse
+import hashlib
+import importlib.metadata
 import inspect
 import itertools
+import json
 import os
 import sys
-import pkg_resources
+
+
+ENTRY_POINT_GROUP = 'contexts.plugins'
+METADATA_SUFFIXES = ('.dist-info', '.egg-info')
 
 
 def load_plugins():
@@ -23,13 +29,8 @@ def load_plugins():
 
 
 class PluginLoader(object):
-    def load_plugins(self):
-        builder = PluginListBuilder()
-        for entry_point in pkg_resources.iter_entry_points('contexts.plugins'):
-            cls = entry_point.load()
-            builder.add(cls)
-
-        self.plugins = [activate_plugin(p) for p in builder.to_list()]
+    def load_plugins(self, cache_path=None):
+        self.plugins = [activate_plugin(p) for p in load_plugin_classes(cache_path)]
 
     def setup_parser(self, parser):
         for plug in self.plugins:
@@ -80,6 +81,114 @@ def activate_plugin(cls):
     return cls()
 
 
+def load_plugin_classes(cache_path=None):
+    """
+    Find the plugins which are installed, in the order they should run in.
+    Reading the metadata of every installed distribution is slow, so the installed entry points are remembered
+    until a distribution is installed, removed or has its entry points changed.
+    """
+    if cache_path is None:
+        cache_path = default_cache_path()
+    installation = describe_installed_distributions()
+
+    cached = read_plugin_cache(cache_path, installation)
+    if cached is not None:
+        try:
+            return sort_plugin_classes(importlib.metadata.EntryPoint(name, value, ENTRY_POINT_GROUP).load() for name, value in cached)
+        except (ImportError, AttributeError):
+            # something has been uninstalled without us noticing
+            pass
+
+    entry_points = list(iter_entry_points(ENTRY_POINT_GROUP))
+    classes = sort_plugin_classes(entry_point.load() for entry_point in entry_points)
+
+    # the order isn't cached, because it depends on the plugins' locate methods rather than the installed metadata
+    write_plugin_cache(cache_path, installation, [[entry_point.name, entry_point.value] for entry_point in entry_points])
+    return classes
+
+
+def sort_plugin_classes(classes):
+    builder = PluginListBuilder()
+    for cls in classes:
+        builder.add(cls)
+    return builder.to_list()
+
+
+def iter_entry_points(group):
+    entry_points = importlib.metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        entry_points = entry_points.select(group=group)
+    else:
+        entry_points = entry_points.get(group, [])
+    # before Python 3.10, a distribution which can be found twice on sys.path has its entry points listed twice
+    unique = {}
+    for entry_point in entry_points:
+        unique.setdefault((entry_point.name, entry_point.value), entry_point)
+    return list(unique.values())
+
+
+def default_cache_path():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    # different virtualenvs have different plugins installed
+    environment = hashlib.sha1(sys.prefix.encode()).hexdigest()[:12]
+    return os.path.join(cache_home, 'contexts', 'plugins-{}.json'.format(environment))
+
+
+def describe_installed_distributions():
+    """
+    A hash of the metadata folder of every distribution which can be imported, and its entry points file.
+    Listing the folders on sys.path is much quicker than reading all the metadata.
+    """
+    description = [sys.version]
+    for path in sys.path:
+        directory = os.path.abspath(path or os.curdir)
+        description.append(directory)
+        try:
+            with os.scandir(directory) as it:
+                names = sorted(entry.name for entry in it if entry.name.endswith(METADATA_SUFFIXES))
+        except OSError:
+            # zip files and folders which don't exist can't contain installed distributions
+            continue
+        for name in names:
+            description.append([name, stamp(os.path.join(directory, name, 'entry_points.txt'))])
+    return hashlib.sha1(json.dumps(description).encode()).hexdigest()
+
+
+def stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_plugin_cache(path, installation):
+    try:
+        with open(path, 'r') as f:
+            dct = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(dct, dict) or dct.get('installation') != installation:
+        return None
+    return dct.get('plugins')
+
+
+def write_plugin_cache(path, installation, plugins):
+    # several test runs may be starting at once, so never leave a half-written file where they can see it
+    temp_path = '{}.{}'.format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'w') as f:
+            json.dump({'installation': installation, 'plugins': plugins}, f)
+        os.replace(temp_path, path)
+    except OSError:
+        # the cache is just an optimisation, so a read-only home directory shouldn't stop the tests from running
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
 class PluginListBuilder(object):
     def __init__(self):
         self.graph = Graph()
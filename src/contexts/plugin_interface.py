@@ -1,3 +1,8 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
 class PluginInterface(object):
     """
     Defines the interface for plugins.
@@ -102,6 +107,17 @@ class PluginInterface(object):
         :param example: The current example, which may be :const:`~contexts.plugin_interface.NO_EXAMPLE`
             if it is not a parametrised test.
         """
+    def context_timed(self, cls, example, timings):
+        """
+        Called at the end of a test context, just before ``context_ended`` or ``context_errored``,
+        with how long each phase of the context took.
+
+        :param cls: The class object of the test being run.
+        :param example: The current example, which may be :const:`~contexts.plugin_interface.NO_EXAMPLE`
+            if it is not a parametrised test.
+        :param timings: A dict mapping the name of each phase which was run
+            (``'setup'``, ``'action'``, ``'assertions'`` and ``'teardown'``) to the time it took in nanoseconds.
+        """
     def context_ended(self, cls, example):
         """
         Called when a test context completes its run.
@@ -216,6 +232,30 @@ class PluginInterface(object):
             * ``None`` - plugin does not wish to identify the method (though other plugins may still cause it to be run)
         """
 
+    def process_identifiers(self, identifiers):
+        """
+        Called at the start of a test run, before the test runner goes looking for tests.
+
+        :param identifiers: A dict mapping the names of the ``identify_*`` hooks (``identify_folder``,
+            ``identify_file``, ``identify_class`` and ``identify_method``) to the functions the test runner
+            will call to identify things. Plugins may replace the functions in the dict -
+            for example, to remember the answers given by other plugins.
+            The dict also contains ``collect_classes``, which takes a module and returns the test classes in it,
+            and ``collect_methods``, which takes a class and returns ``(name, reply)`` pairs for the methods
+            it defines which were identified by the ``identify_method`` hook.
+        """
+    def scan_folder(self, folder, directories):
+        """
+        Called before the test runner searches a folder and its subfolders for test files.
+        The test runner reads the folders from ``directories`` in order afterwards,
+        so the order in which modules are imported does not depend on how the cache was filled in.
+
+        :param folder str: The path of the folder which is about to be searched.
+        :param directories: A :class:`~contexts.discovery.DirectoryCache`. Plugins may fill it in ahead of time -
+            for example, by reading many folders at once - by calling its ``list``, ``test_subfolders``
+            and ``test_files`` methods. The cache asks the ``identify_folder`` and ``identify_file`` hooks
+            for the answers it remembers.
+        """
     def process_module_list(self, modules):
         """
         A hook to change (or examine) the list of modules which will be run with the full list of found modules.
@@ -240,6 +280,20 @@ class PluginInterface(object):
         :param functions: A list of unbound assertion methods found in that class
         """
 
+    def run_suites(self, suites):
+        """
+        Called after all the test modules have been found and identified, when the test runner is
+        about to run them. Plugins may take over the running of some or all of the suites
+        (for example, to run them in parallel), removing the suites they have run from the list in-place.
+        The test runner will run any suites which remain in the list, one after another.
+
+        Plugins which run suites themselves must report their progress through the suite's
+        ``plugin_composite``, so that the usual progress notifications are sent to every plugin.
+
+        :param suites: A list of :class:`contexts.core.Suite` objects.
+            Each suite has a ``module`` attribute and a list of the test ``classes`` found in that module.
+        """
+
     def import_module(self, location, name):
         """
         Called when the test runner needs to import a module.
@@ -282,3 +336,33 @@ ASSERTION = type("_Assertion", (), {})()
 TEARDOWN = type("_Teardown", (), {})()
 #: Passed to plugins when a class is not a parametrised test.
 NO_EXAMPLE = type("_NoExample", (), {})()
+
+
+replayed_events = threading.local()
+
+
+def event_time_ns():
+    """
+    The time at which the progress notification currently being sent to the plugins happened,
+    in nanoseconds from :func:`time.perf_counter_ns`.
+
+    Plugins which time things should use this rather than reading the clock themselves.
+    When tests are run in parallel, their progress notifications are recorded
+    and sent to the plugins afterwards, so the time they're received isn't the time they happened.
+    """
+    replayed = getattr(replayed_events, 'time_ns', None)
+    return replayed if replayed is not None else time.perf_counter_ns()
+
+
+@contextmanager
+def replaying_event(time_ns):
+    """
+    Used when sending on a recorded progress notification,
+    so that :func:`event_time_ns` gives the time it was recorded.
+    """
+    previous = getattr(replayed_events, 'time_ns', None)
+    replayed_events.time_ns = time_ns
+    try:
+        yield
+    finally:
+        replayed_events.time_ns = previous
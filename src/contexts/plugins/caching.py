@@ -0,0 +1,356 @@
+import json
+import os
+import sys
+from .. import plugin_discovery, plugin_interface
+from ..discovery import DirectoryEntry
+from .identification.filespec import FileSpecIdentifier
+from .importing import static
+from .walking import ThreadedWalker
+
+
+# the answers which can be stored in the cache, by name
+REPLIES = {
+    name: getattr(plugin_interface, name)
+    for name in ['EXAMPLES', 'SETUP', 'ACTION', 'ASSERTION', 'TEARDOWN']
+}
+REPLY_NAMES = {id(reply): name for name, reply in REPLIES.items()}
+
+
+class CollectionCache(object):
+    """
+    Remembers what was collected last time: the contents of each folder which was searched
+    (along with which of its folders and files were tests), the test classes in each module,
+    the special methods of each class, and the outline of each file which was read without being imported. Anything whose folder or source file
+    has changed since it was remembered is collected again.
+    """
+    @classmethod
+    def locate(cls):
+        # the folders which haven't changed needn't be read by the threads
+        return (None, ThreadedWalker)
+
+    def setup_parser(self, parser):
+        parser.add_argument('--collection-cache',
+                            action='store',
+                            dest='collection_cache_path',
+                            default=None,
+                            metavar='FILE',
+                            help="Path to a file in which to remember which folders, files, classes and methods are tests. "
+                                 "Only folders and files which have changed since the last run will be searched again.")
+
+    def initialise(self, args, env):
+        self.path = args.collection_cache_path
+        if self.path is None:
+            return False
+        self._cache = None
+        self.identifiers = []
+        self.stamps = {}
+        self.directories = None
+        self.prefilled = set()
+        self.methods_by_class = {}
+        self.modules = {}
+        return True
+
+    def request_plugins(self):
+        # the cache holds the identification plugins' answers, so it's only any good to the same plugins
+        returned_plugins = yield identification_plugin_classes()
+        self.identifiers = list(returned_plugins.values())
+
+    @property
+    def cache(self):
+        # loaded on first use, once it's known which plugins are identifying things
+        if self._cache is None:
+            self._cache = Cache.load(self.path, describe_configuration(self.identifiers))
+        return self._cache
+
+    def scan_folder(self, folder, directories):
+        self.directories = directories
+        for directory in self.cache.folders_within(folder):
+            record = self.cache.folder(directory).get('listing')
+            if directory in directories.listings or record is None or record['stamp'] != self.stamp(directory):
+                continue
+            entries = decode_entries(directory, record)
+            directories.listings[directory] = entries
+            self.prefilled.add(directory)
+            for entry in entries:
+                if entry.name in record['folders']:
+                    directories.folder_replies[entry.real_path] = record['folders'][entry.name]
+                if entry.name in record['files']:
+                    directories.file_replies[entry.real_path] = record['files'][entry.name]
+
+    def process_identifiers(self, identifiers):
+        identifiers['collect_classes'] = self.cached_classes(identifiers['collect_classes'])
+        identifiers['collect_methods'] = self.cached_methods(identifiers['collect_methods'])
+
+    def cached_classes(self, collect_classes):
+        def collect_classes_from_cache(module):
+            modules = self.modules.setdefault(module.__name__, [])
+            if module not in modules:
+                modules.append(module)
+            record = self.file_record(module_key(module), getattr(module, '__file__', None))
+            if record is None:
+                return collect_classes(module)
+
+            if 'classes' in record and self.unchanged(record['imports']):
+                classes = [getattr(module, name, None) for name in record['classes'].split()]
+                if all(isinstance(cls, type) for cls in classes):
+                    return classes
+
+            classes = collect_classes(module)
+            imports = self.imports(module)
+            if imports is not None:
+                collected = set(classes)
+                self.cache.changed = True
+                record['imports'] = imports
+                record['classes'] = ' '.join(name for name, cls in sorted(vars(module).items()) if isinstance(cls, type) and cls in collected)
+            return classes
+        return collect_classes_from_cache
+
+    def cached_methods(self, collect_methods):
+        def collect_methods_from_cache(cls):
+            # classes are collected once for each suite they're in and once for each subclass
+            try:
+                return self.methods_by_class[cls]
+            except KeyError:
+                pass
+
+            module = self.defining_module(cls)
+            record = self.file_record(module_key(module), getattr(module, '__file__', None))
+            remembered = record['methods'].get(cls.__qualname__) if record is not None else None
+            if remembered is not None:
+                methods = decode_methods(remembered)
+            else:
+                methods = collect_methods(cls)
+                if record is not None and all(id(reply) in REPLY_NAMES for _, reply in methods):
+                    self.cache.changed = True
+                    record['methods'][cls.__qualname__] = encode_methods(methods)
+            self.methods_by_class[cls] = methods
+            return methods
+        return collect_methods_from_cache
+
+    def read_outline(self, filename):
+        """The outline of a test file which is being read without being imported (see importing.static)."""
+        # it's kept alongside the classes and methods of the stand-in module (see module_key)
+        record = self.file_record(filename + ':stand-in', filename)
+        if record is None:
+            return static.read_outline(filename)
+        if 'outline' not in record:
+            self.cache.changed = True
+            record['outline'] = json.dumps(static.read_outline(filename))
+        return json.loads(record['outline'])
+
+    def defining_module(self, cls):
+        # test files in different folders can have the same name, and modules read without being imported
+        # (see --collect-only) aren't in sys.modules, so the module has to be the one which the class is in
+        candidates = self.modules.get(cls.__module__, []) + [sys.modules.get(cls.__module__)]
+        for module in candidates:
+            found = module
+            for name in cls.__qualname__.split('.'):
+                found = getattr(found, name, None)
+            if found is cls:
+                return module
+        return None
+
+    def file_record(self, key, filename):
+        # everything remembered about a file is forgotten when it changes
+        if key is None:
+            return None
+        stamp = self.stamp(filename)
+        if stamp is None:
+            return None
+        records = self.cache.folder(os.path.dirname(filename)).setdefault('modules', {})
+        record = records.get(key)
+        if record is None or record['stamp'] != stamp:
+            record = records[key] = {'stamp': stamp, 'methods': {}}
+        return record
+
+    def imports(self, module):
+        # a module's classes may have been imported from other files, which may have changed even if the module hasn't
+        files = set()
+        for value in vars(module).values():
+            if isinstance(value, type) and value.__module__ != module.__name__:
+                filename = getattr(sys.modules.get(value.__module__), '__file__', None)
+                if filename is not None and filename != module.__file__:
+                    files.add(filename)
+        stamps = {f: self.stamp(f) for f in files}
+        if None in stamps.values():
+            return None
+        return stamps
+
+    def unchanged(self, dependencies):
+        return all(self.stamp(f) == stamp for f, stamp in dependencies.items())
+
+    def stamp(self, path):
+        # things aren't expected to change during a test run, so only look at each file once
+        if path in self.stamps:
+            return self.stamps[path]
+        stamp = self.stamps[path] = stamp_file(path)
+        return stamp
+
+    def test_run_ended(self):
+        if self.directories is not None:
+            self.remember_folders(self.directories)
+        if self.cache.changed:
+            self.cache.save(self.path)
+
+    def remember_folders(self, directories):
+        for directory, entries in directories.listings.items():
+            stamp = self.stamp(directory)
+            if stamp is None or directory in self.prefilled:
+                continue
+            listing = {
+                'stamp': stamp,
+                'entries': {e.name: entry_kind(e) for e in entries},
+                # the real paths of the other entries follow from the folder's (see DirectoryCache.list)
+                'links': {e.name: e.real_path for e in entries if e.is_symlink},
+                'folders': {e.name: directories.folder_replies[e.real_path] for e in entries if e.real_path in directories.folder_replies},
+                'files': {e.name: directories.file_replies[e.real_path] for e in entries if e.real_path in directories.file_replies}
+            }
+            folder = self.cache.folder(directory)
+            previous = folder.get('listing')
+            if previous is not None and previous['stamp'] == stamp:
+                # a run of one of the subfolders only asks about some of the things in the folders above it
+                listing['folders'] = dict(previous['folders'], **listing['folders'])
+                listing['files'] = dict(previous['files'], **listing['files'])
+            if listing != previous:
+                self.cache.changed = True
+                folder['listing'] = listing
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+class Cache(object):
+    """
+    The collection results for each folder: what's in it (and which of those things are test folders
+    and test files), and the test classes and special methods found in each of its source files,
+    along with stamps (modification time and size) of the folders and files they came from.
+
+    Loading the cache has to be quicker than collecting the tests again. The file has the configuration
+    on its first line, then a line for each folder: the folder's path and its results, as JSON separated by a tab
+    (which JSON strings can't contain). A folder's results are only decoded once something in the folder
+    is needed, so running one folder doesn't mean loading the whole tree. The results are flat dicts of strings
+    (a class's methods are 'SETUP:establish|ASSERTION:it_should_work it_should_be_quick',
+    and the outline of a file which is read without being imported is a string of JSON),
+    which the garbage collector doesn't have to look through while the tests are running.
+    """
+    def __init__(self, configuration, folders=None):
+        self.configuration = configuration
+        self.encoded = folders if folders is not None else {}
+        self.decoded = {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, path, configuration):
+        if not os.path.isfile(path):
+            return cls(configuration)
+        try:
+            with open(path, 'r') as f:
+                if json.loads(f.readline() or 'null') != configuration:
+                    # the plugins may give different answers with different options
+                    return cls(configuration)
+                folders = {}
+                for line in f:
+                    directory, _, encoded = line.partition('\t')
+                    folders[json.loads(directory)] = encoded
+        except ValueError:
+            return cls(configuration)
+        return cls(configuration, folders)
+
+    def folder(self, directory):
+        """The results for the folder, which may be changed in place."""
+        try:
+            return self.decoded[directory]
+        except KeyError:
+            pass
+        encoded = self.encoded.get(directory)
+        record = self.decoded[directory] = json.loads(encoded) if encoded is not None else {}
+        return record
+
+    def folders_within(self, directory):
+        prefix = os.path.join(directory, '')
+        return [d for d in self.encoded.keys() | self.decoded.keys() if d == directory or d.startswith(prefix)]
+
+    def save(self, path):
+        lines = [json.dumps(self.configuration)]
+        for directory, encoded in self.encoded.items():
+            if directory not in self.decoded:
+                lines.append(json.dumps(directory) + '\t' + encoded)
+        # only the folders which were looked at can have changed
+        for directory, record in self.decoded.items():
+            if record:
+                lines.append(json.dumps(directory) + '\t' + json.dumps(record))
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def module_key(module):
+    filename = getattr(module, '__file__', None)
+    if filename is None:
+        return None
+    # modules which were read without being imported (see --collect-only) are kept apart from the real thing
+    if getattr(module, '__spec__', None) is None:
+        return filename + ':stand-in'
+    return filename
+
+
+def encode_methods(methods):
+    # 'SETUP:establish|ASSERTION:it_should_work it_should_be_quick' - method names can't contain these characters
+    groups = {}
+    for name, reply in methods:
+        groups.setdefault(REPLY_NAMES[id(reply)], []).append(name)
+    return '|'.join('{}:{}'.format(reply, ' '.join(names)) for reply, names in groups.items())
+
+
+def decode_methods(encoded):
+    methods = []
+    for group in encoded.split('|') if encoded else ():
+        reply, _, names = group.partition(':')
+        methods.extend((name, REPLIES[reply]) for name in names.split())
+    return methods
+
+
+def entry_kind(entry):
+    return ('f' if entry.is_file else '') + ('d' if entry.is_dir else '') + ('l' if entry.is_symlink else '')
+
+
+def decode_entries(directory, listing):
+    # the real path is worked out the same way as DirectoryCache.list does
+    prefix = os.path.join(os.path.realpath(directory), '')
+    links = listing['links']
+    return [
+        DirectoryEntry(name, links[name] if name in links else prefix + name, 'f' in kind, 'd' in kind, 'l' in kind)
+        for name, kind in listing['entries'].items()
+    ]
+
+
+def identification_plugin_classes():
+    hooks = ('identify_folder', 'identify_file', 'identify_class', 'identify_method', 'process_identifiers')
+    return [
+        cls for cls in plugin_discovery.load_plugin_classes()
+        if cls is not CollectionCache and any(
+            getattr(cls, hook, None) not in (None, getattr(plugin_interface.PluginInterface, hook))
+            for hook in hooks
+        )
+    ]
+
+
+def describe_configuration(identifiers):
+    # only the things which change the plugins' answers are part of the configuration,
+    # so that (for example) running a single folder or asking for verbose output still uses the cache
+    description = []
+    for plugin in identifiers:
+        cls = type(plugin)
+        item = ['{}.{}'.format(cls.__module__, cls.__qualname__)]
+        if isinstance(plugin, FileSpecIdentifier):
+            # the file's lines may be relative to the working folder
+            item.extend([plugin.cwd, stamp_file(plugin.spec_file)])
+        description.append(item)
+    return sorted(description)
+
+
+def stamp_file(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return '{}:{}'.format(stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,83 @@
+import contextvars
+import sys
+from contextlib import contextmanager
+
+
+STREAM_NAMES = ('stdout', 'stderr')
+
+# Maps each RoutingStream to the stream which the current thread (or asyncio task)
+# is capturing its output into. Each thread has its own context, so capturing
+# output in one thread doesn't affect any other.
+capture_targets = contextvars.ContextVar('capture_targets', default={})
+
+
+class RoutingStream(object):
+    """
+    Stands in for sys.stdout or sys.stderr.
+    Writes go to wherever the current thread is capturing its output, or to the real stream if it isn't.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+
+    @property
+    def target(self):
+        return capture_targets.get().get(self, self.stream)
+
+    def write(self, string):
+        return self.target.write(string)
+
+    def flush(self):
+        return self.target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def start_capturing(stdout=None, stderr=None):
+    """
+    Start sending anything the current thread writes to stdout or stderr to the given streams.
+    Returns a token, which should be passed into stop_capturing().
+    """
+    installed = []
+    targets = dict(capture_targets.get())
+    for name, target in zip(STREAM_NAMES, (stdout, stderr)):
+        if target is not None:
+            router, was_installed = install(name)
+            targets[router] = target
+            installed.append((name, router, was_installed))
+    return (installed, capture_targets.set(targets))
+
+
+def stop_capturing(token):
+    installed, var_token = token
+    capture_targets.reset(var_token)
+    for name, router, was_installed in installed:
+        uninstall(name, router, was_installed)
+
+
+@contextmanager
+def routing_output():
+    """
+    Keep sys.stdout and sys.stderr routed to the current thread's capture targets for the duration,
+    so that threads can start and stop capturing without replacing sys.stdout under one another's feet.
+    """
+    installed = [(name,) + install(name) for name in STREAM_NAMES]
+    try:
+        yield
+    finally:
+        for name, router, was_installed in installed:
+            uninstall(name, router, was_installed)
+
+
+def install(name):
+    stream = getattr(sys, name)
+    if isinstance(stream, RoutingStream):
+        return (stream, False)
+    router = RoutingStream(stream)
+    setattr(sys, name, router)
+    return (router, True)
+
+
+def uninstall(name, router, was_installed):
+    if was_installed and getattr(sys, name) is router:
+        setattr(sys, name, router.stream)
@@ -1,3 +1,4 @@
+import functools
 import os.path
 import re
 from contexts.plugin_interface import TEST_FOLDER, TEST_FILE, CONTEXT, EXAMPLES, SETUP, ACTION, ASSERTION, TEARDOWN
@@ -15,6 +16,16 @@ action_words = frozenset(("because", "when", "since", "after"))
 assertion_words = frozenset(("should", "it", "must", "will", "then"))
 cleanup_words = frozenset(("cleanup",))
 
+all_keyword_sets = [example_words, setup_words, action_words, assertion_words, cleanup_words]
+method_replies = {
+    example_words: EXAMPLES,
+    setup_words: SETUP,
+    action_words: ACTION,
+    assertion_words: ASSERTION,
+    cleanup_words: TEARDOWN
+}
+keyword_sets_by_word = {word: keywords for keywords in all_keyword_sets for word in keywords}
+
 
 class NameBasedIdentifier(object):
     def initialise(self, args, env):
@@ -35,31 +46,27 @@ class NameBasedIdentifier(object):
             return CONTEXT
 
     def identify_method(self, method):
-        d = {
-            example_words: EXAMPLES,
-            setup_words: SETUP,
-            action_words: ACTION,
-            assertion_words: ASSERTION,
-            cleanup_words: TEARDOWN
-        }
-        name = method.__name__
-
-        for word in get_lowercase_words(name):
-            for keywords in d:
-                if word in keywords:
-                    assert_not_ambiguous(name, keywords)
-                    return d[keywords]
+        return classify_method_name(method.__name__)
 
     def __eq__(self, other):
         return type(self) == type(other)
 
 
-def assert_not_ambiguous(name, keywords):
-    all_keyword_sets = {example_words, setup_words, action_words, assertion_words, cleanup_words}
-    all_keyword_sets.remove(keywords)
+# base classes' methods are identified again for every subclass, so the same names come up over and over.
+# MethodNamingErrors are not cached, so an ambiguous name is reported every time it is seen.
+@functools.lru_cache(maxsize=4096)
+def classify_method_name(name):
+    words = get_lowercase_words(name)
+    for word in words:
+        keywords = keyword_sets_by_word.get(word)
+        if keywords is not None:
+            assert_not_ambiguous(name, keywords, words)
+            return method_replies[keywords]
+
 
-    for word in get_lowercase_words(name):
-        if any(word in s for s in all_keyword_sets):
+def assert_not_ambiguous(name, keywords, words):
+    for word in words:
+        if keyword_sets_by_word.get(word, keywords) is not keywords:
             msg = """The method {} is ambiguously named.
 You can override this check by explicitly marking your
 method using one of the decorators in the 'contexts' module:
@@ -69,4 +76,4 @@ http://contexts.readthedocs.org/en/latest/guide.html#overriding-name-based-usage
 
 
 def get_lowercase_words(string):
-    return (s.lower() for s in cleverly_get_words(string))
+    return [s.lower() for s in cleverly_get_words(string)]
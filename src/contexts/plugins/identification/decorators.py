@@ -3,16 +3,12 @@ from contexts.plugin_interface import CONTEXT, EXAMPLES, SETUP, ACTION, ASSERTIO
 from . import NameBasedIdentifier
 
 
-class DecoratorBasedIdentifier(object):
-    decorated_items = {
-        "contexts": set(),
-        "examples": set(),
-        "setups": set(),
-        "actions": set(),
-        "assertions": set(),
-        "teardowns": set()
-    }
+# the decorators record what they were used on in an attribute of the decorated object itself,
+# so that nothing needs to hold on to the objects and looking them up doesn't involve any searching
+ROLE_ATTRIBUTE = '_contexts_role'
+
 
+class DecoratorBasedIdentifier(object):
     @classmethod
     def locate(cls):
         return (None, NameBasedIdentifier)
@@ -21,7 +17,7 @@ class DecoratorBasedIdentifier(object):
         return True
 
     def identify_class(self, cls):
-        if cls in self.decorated_items["contexts"]:
+        if get_role(cls) is CONTEXT:
             return CONTEXT
 
     def identify_method(self, method):
@@ -30,16 +26,9 @@ class DecoratorBasedIdentifier(object):
             # this is to make it work with classmethods (such as examples)
             method = method.__func__
 
-        if method in self.decorated_items["examples"]:
-            return EXAMPLES
-        if method in self.decorated_items["setups"]:
-            return SETUP
-        if method in self.decorated_items["actions"]:
-            return ACTION
-        if method in self.decorated_items["assertions"]:
-            return ASSERTION
-        if method in self.decorated_items["teardowns"]:
-            return TEARDOWN
+        role = get_role(method)
+        if role is not CONTEXT:
+            return role
 
     def __eq__(self, other):
         return type(self) == type(other)
@@ -49,8 +38,7 @@ def spec(cls):
     """
     Class decorator. Marks a class as a test class.
     """
-    assert_not_multiple_decorators(cls, "contexts")
-    DecoratorBasedIdentifier.decorated_items["contexts"].add(cls)
+    set_role(cls, CONTEXT)
     return cls
 
 
@@ -61,8 +49,7 @@ def setup(func):
     """
     Decorator. Marks a method as a setup method.
     """
-    assert_not_multiple_decorators(func, "setups")
-    DecoratorBasedIdentifier.decorated_items["setups"].add(func)
+    set_role(func, SETUP)
     return func
 
 
@@ -70,8 +57,7 @@ def action(func):
     """
     Decorator. Marks a method as an action method.
     """
-    assert_not_multiple_decorators(func, "actions")
-    DecoratorBasedIdentifier.decorated_items["actions"].add(func)
+    set_role(func, ACTION)
     return func
 
 
@@ -79,8 +65,7 @@ def assertion(func):
     """
     Decorator. Marks a method as an assertion method.
     """
-    assert_not_multiple_decorators(func, "assertions")
-    DecoratorBasedIdentifier.decorated_items["assertions"].add(func)
+    set_role(func, ASSERTION)
     return func
 
 
@@ -88,8 +73,7 @@ def teardown(func):
     """
     Decorator. Marks a method as a teardown method.
     """
-    assert_not_multiple_decorators(func, "teardowns")
-    DecoratorBasedIdentifier.decorated_items["teardowns"].add(func)
+    set_role(func, TEARDOWN)
     return func
 
 
@@ -97,11 +81,16 @@ def examples(func):
     """
     Decorator. Marks a method as an examples method.
     """
-    assert_not_multiple_decorators(func, "examples")
-    DecoratorBasedIdentifier.decorated_items["examples"].add(func)
+    set_role(func, EXAMPLES)
     return func
 
 
-def assert_not_multiple_decorators(item, decorator_type):
-    if any(item in s for k, s in DecoratorBasedIdentifier.decorated_items.items() if k != decorator_type):
-        raise ValueError("Function {} has more than one decorator")
+def set_role(item, role):
+    if get_role(item) not in (None, role):
+        raise ValueError("Function {} has more than one decorator".format(item.__name__))
+    setattr(item, ROLE_ATTRIBUTE, role)
+
+
+def get_role(item):
+    # not getattr, because a subclass of a decorated class hasn't been decorated itself
+    return getattr(item, '__dict__', {}).get(ROLE_ATTRIBUTE)
@@ -1,8 +1,13 @@
+import fnmatch
 import io
 import os
+import re
 from contexts.plugin_interface import TEST_FOLDER, TEST_FILE
 
 
+glob_re = re.compile(r"[*?[]")
+
+
 class FileSpecIdentifier:
 
     def __init__(self):
@@ -14,7 +19,9 @@ class FileSpecIdentifier:
             action='store',
             dest='specs',
             default=None,
-            help="Path to a file containing files and directories to search for tests.")
+            help="Path to a file containing files and directories to search for tests. "
+                 "Lines may contain glob patterns, and lines beginning with '!' exclude "
+                 "the matching files and directories.")
 
     def initialise(self, args=None, env=None, file=None, cwd=None):
         """
@@ -28,17 +35,29 @@ class FileSpecIdentifier:
         self.file = file
         return self.spec_file is not None
 
+    def process_identifiers(self, identifiers):
+        # other plugins may identify an excluded file by its name, so the exclusions have to overrule them
+        if not self.specs.excluded:
+            return
+        identifiers['identify_folder'] = self.excluding(identifiers['identify_folder'])
+        identifiers['identify_file'] = self.excluding(identifiers['identify_file'])
+
+    def excluding(self, identify):
+        def identify_unless_excluded(path):
+            if self.specs.excluded.contains(split_path(path)):
+                return None
+            return identify(path)
+        return identify_unless_excluded
+
     def identify_folder(self, folder):
-        for f in self.specs:
-            if f == folder:
-                return TEST_FOLDER
-            if(f.startswith(folder)):
-                return TEST_FOLDER
+        parts = split_path(folder)
+        if self.specs.included.could_contain(parts) and not self.specs.excluded.contains(parts):
+            return TEST_FOLDER
 
     def identify_file(self, file):
-        for f in self.specs:
-            if(f == file):
-                return TEST_FILE
+        parts = split_path(file)
+        if self.specs.included.matches(parts) and not self.specs.excluded.contains(parts):
+            return TEST_FILE
 
     @property
     def specs(self):
@@ -47,11 +66,115 @@ class FileSpecIdentifier:
         return self._specs
 
     def get_path(self, p):
-        return os.path.join(self.cwd, p.rstrip())
+        return os.path.normcase(os.path.normpath(os.path.join(self.cwd, p)))
 
     def read_from_file(self):
         if(self.file is not None):
-            self._specs = [os.path.join(self.cwd, p) for p in self.file.readlines()]
+            self._specs = self.parse(self.file.readlines())
         else:
             with io.open(self.spec_file, 'r') as file:
-                self._specs = [self.get_path(p) for p in file.readlines()]
+                self._specs = self.parse(file.readlines())
+
+    def parse(self, lines):
+        specs = Specs()
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('!'):
+                specs.excluded.add(split_path(self.get_path(line[1:])))
+            else:
+                specs.included.add(split_path(self.get_path(line)))
+        return specs
+
+
+class Specs(object):
+    def __init__(self):
+        self.included = PathIndex()
+        self.excluded = PathIndex()
+
+
+class PathIndex(object):
+    """
+    A set of paths and glob patterns, split into their components and arranged in a trie
+    so that looking a path up takes time proportional to its length rather than the number of specs.
+    Each pattern is filed under its longest literal prefix, so only the patterns
+    which could possibly match are tried.
+    """
+    def __init__(self):
+        self.paths = set()
+        self.root = TrieNode()
+
+    def __bool__(self):
+        return bool(self.paths) or bool(self.root.children) or bool(self.root.patterns)
+
+    def add(self, parts):
+        node = self.root
+        for i, part in enumerate(parts):
+            if glob_re.search(part):
+                node.patterns.append(parts[i:])
+                return
+            node = node.children.setdefault(part, TrieNode())
+        self.paths.add(parts)
+
+    def matches(self, parts):
+        if parts in self.paths:
+            return True
+        return any(match_parts(pattern, parts[i:]) for i, node in self.walk(parts) for pattern in node.patterns)
+
+    def contains(self, parts):
+        """Whether the path, or one of the folders it's in, matches."""
+        for i, node in self.walk(parts):
+            if parts[:i] in self.paths:
+                return True
+            rest = parts[i:]
+            if any(match_parts(pattern, rest[:j]) for pattern in node.patterns for j in range(1, len(rest) + 1)):
+                return True
+        return False
+
+    def could_contain(self, parts):
+        """Whether the path matches, or is a folder which might contain something which matches."""
+        visited = 0
+        for i, node in self.walk(parts):
+            visited = i
+            if any(could_contain(pattern, parts[i:]) for pattern in node.patterns):
+                return True
+        return visited == len(parts)
+
+    def walk(self, parts):
+        # the nodes along the path, with how many parts of the path were used to get to each of them
+        node = self.root
+        yield 0, node
+        for i, part in enumerate(parts, 1):
+            node = node.children.get(part)
+            if node is None:
+                return
+            yield i, node
+
+
+class TrieNode(object):
+    def __init__(self):
+        self.children = {}
+        self.patterns = []
+
+
+def split_path(path):
+    return tuple(os.path.normcase(path).split(os.sep))
+
+
+def match_parts(pattern, parts):
+    if not pattern:
+        return not parts
+    if pattern[0] == '**':
+        return any(match_parts(pattern[1:], parts[i:]) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatch.fnmatchcase(parts[0], pattern[0]) and match_parts(pattern[1:], parts[1:])
+
+
+def could_contain(pattern, parts):
+    if not parts:
+        return True
+    if not pattern:
+        return False
+    if pattern[0] == '**':
+        return True
+    return fnmatch.fnmatchcase(parts[0], pattern[0]) and could_contain(pattern[1:], parts[1:])
@@ -1,9 +1,17 @@
 import ast
+import bisect
 import importlib.abc
+import importlib.util
+import marshal
+import os
 import sys
 from . import Importer
 
 
+# Bump this whenever AssertionRewriter changes, so that code rewritten by older versions isn't used
+REWRITER_VERSION = 1
+
+
 class AssertionRewritingImporter(Importer):
     def setup_parser(self, parser):
         parser.add_argument('--no-assert',
@@ -14,7 +22,8 @@ class AssertionRewritingImporter(Importer):
 
     @classmethod
     def locate(cls):
-        return (None, Importer)
+        from .lazy import LazyImporter
+        return (LazyImporter, Importer)
 
     def initialise(self, args, env):
         return args.rewriting
@@ -24,27 +33,134 @@ class AssertionRewritingImporter(Importer):
 
 
 class AssertionRewritingLoader(importlib.machinery.SourceFileLoader):
-    # in Python 3.4, implementing get_code won't be necessary -
-    # I could just override source_to_code.
-    # When 3.4 gets officially released, maybe wrap this def in an if
     def get_code(self, fullname):
-        source = self.get_source(fullname)
-        path = self.get_filename(fullname)
-        return self.source_to_code(source, path)
+        code, _ = self.get_rewritten_code(write_cache=not sys.dont_write_bytecode)
+        return code
+
+    def get_rewritten_code(self, write_cache):
+        """Returns the rewritten code, and whether it came from the cache of previously-rewritten code."""
+        source = self.get_data(self.path)
+        if b'assert' not in source:
+            # nothing to rewrite, so the standard loader (and its usual .pyc files) will do
+            from_cache = standard_code_is_cached(self.path, source)
+            return super().get_code(self.name), from_cache
+
+        # the cache is checked before doing anything with the source, so a warm import costs a hash and a read
+        cache_path = importlib.util.cache_from_source(self.path, optimization='contexts')
+        header = cache_header(source, self.path)
+        code = read_cached_code(cache_path, header)
+        if code is not None:
+            return code, True
+
+        code = rewrite(source, self.path)
+        if write_cache:
+            write_cached_code(cache_path, header, code)
+        return code, False
 
     def source_to_code(self, source, path='<string>'):
-        parsed = ast.parse(source)
-
-        transformer = AssertionRewriter()
-        transformer.visit(parsed)
-
-        return compile(parsed, path, 'exec', dont_inherit=True, optimize=0)
+        return rewrite(source, path)
 
     def module_repr(self, module):
         return '<module {!r} from {!r}>'.format(module.__name__, module.__file__)
 
 
+def rewrite(source, path):
+    parsed = ast.parse(source)
+
+    assert_lines = find_assert_lines(parsed)
+    if assert_lines:
+        transformer = AssertionRewriter(assert_lines)
+        transformer.visit(parsed)
+
+    return compile(parsed, path, 'exec', dont_inherit=True, optimize=0)
+
+
+def find_assert_lines(tree):
+    """Returns the (sorted) line numbers of the assert statements in the parsed module."""
+    return sorted(node.lineno for node in ast.walk(tree) if isinstance(node, ast.Assert))
+
+
+def cache_header(source, path):
+    """
+    Rewritten code is only reused if it was rewritten from the same source at the same path,
+    by the same version of Python and of the rewriter.
+    """
+    return b''.join([
+        importlib.util.MAGIC_NUMBER,
+        REWRITER_VERSION.to_bytes(4, 'little'),
+        importlib.util.source_hash(source),
+        importlib.util.source_hash(path.encode('utf-8'))
+    ])
+
+
+def read_cached_code(cache_path, header):
+    try:
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(header):
+        return None
+    try:
+        return marshal.loads(data[len(header):])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def standard_code_is_cached(path, source):
+    """Whether the standard loader has a .pyc file for the source, which it will use rather than compiling it again."""
+    try:
+        with open(importlib.util.cache_from_source(path), 'rb') as f:
+            header = f.read(16)
+        stat = os.stat(path)
+    except (OSError, NotImplementedError):
+        return False
+    if len(header) < 16 or not header.startswith(importlib.util.MAGIC_NUMBER):
+        return False
+    # see PEP 552: the .pyc is checked against either a hash of the source, or its modification time and size
+    flags = int.from_bytes(header[4:8], 'little')
+    if flags & 0b1:
+        return header[8:16] == importlib.util.source_hash(source)
+    mtime = int.from_bytes(header[8:12], 'little')
+    size = int.from_bytes(header[12:16], 'little')
+    return mtime == int(stat.st_mtime) & 0xFFFFFFFF and size == stat.st_size & 0xFFFFFFFF
+
+
+def write_cached_code(cache_path, header, code):
+    # write to a temporary file and then move it into place, so that another process
+    # importing the same file never sees a half-written cache
+    temp_path = '{}.{}'.format(cache_path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(header + marshal.dumps(code))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # not being able to cache the code isn't a reason to fail the import
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
 class AssertionRewriter(ast.NodeTransformer):
+    def __init__(self, assert_lines=None):
+        self.assert_lines = assert_lines
+
+    def visit(self, node):
+        # don't bother descending into functions (or any other statements) which contain no assertions
+        if self.assert_lines is not None and not self.contains_assert(node):
+            return node
+        return super().visit(node)
+
+    def contains_assert(self, node):
+        start = getattr(node, 'lineno', None)
+        end = getattr(node, 'end_lineno', None)
+        if start is None or end is None:
+            return True
+        i = bisect.bisect_left(self.assert_lines, start)
+        return i < len(self.assert_lines) and self.assert_lines[i] <= end
+
     def visit_Assert(self, assert_node):
         if assert_node.msg is not None:
             return assert_node
@@ -0,0 +1,78 @@
+from ... import core
+from ..caching import CollectionCache
+from ..listing import TestLister
+from ..parallel import ProcessPoolRunner
+from ..scheduling import class_key
+from . import resolve_filename
+from .static import load_stand_in_module
+
+
+class LazyImporter(object):
+    collection_cache = None
+
+    @classmethod
+    def locate(cls):
+        return (TestLister, ProcessPoolRunner)
+
+    def setup_parser(self, parser):
+        parser.add_argument('--lazy-import',
+                            action='store_true',
+                            dest='lazy_import',
+                            default=False,
+                            help="Read the test files without importing them to find out which tests have been selected "
+                                 "(for example by --shard), and only import the modules containing those tests.")
+
+    def initialise(self, args, env):
+        self.locations = {}
+        self.importing = False
+        return args.lazy_import
+
+    def request_plugins(self):
+        returned_plugins = yield [CollectionCache]
+        self.collection_cache = returned_plugins.get(CollectionCache)
+
+    def import_module(self, location, name):
+        if self.importing:
+            # let the other plugins do the real import
+            return None
+        self.locations[name] = location
+        filename = resolve_filename(location, name)
+        outline = self.collection_cache.read_outline(filename) if self.collection_cache is not None else None
+        return load_stand_in_module(filename, name, outline)
+
+    def run_suites(self, suites):
+        """Swap each stand-in for the real module, unless none of its classes were selected."""
+        real_modules = {}
+        replacements = []
+        for suite in suites:
+            if not suite.classes:
+                continue
+            for package_name in parent_package_names(suite.name):
+                if package_name in self.locations and package_name not in real_modules:
+                    real_modules[package_name] = self.import_for_real(suite, package_name)
+
+            module = self.import_for_real(suite, suite.name)
+            real_modules[suite.name] = module
+            if module is None:
+                continue
+            selected = {class_key(cls) for cls in suite.classes}
+            real_suite = core.Suite(module, suite.plugin_composite)
+            real_suite.classes[:] = [cls for cls in real_suite.classes if class_key(cls) in selected]
+            replacements.append(real_suite)
+        suites[:] = replacements
+
+    def import_for_real(self, suite, name):
+        self.importing = True
+        try:
+            with suite.exception_handler.importing(self.locations[name], name):
+                return suite.plugin_composite.import_module(self.locations[name], name)
+        finally:
+            self.importing = False
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+def parent_package_names(module_name):
+    parts = module_name.split('.')
+    return ['.'.join(parts[:i]) for i in range(1, len(parts))]
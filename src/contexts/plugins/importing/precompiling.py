@@ -0,0 +1,64 @@
+import concurrent.futures
+import os
+import sys
+import types
+from ..reporting import StreamReporter
+from ..sharding import ShardSelector
+from . import resolve_filename
+from .assertion_rewriting import AssertionRewritingLoader
+
+
+class Precompiler(StreamReporter):
+    @classmethod
+    def locate(cls):
+        # every test file gets precompiled, not just the ones in this shard
+        return (None, ShardSelector)
+
+    def setup_parser(self, parser):
+        parser.add_argument('--precompile',
+                            action='store_true',
+                            dest='precompile',
+                            default=False,
+                            help="Rewrite the assertions in the test files and cache the resulting bytecode, "
+                                 "without running any tests. Uses --processes worker processes, if given.")
+
+    def initialise(self, args, env):
+        self.filenames = []
+        self.processes = getattr(args, 'processes', None) or os.cpu_count()
+        return args.precompile
+
+    def import_module(self, location, name):
+        # make a note of the file, but don't run it
+        self.filenames.append(resolve_filename(location, name))
+        return types.ModuleType(name)
+
+    def run_suites(self, suites):
+        if not suites:
+            return
+        plugin_composite = suites[0].plugin_composite
+        del suites[:]
+        # packages get imported once for each of their modules
+        filenames = list(dict.fromkeys(self.filenames))
+
+        up_to_date = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.processes) as executor:
+            futures = [executor.submit(precompile, f) for f in filenames]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    up_to_date += future.result()
+                except Exception as e:
+                    plugin_composite.unexpected_error(e)
+
+        self._print("Precompiled {} test files ({} were already up to date)".format(len(filenames), up_to_date))
+
+
+def precompile(filename):
+    module_name = os.path.splitext(os.path.basename(filename))[0]
+    loader = AssertionRewritingLoader(module_name, filename)
+    # files with nothing to rewrite get the standard .pyc file, which is only written if bytecode can be written
+    dont_write_bytecode, sys.dont_write_bytecode = sys.dont_write_bytecode, False
+    try:
+        _, from_cache = loader.get_rewritten_code(write_cache=True)
+    finally:
+        sys.dont_write_bytecode = dont_write_bytecode
+    return from_cache
@@ -0,0 +1,107 @@
+import ast
+import os
+import types
+from ..identification import decorators
+
+
+CLASS_DECORATORS = {
+    'spec': decorators.spec,
+    'context': decorators.context,
+    'scenario': decorators.scenario
+}
+METHOD_DECORATORS = {
+    'examples': decorators.examples,
+    'setup': decorators.setup,
+    'action': decorators.action,
+    'assertion': decorators.assertion,
+    'teardown': decorators.teardown
+}
+
+
+def load_stand_in_module(filename, module_name, outline=None):
+    """
+    Build a module which looks like the module in the file, without running any of its code.
+    It contains a stand-in for each of the module-level classes, with stand-ins for their methods,
+    so that the usual plugins can identify the tests in it by their names and decorators.
+    The stand-ins don't do anything when they're called.
+    The file is only read if its outline (see read_outline) isn't given.
+    """
+    if outline is None:
+        outline = read_outline(filename)
+
+    module = types.ModuleType(module_name)
+    module.__file__ = filename
+    if os.path.basename(filename) == '__init__.py':
+        module.__path__ = [os.path.dirname(filename)]
+
+    for class_outline in outline:
+        setattr(module, class_outline['name'], stand_in_class(class_outline, module))
+    return module
+
+
+def read_outline(filename):
+    """
+    The module-level classes in the file: the names of each class, its bases and its decorators,
+    and the names and decorators of its methods. It's made of lists, dicts and strings, so it can be saved as JSON.
+    """
+    with open(filename, 'rb') as f:
+        tree = ast.parse(f.read(), filename)
+    return [
+        {
+            'name': node.name,
+            'bases': [base.id for base in node.bases if isinstance(base, ast.Name)],
+            'decorators': decorator_names(node),
+            'methods': [
+                {'name': function_node.name, 'decorators': decorator_names(function_node)}
+                for function_node in node.body if isinstance(function_node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+        }
+        for node in tree.body if isinstance(node, ast.ClassDef)
+    ]
+
+
+def stand_in_class(class_outline, module):
+    # only superclasses defined earlier in the same file can be followed
+    bases = tuple(
+        getattr(module, name) for name in class_outline['bases']
+        if isinstance(getattr(module, name, None), type)
+    )
+    qualname = class_outline['name']
+    dct = {'__module__': module.__name__, '__qualname__': qualname}
+    for method_outline in class_outline['methods']:
+        dct[method_outline['name']] = stand_in_method(method_outline, module.__name__, qualname)
+
+    cls = type(class_outline['name'], bases or (object,), dct)
+    for name in class_outline['decorators']:
+        if name in CLASS_DECORATORS:
+            CLASS_DECORATORS[name](cls)
+    return cls
+
+
+def stand_in_method(method_outline, module_name, class_qualname):
+    def stand_in(*args, **kwargs):
+        pass
+    stand_in.__name__ = method_outline['name']
+    stand_in.__qualname__ = class_qualname + '.' + method_outline['name']
+    stand_in.__module__ = module_name
+
+    names = method_outline['decorators']
+    for name in names:
+        if name in METHOD_DECORATORS:
+            METHOD_DECORATORS[name](stand_in)
+    if 'classmethod' in names:
+        return classmethod(stand_in)
+    if 'staticmethod' in names:
+        return staticmethod(stand_in)
+    return stand_in
+
+
+def decorator_names(node):
+    # '@contexts.setup' and '@setup' both count as 'setup'
+    names = []
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Name):
+            names.append(decorator.id)
+        elif isinstance(decorator, ast.Attribute):
+            names.append(decorator.attr)
+    return names
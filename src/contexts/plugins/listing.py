@@ -0,0 +1,49 @@
+from .. import core
+from .caching import CollectionCache
+from .importing import resolve_filename
+from .importing.assertion_rewriting import AssertionRewritingImporter
+from .importing.static import load_stand_in_module
+from .reporting import StreamReporter
+from .sharding import ShardSelector
+
+
+class TestLister(StreamReporter):
+    collection_cache = None
+
+    @classmethod
+    def locate(cls):
+        return (ShardSelector, AssertionRewritingImporter)
+
+    def setup_parser(self, parser):
+        parser.add_argument('--collect-only',
+                            action='store_true',
+                            dest='collect_only',
+                            default=False,
+                            help="List the test classes and assertions which would be run, without running them. "
+                                 "The test files are read without being imported.")
+
+    def initialise(self, args, env):
+        return args.collect_only
+
+    def request_plugins(self):
+        returned_plugins = yield [CollectionCache]
+        self.collection_cache = returned_plugins.get(CollectionCache)
+
+    def import_module(self, location, name):
+        filename = resolve_filename(location, name)
+        outline = self.collection_cache.read_outline(filename) if self.collection_cache is not None else None
+        return load_stand_in_module(filename, name, outline)
+
+    def run_suites(self, suites):
+        for suite in suites:
+            self._print(suite.name)
+            for cls in suite.classes:
+                self._print('    ' + cls.__qualname__)
+                try:
+                    test_class = core.TestClass(cls, suite.plugin_composite)
+                except Exception as e:
+                    suite.plugin_composite.unexpected_error(e)
+                    continue
+                for assertion in test_class.unbound_assertions:
+                    self._print('        ' + assertion.__name__)
+        del suites[:]
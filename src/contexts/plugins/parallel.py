@@ -0,0 +1,428 @@
+import asyncio
+import concurrent.futures
+import inspect
+import multiprocessing
+import pickle
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from io import StringIO
+from .. import core
+from ..errors import RemoteError
+from ..plugin_interface import NO_EXAMPLE, replaying_event
+from .capturing import routing_output, start_capturing, stop_capturing
+from .reporting import format_exception
+from .scheduling import DurationScheduler, Stopwatch, Timings, class_key
+
+
+PROGRESS_HOOKS = frozenset([
+    'test_run_started', 'test_run_ended',
+    'suite_started', 'suite_ended',
+    'test_class_started', 'test_class_ended', 'test_class_errored',
+    'context_started', 'context_timed', 'context_ended', 'context_errored',
+    'assertion_started', 'assertion_passed', 'assertion_failed', 'assertion_errored',
+    'unexpected_error'
+])
+OUTPUT_STREAMS = frozenset(['stdout', 'stderr'])
+
+
+class ProcessPoolRunner(object):
+    @classmethod
+    def locate(cls):
+        from .listing import TestLister
+        return (TestLister, None)
+
+    def __init__(self):
+        self.scheduler = None
+
+    def setup_parser(self, parser):
+        parser.add_argument('--processes',
+                            action='store',
+                            dest='processes',
+                            type=int,
+                            default=None,
+                            metavar='N',
+                            help="Run test modules in N worker processes.")
+
+    def initialise(self, args, env):
+        self.processes = args.processes
+        if self.processes is None or self.processes <= 1:
+            return False
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError("--processes is not supported on this platform")
+        return True
+
+    def request_plugins(self):
+        returned_plugins = yield [DurationScheduler]
+        self.scheduler = returned_plugins.get(DurationScheduler)
+
+    def run_suites(self, suites):
+        if not suites:
+            return
+        replayer = Replayer(suites, suites[0].plugin_composite)
+
+        # anything left in the buffers would get written once by each worker
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('fork'),
+                    initializer=initialise_worker,
+                    initargs=(list(suites),)) as executor:
+                futures = [executor.submit(run_suite_in_worker, i) for i in range(len(suites))]
+                for future in concurrent.futures.as_completed(futures):
+                    events, timings = future.result()
+                    replayer.replay(events)
+                    # the timings seen by the scheduler during the replay are meaningless
+                    if self.scheduler is not None:
+                        self.scheduler.record_timings(timings)
+        finally:
+            del suites[:]
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+class AsyncioRunner(object):
+    @classmethod
+    def locate(cls):
+        return (ProcessPoolRunner, None)
+
+    def __init__(self):
+        self.scheduler = None
+
+    def setup_parser(self, parser):
+        parser.add_argument('--async-concurrency',
+                            action='store',
+                            dest='async_concurrency',
+                            type=int,
+                            default=None,
+                            metavar='N',
+                            help="Run up to N test classes at a time on the event loop. "
+                                 "Useful when most of the tests' time is spent awaiting I/O.")
+
+    def initialise(self, args, env):
+        self.concurrency = args.async_concurrency
+        return self.concurrency is not None and self.concurrency > 1
+
+    def request_plugins(self):
+        returned_plugins = yield [DurationScheduler]
+        self.scheduler = returned_plugins.get(DurationScheduler)
+
+    def run_suites(self, suites):
+        if not suites:
+            return
+        try:
+            with routing_output():
+                core.run_coroutine(self.run_concurrently(suites))
+        finally:
+            del suites[:]
+
+    async def run_concurrently(self, suites):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        replayer = Replayer([], suites[0].plugin_composite)
+        for finished in asyncio.as_completed([self.run_suite(s, semaphore) for s in suites]):
+            suite, recorders, duration = await finished
+            with suite.exception_handler.run_suite(suite):
+                for recorder in recorders:
+                    replayer.replay(recorder.events)
+            if self.scheduler is not None:
+                for recorder in recorders:
+                    self.scheduler.record_timings(recorder.timings)
+                self.scheduler.record_timings(Timings({suite.module.__name__: duration}))
+
+    async def run_suite(self, suite, semaphore):
+        recorders = [EventRecorder(suite.plugin_composite, IdentityReferencer()) for _ in suite.classes]
+        start_time = time.perf_counter()
+        await asyncio.gather(*[self.run_class(cls, r, semaphore) for cls, r in zip(suite.classes, recorders)])
+        return suite, recorders, time.perf_counter() - start_time
+
+    async def run_class(self, cls, recorder, semaphore):
+        async with semaphore:
+            with recorder.capturing_output():
+                try:
+                    await core.TestClass(cls, recorder).run_async()
+                except Exception as e:
+                    recorder.unexpected_error(e)
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+class ThreadPoolRunner(object):
+    @classmethod
+    def locate(cls):
+        return (ProcessPoolRunner, None)
+
+    def __init__(self):
+        self.scheduler = None
+
+    def setup_parser(self, parser):
+        parser.add_argument('--threads',
+                            action='store',
+                            dest='threads',
+                            type=int,
+                            default=None,
+                            metavar='N',
+                            help="Run test classes in N threads. "
+                                 "Useful when most of the tests' time is spent waiting for I/O.")
+
+    def initialise(self, args, env):
+        self.threads = args.threads
+        return self.threads is not None and self.threads > 1
+
+    def request_plugins(self):
+        returned_plugins = yield [DurationScheduler]
+        self.scheduler = returned_plugins.get(DurationScheduler)
+
+    def run_suites(self, suites):
+        if not suites:
+            return
+        replayer = Replayer([], suites[0].plugin_composite)
+        try:
+            with routing_output(), concurrent.futures.ThreadPoolExecutor(self.threads) as executor:
+                try:
+                    # submit everything up front, but report the results in order, one whole suite at a time,
+                    # so that the output from different threads is never interleaved
+                    submitted = []
+                    for suite in suites:
+                        recorders = [EventRecorder(suite.plugin_composite, IdentityReferencer()) for _ in suite.classes]
+                        futures = [executor.submit(self.run_class, cls, r) for cls, r in zip(suite.classes, recorders)]
+                        submitted.append((suite, recorders, futures))
+
+                    for suite, recorders, futures in submitted:
+                        with suite.exception_handler.run_suite(suite):
+                            for recorder, future in zip(recorders, futures):
+                                future.result()
+                                replayer.replay(recorder.events)
+                        if self.scheduler is not None:
+                            self.record_timings(suite, recorders)
+                finally:
+                    self.close_event_loops(executor)
+        finally:
+            del suites[:]
+
+    def run_class(self, cls, recorder):
+        with recorder.capturing_output():
+            try:
+                core.TestClass(cls, recorder).run()
+            except Exception as e:
+                recorder.unexpected_error(e)
+
+    def close_event_loops(self, executor):
+        # Each thread keeps its event loop for all the classes it runs, and closes it once they've all finished.
+        # The barrier holds each thread until all the others have picked up a job too,
+        # so every thread gets exactly one of them.
+        barrier = threading.Barrier(self.threads)
+
+        def close_event_loop():
+            barrier.wait()
+            core.close_event_loop()
+
+        for future in [executor.submit(close_event_loop) for _ in range(self.threads)]:
+            future.result()
+
+    def record_timings(self, suite, recorders):
+        # the classes ran side by side, so the time taken to replay the suite is meaningless.
+        # The module's own timing is how long it would have taken on its own.
+        for recorder in recorders:
+            self.scheduler.record_timings(recorder.timings)
+        duration = sum(sum(r.timings.classes.values()) for r in recorders)
+        self.scheduler.record_timings(Timings({suite.module.__name__: duration}))
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+# the suites are inherited by the forked workers rather than pickled
+worker_suites = []
+
+
+def initialise_worker(suites):
+    worker_suites[:] = suites
+
+
+def run_suite_in_worker(index):
+    suite = worker_suites[index]
+    recorder = EventRecorder(suite.plugin_composite, SuiteReferencer(index, suite))
+
+    suite.plugin_composite = recorder
+    suite.exception_handler = core.ExceptionHandler(recorder)
+    with routing_output(), recorder.capturing_output():
+        try:
+            suite.run()
+        except Exception as e:
+            recorder.unexpected_error(e)
+    return recorder.events, recorder.timings
+
+
+class EventRecorder(object):
+    """
+    Stands in for a PluginComposite while a suite is run out of sight of the real plugins.
+    Progress notifications (and anything the tests print) are recorded so they can
+    be replayed later; all other hooks are passed straight through to the real plugins.
+    """
+    def __init__(self, plugin_composite, referencer):
+        self.plugin_composite = plugin_composite
+        self.referencer = referencer
+        self.events = []
+        self.timings = Timings()
+        self.stopwatch = Stopwatch()
+        self.stdout = StringIO()
+        self.stderr = StringIO()
+
+    def __getattr__(self, name):
+        if name not in PROGRESS_HOOKS:
+            return getattr(self.plugin_composite, name)
+
+        def record(*args):
+            # the reporters are told when each event happened, rather than when it was replayed
+            now = time.perf_counter_ns()
+            self.time(name, *args)
+            self.record_output()
+            self.events.append((name, tuple(self.referencer.reference(a) for a in args), now))
+        return record
+
+    def time(self, name, *args):
+        if name in ('suite_started', 'test_class_started'):
+            self.stopwatch.start(args[0])
+        elif name == 'suite_ended':
+            self.timings.modules[args[0].__name__] = self.stopwatch.stop(args[0])
+        elif name in ('test_class_ended', 'test_class_errored'):
+            self.timings.classes[class_key(args[0])] = self.stopwatch.stop(args[0])
+
+    @contextmanager
+    def capturing_output(self):
+        token = start_capturing(stdout=self.stdout, stderr=self.stderr)
+        try:
+            yield
+        finally:
+            stop_capturing(token)
+            self.record_output()
+
+    def record_output(self):
+        for stream_name in sorted(OUTPUT_STREAMS):
+            stream = getattr(self, stream_name)
+            if stream.getvalue():
+                self.events.append((stream_name, (stream.getvalue(),), time.perf_counter_ns()))
+                stream.seek(0)
+                stream.truncate()
+
+
+class Replayer(object):
+    """Sends events recorded by an EventRecorder to the real plugins."""
+    def __init__(self, suites, plugin_composite):
+        self.suites = list(suites)
+        self.plugin_composite = plugin_composite
+
+    def replay(self, events):
+        for name, args, time_ns in events:
+            if name in OUTPUT_STREAMS:
+                getattr(sys, name).write(*args)
+            else:
+                args = [self.resolve(a) for a in args]
+                with replaying_event(time_ns):
+                    getattr(self.plugin_composite, name)(*args)
+
+    def resolve(self, arg):
+        if isinstance(arg, Reference):
+            return arg.resolve(self.suites)
+        return arg
+
+
+class IdentityReferencer(object):
+    """For events which are replayed in the process that recorded them, so don't need to be pickled."""
+    def reference(self, obj):
+        return obj
+
+
+class SuiteReferencer(object):
+    """Turns the arguments to progress notifications into something that can be pickled."""
+    def __init__(self, index, suite):
+        self.index = index
+        self.class_indices = {id(cls): i for i, cls in enumerate(suite.classes)}
+
+    def reference(self, obj):
+        if obj is NO_EXAMPLE:
+            return NoExampleReference()
+        if isinstance(obj, BaseException):
+            return RemoteError(str(obj), format_exception(obj))
+        if isinstance(obj, types.ModuleType):
+            return ModuleReference(self.index)
+        if inspect.isclass(obj):
+            return ClassReference(self.index, self.class_indices.get(id(obj)), obj.__name__)
+        if isinstance(obj, types.MethodType):
+            owner = obj.__self__ if inspect.isclass(obj.__self__) else type(obj.__self__)
+            return FunctionReference(self.reference(owner), obj.__name__)
+        if isinstance(obj, types.FunctionType):
+            return FunctionReference(None, obj.__name__)
+        return portable(obj)
+
+
+class Reference(object):
+    def resolve(self, suites):
+        raise NotImplementedError
+
+
+class NoExampleReference(Reference):
+    def resolve(self, suites):
+        return NO_EXAMPLE
+
+
+class ModuleReference(Reference):
+    def __init__(self, suite_index):
+        self.suite_index = suite_index
+
+    def resolve(self, suites):
+        return suites[self.suite_index].module
+
+
+class ClassReference(Reference):
+    def __init__(self, suite_index, class_index, name):
+        self.suite_index = suite_index
+        self.class_index = class_index
+        self.name = name
+
+    def resolve(self, suites):
+        if self.class_index is None:
+            return type(self.name, (), {})
+        return suites[self.suite_index].classes[self.class_index]
+
+
+class FunctionReference(Reference):
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def resolve(self, suites):
+        if self.owner is not None:
+            func = getattr(self.owner.resolve(suites), self.name, None)
+            if func is not None:
+                return func
+        return Stringified(self.name, self.name, self.name)
+
+
+class Stringified(object):
+    """Stands in for an object which could not be pickled."""
+    def __init__(self, name, string, representation):
+        self.__name__ = name
+        self.string = string
+        self.representation = representation
+
+    def __str__(self):
+        return self.string
+
+    def __repr__(self):
+        return self.representation
+
+
+def portable(obj):
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return Stringified(type(obj).__name__, str(obj), repr(obj))
+    return obj
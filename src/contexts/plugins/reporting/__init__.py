@@ -1,15 +1,50 @@
 import sys
+import time
 import traceback
+from ...errors import RemoteError
 from ...plugin_interface import PluginInterface, NO_EXAMPLE
 from .. import cleverly_get_words
 
 
 class StreamReporter(PluginInterface):
+    # When the output isn't going to a terminal (for example, it's being piped into a CI server's log),
+    # flushing the stream after every dot would mean a system call for every assertion.
+    # Instead the output is flushed at most this often (in seconds) while something is being printed
+    # or a context is starting (so the output doesn't stop short of a slow test),
+    # whenever something goes wrong or a verbosely-reported context starts, and at the end of the run.
+    flush_interval = 0.5
+    last_flush = 0.0
+    interactive_stream = None
+    interactive = False
+
     def __init__(self, stream=sys.stdout):
         self.stream = stream
 
-    def _print(self, string, end='\n'):
-        print(string, end=end, file=self.stream, flush=True)
+    def _print(self, string, end='\n', flush=False):
+        print(string, end=end, file=self.stream)
+        if flush or self.is_interactive():
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def test_run_ended(self):
+        self.flush()
+
+    def flush(self):
+        self.stream.flush()
+        self.last_flush = time.monotonic()
+
+    def flush_if_due(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def is_interactive(self):
+        # isatty is a system call too, so only ask once per stream (the stream can be swapped)
+        if self.interactive_stream is not self.stream:
+            isatty = getattr(self.stream, 'isatty', None)
+            self.interactive = isatty is not None and isatty()
+            self.interactive_stream = self.stream
+        return self.interactive
 
     def __eq__(self, other):
         return type(self) == type(other) and self.stream == other.stream
@@ -72,5 +107,7 @@ def context_name(name, example):
 
 
 def format_exception(exception):
+    if isinstance(exception, RemoteError):
+        return exception.formatted
     ret = traceback.format_exception(type(exception), exception, exception.__traceback__)
     return ''.join(ret).strip().split('\n')
@@ -2,6 +2,7 @@ import argparse
 import datetime
 import sys
 from io import StringIO
+from ..capturing import start_capturing, stop_capturing
 from . import StreamReporter, context_name, format_exception, make_readable
 
 
@@ -13,6 +14,10 @@ class DotsReporter(StreamReporter):
     def initialise(self, args, env):
         return args.verbosity == 'normal'
 
+    def context_started(self, *args, **kwargs):
+        # the dots printed so far shouldn't wait in the buffer for as long as the next test takes
+        self.flush_if_due()
+
     def assertion_passed(self, *args, **kwargs):
         self.dot()
 
@@ -32,16 +37,16 @@ class DotsReporter(StreamReporter):
         self.E()
 
     def test_run_ended(self):
-        self._print('')
+        self._print('', flush=True)
 
     def dot(self):
         self._print('.', end='')
 
     def F(self):
-        self._print('F', end='')
+        self._print('F', end='', flush=True)
 
     def E(self):
-        self._print('E', end='')
+        self._print('E', end='', flush=True)
 
 
 class VerboseReporter(StreamReporter):
@@ -66,15 +71,18 @@ class VerboseReporter(StreamReporter):
         return args.verbosity != "quiet"
 
     def context_started(self, cls, example):
-        self._print(context_name(cls.__name__, example))
+        # a slow test shouldn't leave the name of the one before it as the last thing in the log
+        self._print(context_name(cls.__name__, example), flush=True)
 
     def context_errored(self, name, example, exception):
         for line in format_exception(exception):
             self._print('  ' + line)
+        self.flush()
 
     def test_class_errored(self, cls, exception):
         for line in format_exception(exception):
             self._print(line)
+        self.flush()
 
     def assertion_passed(self, func):
         self._print('  PASS: ' + make_readable(func.__name__))
@@ -83,15 +91,18 @@ class VerboseReporter(StreamReporter):
         self._print('  FAIL: ' + make_readable(func.__name__))
         for line in format_exception(exception):
             self._print('    ' + line)
+        self.flush()
 
     def assertion_errored(self, func, exception):
         self._print('  ERROR: ' + make_readable(func.__name__))
         for line in format_exception(exception):
             self._print('    ' + line)
+        self.flush()
 
     def unexpected_error(self, exception):
         for line in format_exception(exception):
             self._print(line)
+        self.flush()
 
 
 class FinalCountsReporter(StreamReporter):
@@ -149,6 +160,7 @@ class FinalCountsReporter(StreamReporter):
         else:
             self._print('PASSED!')
             self._print(self.success_numbers())
+        self.flush()
 
     def success_numbers(self):
         return "{}, {}".format(
@@ -184,15 +196,14 @@ class StdOutCapturingReporter(StreamReporter):
         return ("{:-^" + num + "}").format(string)
 
     def context_started(self, name, example):
-        self.real_stdout = sys.stdout
         self.buffer = StringIO()
-        sys.stdout = self.buffer
+        self.capture_token = start_capturing(stdout=self.buffer)
 
     def context_ended(self, name, example):
-        sys.stdout = self.real_stdout
+        stop_capturing(self.capture_token)
 
     def context_errored(self, name, example, exception):
-        sys.stdout = self.real_stdout
+        stop_capturing(self.capture_token)
         self.output_buffer(2)
 
     def assertion_failed(self, func, exception):
@@ -228,7 +239,7 @@ class TimedReporter(StreamReporter):
     def print_time(self):
         total_secs = (self.end_time - self.start_time).total_seconds()
         rounded = round(total_secs, 1)
-        self._print("({} seconds)".format(rounded))
+        self._print("({} seconds)".format(rounded), flush=True)
 
 
 class Colouriser(StreamReporter):
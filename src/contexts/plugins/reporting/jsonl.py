@@ -0,0 +1,142 @@
+import io
+import json
+
+from . import context_name, format_exception, make_readable
+from ..scheduling import class_key
+from ...plugin_interface import NO_EXAMPLE, event_time_ns
+
+
+class JsonLinesReporter(object):
+    """
+    Writes a JSON object to a file for each event in the test run, one per line, as the events happen.
+    Every record has the name of the event, the ID of the thing it's about,
+    and the time in nanoseconds since the reporter was set up.
+    Records for the end of something also say how long it took.
+    The examples of a parametrised test are told apart by their position: 'test_module.WhenSomethingHappens[3]'.
+    """
+    def __init__(self):
+        self.path = None
+        self.file = None
+        self.origin = event_time_ns()
+        self.started = {}
+        self.context_id = None
+        self.examples_started = 0
+
+    def setup_parser(self, parser):
+        parser.add_argument('--jsonl',
+                            action='store',
+                            dest='jsonl_path',
+                            default=None,
+                            metavar='PATH',
+                            help="Write a JSON record for each event in the test run to PATH, one per line.")
+
+    def initialise(self, args, env):
+        self.path = args.jsonl_path
+        self.origin = event_time_ns()
+        return self.path is not None
+
+    def test_run_started(self):
+        self.start('test_run_started', None)
+
+    def test_run_ended(self):
+        self.end('test_run_ended', None)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def suite_started(self, module):
+        self.start('suite_started', module.__name__)
+
+    def suite_ended(self, module):
+        self.end('suite_ended', module.__name__)
+
+    def test_class_started(self, cls):
+        self.examples_started = 0
+        self.start('test_class_started', class_key(cls))
+
+    def test_class_ended(self, cls):
+        self.end('test_class_ended', class_key(cls))
+
+    def test_class_errored(self, cls, exception):
+        self.end('test_class_errored', class_key(cls), **exception_fields(exception))
+        self.flush()
+
+    def context_started(self, cls, example):
+        self.context_id = context_id(cls, example, self.examples_started)
+        self.examples_started += 1
+        self.start('context_started', self.context_id, name=context_name(cls.__name__, example))
+
+    def context_timed(self, cls, example, timings):
+        self.write('context_timed', self.context_id, phases_ns=timings)
+
+    def context_ended(self, cls, example):
+        self.end('context_ended', self.context_id)
+        self.flush()
+
+    def context_errored(self, cls, example, exception):
+        self.end('context_errored', self.context_id, **exception_fields(exception))
+        self.flush()
+
+    def assertion_started(self, func):
+        self.start('assertion_started', self.assertion_id(func), name=make_readable(func.__name__))
+
+    def assertion_passed(self, func):
+        self.end('assertion_passed', self.assertion_id(func))
+
+    def assertion_failed(self, func, exception):
+        self.end('assertion_failed', self.assertion_id(func), **exception_fields(exception))
+
+    def assertion_errored(self, func, exception):
+        self.end('assertion_errored', self.assertion_id(func), **exception_fields(exception))
+
+    def unexpected_error(self, exception):
+        self.write('unexpected_error', None, **exception_fields(exception))
+        self.flush()
+
+    def assertion_id(self, func):
+        return '{}::{}'.format(self.context_id, func.__name__)
+
+    def start(self, event, test_id, **fields):
+        # only the things which are currently running are remembered, so memory use doesn't grow with the size of the run
+        self.started[running_key(event, test_id)] = self.write(event, test_id, **fields)
+
+    def end(self, event, test_id, **fields):
+        now = event_time_ns()
+        started = self.started.pop(running_key(event, test_id), None)
+        if started is not None:
+            fields['duration_ns'] = now - started
+        self.write(event, test_id, now, **fields)
+
+    def write(self, event, test_id, now=None, **fields):
+        if now is None:
+            now = event_time_ns()
+        record = {'event': event, 'id': test_id, 'time_ns': now - self.origin}
+        record.update(fields)
+        if self.file is None:
+            self.file = io.open(self.path, 'w', encoding='utf-8')
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        return now
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+def context_id(cls, example, index):
+    # the example's repr may not be the same from one run to the next (it may contain a memory address)
+    if example is NO_EXAMPLE:
+        return class_key(cls)
+    return '{}[{}]'.format(class_key(cls), index)
+
+
+def running_key(event, test_id):
+    # a context without examples has the same ID as its class, so they're told apart by the kind of event
+    return (event.rpartition('_')[0], test_id)
+
+
+def exception_fields(exception):
+    formatted = format_exception(exception)
+    return {'message': formatted[-1], 'exception': '\n'.join(formatted)}
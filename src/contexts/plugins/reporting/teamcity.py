@@ -1,5 +1,6 @@
-import sys
 from io import StringIO
+import re
+from ..capturing import start_capturing, stop_capturing
 from . import cli
 from . import StreamReporter, context_name, format_exception, make_readable
 from .. import argv_forwarder
@@ -24,154 +25,149 @@ class TeamCityReporter(StreamReporter):
         return True
 
     def test_run_ended(self):
+        self.flush()
         return True
 
     def test_class_started(self, cls):
-        self.teamcity_print("testClassStarted", name=cls.__name__)
+        self.teamcity_print(teamcity_message("testClassStarted", name=cls.__name__))
         return True
 
     def test_class_ended(self, cls):
-        self.teamcity_print("testClassFinished", name=cls.__name__)
+        self.teamcity_print(teamcity_message("testClassFinished", name=cls.__name__))
         return True
 
     def test_class_errored(self, cls, exception):
-        error_summary = format_exception(exception)
-
-        self.teamcity_print("testStarted", name=cls.__name__)
         self.teamcity_print(
-            "testFailed",
-            name=cls.__name__,
-            message=error_summary[-1],
-            details='\n'.join(error_summary)
+            teamcity_message("testStarted", name=cls.__name__),
+            *self.failure_messages(cls.__name__, exception),
+            teamcity_message("testClassFinished", name=cls.__name__)
         )
-        self.teamcity_print("testFinished", name=cls.__name__)
-        self.teamcity_print("testClassFinished", name=cls.__name__)
         return True
 
     def suite_started(self, module):
-        self.teamcity_print("testSuiteStarted", name=module.__name__)
+        self.teamcity_print(teamcity_message("testSuiteStarted", name=module.__name__))
         return True
 
     def suite_ended(self, module):
-        self.teamcity_print("testSuiteFinished", name=module.__name__)
+        self.teamcity_print(teamcity_message("testSuiteFinished", name=module.__name__))
         return True
 
     def context_started(self, cls, example):
-        self.real_stdout, self.real_stderr = sys.stdout, sys.stderr
-        sys.stdout, sys.stderr = self.stdout_buffer, self.stderr_buffer = StringIO(), StringIO()
+        self.stdout_buffer, self.stderr_buffer = StringIO(), StringIO()
+        self.capture_token = start_capturing(stdout=self.stdout_buffer, stderr=self.stderr_buffer)
         self.context_name_prefix = context_name(cls.__name__, example) + ' -> '
         return True
 
     def context_ended(self, cls, example):
-        sys.stdout, sys.stderr = self.real_stdout, self.real_stderr
+        stop_capturing(self.capture_token)
         self.context_name_prefix = ''
         return True
 
     def context_errored(self, cls, example, exception):
         self.context_name_prefix = ''
         name = context_name(cls.__name__, example)
-        error_summary = format_exception(exception)
 
-        self.teamcity_print("testStarted", name=name)
-        self.output_buffers(name)
         self.teamcity_print(
-            "testFailed",
-            name=name,
-            message=error_summary[-1],
-            details='\n'.join(error_summary)
+            teamcity_message("testStarted", name=name),
+            *self.buffered_output_messages(name),
+            *self.failure_messages(name, exception)
         )
-        self.teamcity_print("testFinished", name=name)
 
-        sys.stdout, sys.stderr = self.real_stdout, self.real_stderr
+        stop_capturing(self.capture_token)
         self.failed = True
         return True
 
     def assertion_started(self, func):
         readable_name = self.context_name_prefix + make_readable(func.__name__)
-        self.teamcity_print("testStarted", name=readable_name)
+        self.teamcity_print(teamcity_message("testStarted", name=readable_name))
         return True
 
     def assertion_passed(self, func):
         name = self.context_name_prefix + make_readable(func.__name__)
-        self.output_buffers(name)
-        self.teamcity_print("testFinished", name=name)
+        self.teamcity_print(
+            *self.buffered_output_messages(name),
+            teamcity_message("testFinished", name=name)
+        )
         return True
 
     def assertion_failed(self, func, exception):
         name = self.context_name_prefix + make_readable(func.__name__)
-        error_summary = format_exception(exception)
-
-        self.output_buffers(name)
         self.teamcity_print(
-            "testFailed",
-            name=name,
-            message=error_summary[-1],
-            details='\n'.join(error_summary)
+            *self.buffered_output_messages(name),
+            *self.failure_messages(name, exception)
         )
-        self.teamcity_print("testFinished", name=name)
         self.failed = True
         return True
 
     def assertion_errored(self, func, exception):
         name = self.context_name_prefix + make_readable(func.__name__)
-        error_summary = format_exception(exception)
-
-        self.output_buffers(name)
         self.teamcity_print(
-            "testFailed",
-            name=name,
-            message=error_summary[-1],
-            details='\n'.join(error_summary)
+            *self.buffered_output_messages(name),
+            *self.failure_messages(name, exception)
         )
-        self.teamcity_print("testFinished", name=name)
         self.failed = True
         return True
 
     def unexpected_error(self, exception):
-        error_summary = format_exception(exception)
         self.context_name_prefix = ''
-        self.teamcity_print("testStarted", name='Test error')
-        self.teamcity_print("testFailed", name='Test error', message=error_summary[-1], details='\n'.join(error_summary))
-        self.teamcity_print("testFinished", name='Test error')
+        self.teamcity_print(
+            teamcity_message("testStarted", name='Test error'),
+            *self.failure_messages('Test error', exception)
+        )
         self.failed = True
         return True
 
-    def output_buffers(self, name):
+    def buffered_output_messages(self, name):
+        messages = []
         if self.stdout_buffer.getvalue():
-            self.teamcity_print(
+            messages.append(teamcity_message(
                 "testStdOut",
                 name=name,
                 out=self.stdout_buffer.getvalue()
-            )
+            ))
         if self.stderr_buffer.getvalue():
-            self.teamcity_print(
+            messages.append(teamcity_message(
                 "testStdErr",
                 name=name,
                 out=self.stderr_buffer.getvalue()
-            )
+            ))
+        return messages
+
+    def failure_messages(self, name, exception):
+        error_summary = format_exception(exception)
+        return [
+            teamcity_message(
+                "testFailed",
+                name=name,
+                message=error_summary[-1],
+                details='\n'.join(error_summary)
+            ),
+            teamcity_message("testFinished", name=name)
+        ]
 
-    def teamcity_print(self, msgName, **kwargs):
-        msg = ' '.join(teamcity_format("{}='{}'", k, v) for k, v in kwargs.items())
-        self._print("##teamcity[{} {}]".format(teamcity_format(msgName), msg))
+    def teamcity_print(self, *messages):
+        # everything one event has to say goes out in a single write
+        self._print('\n'.join(messages))
 
 
-def teamcity_format(format_string, *args):
-    strings = [escape(arg) for arg in args]
-    return format_string.format(*strings)
+def teamcity_message(message_name, **kwargs):
+    attributes = ' '.join("{}='{}'".format(k, escape(v)) for k, v in kwargs.items())
+    return "##teamcity[{} {}]".format(message_name, attributes)
+
+
+# Each replacement is a single pass in C, which is far quicker than looking at the characters one by one.
+# The pipe has to go first so that the pipes added by the other replacements aren't escaped again.
+escape_sequences = [('|', '||'), ("'", "|'"), ('[', '|['), (']', '|]'), ('\n', '|n'), ('\r', '|r')]
+non_ascii_re = re.compile(r'[^\x00-\x7f]')
 
 
 def escape(string):
-    return ''.join([escape_char(char) for char in string])
-
-
-def escape_char(char):
-    if char == '\n':
-        return '|n'
-    if char == '\r':
-        return '|r'
-    if char in "'[]|":
-        return '|' + char
-    ordinal = ord(char)
-    if ordinal >= 128:
-        return '|0x{:04x}'.format(ordinal)
-    return char
+    for char, sequence in escape_sequences:
+        string = string.replace(char, sequence)
+    if not string.isascii():
+        string = non_ascii_re.sub(escape_non_ascii, string)
+    return string
+
+
+def escape_non_ascii(match):
+    return '|0x{:04x}'.format(ord(match.group()))
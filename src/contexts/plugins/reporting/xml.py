@@ -1,21 +1,24 @@
-from datetime import datetime, timedelta
 import io
 import xml.etree.ElementTree as ET
 
 from . import context_name, format_exception, make_readable
-from ...plugin_interface import NO_EXAMPLE
+from ...plugin_interface import NO_EXAMPLE, event_time_ns
+
+
+PHASES = ['setup', 'action', 'assertions', 'teardown']
 
 
 class Result:
 
     def __init__(self, name):
         self.name = name
-        self.time = timedelta(0)
-        self.started = datetime.now()
+        self.time = 0
+        self.started = event_time_ns()
         self.children = []
+        self.phases = {}
 
     def stop(self):
-        self.time = datetime.now() - self.started
+        self.time = event_time_ns() - self.started
 
     def add_child(self, result):
         self.children.append(result)
@@ -48,26 +51,25 @@ class AssertionResult(Result):
 
     def __init__(self, name):
         super(AssertionResult, self).__init__(name)
-        self.failure = None
-        self.error = None
+        self.outcome = None
+        self.msg = None
+        self.nfo = None
 
-    @property
-    def msg(self):
-        return str(self.failure or self.error)
-
-    @property
-    def nfo(self):
-        return format_exception(self.failure or self.error)
+    def record(self, outcome, exception):
+        # format the exception straight away, so that it (and all the frames in its traceback) can be freed
+        self.outcome = outcome
+        self.msg = str(exception)
+        self.nfo = format_exception(exception)
 
     @property
     def failures(self):
-        if self.failure:
+        if self.outcome == "failure":
             return 1
         return 0
 
     @property
     def errors(self):
-        if self.error:
+        if self.outcome == "error":
             return 1
         return 0
 
@@ -77,6 +79,11 @@ class XmlReporter:
     def __init__(self):
         self.suites = Result("Test suites")
         self.path = None
+        self.writer = None
+        self.ctx = None
+        self.tests = 0
+        self.errors = 0
+        self.failures = 0
 
     def initialise(self, args, environ):
         if(args and args.xml_path):
@@ -93,12 +100,20 @@ class XmlReporter:
                             )
 
     def context_started(self, cls, example=NO_EXAMPLE):
+        self.finish_context()
         name = context_name(cls.__name__, example)
-        ctx = self.ctx = Result(name)
-        self.suites.add_child(ctx)
+        self.ctx = Result(name)
+
+    def context_timed(self, cls, example, timings):
+        self.ctx.phases = dict(timings)
 
     def context_ended(self, cls, example=NO_EXAMPLE):
         self.ctx.stop()
+        self.finish_context()
+
+    def context_errored(self, cls, example, exception):
+        self.ctx.stop()
+        self.finish_context()
 
     def assertion_started(self, func):
         self.test = AssertionResult(make_readable(func.__name__))
@@ -109,71 +124,95 @@ class XmlReporter:
 
     def assertion_failed(self, func, exception):
         self.test.stop()
-        self.test.failure = exception
+        self.test.record("failure", exception)
 
     def assertion_errored(self, func, exception):
         self.test.stop()
-        self.test.error = exception
-
-    def write_test_suites(self, builder):
-        total_tests = sum([len(suite) for suite in self.suites])
-        builder.start("testsuites", {
-            "tests": str(total_tests),
-            "errors": str(self.suites.errors),
-            "failures": str(self.suites.failures),
-            "time": "{0:.2f}".format(self.suites.time.total_seconds())
+        self.test.record("error", exception)
+
+    def finish_context(self):
+        # only the context which is currently running is kept in memory
+        if self.ctx is None:
+            return
+        if self.writer is None:
+            self.writer = XmlWriter(self.path)
+        self.writer.write_test_suite(self.ctx)
+        self.tests += len(self.ctx)
+        self.errors += self.ctx.errors
+        self.failures += self.ctx.failures
+        self.ctx = None
 
+    def test_run_ended(self):
+        self.suites.stop()
+        self.finish_context()
+        if self.writer is None:
+            self.writer = XmlWriter(self.path)
+        self.writer.finish({
+            "tests": str(self.tests),
+            "errors": str(self.errors),
+            "failures": str(self.failures),
+            "time": format_time(self.suites.time)
         })
 
-    def write_test_suite(self, builder, suite):
-        builder.start("testsuite", {
+
+class XmlWriter:
+    """
+    Writes the report to the file one <testsuite> element at a time, as each context finishes.
+    The totals which go in the <testsuites> element's start tag aren't known until the end of the run,
+    so room is left for them in the tag and they are filled in by finish().
+    """
+    space_for_totals = 200
+
+    def __init__(self, path):
+        self.file = io.open(path, 'wb')
+        self.file.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+        self.totals_position = self.file.tell()
+        self.file.write(b"<testsuites" + b" " * self.space_for_totals + b">\n")
+
+    def write_test_suite(self, suite):
+        element = ET.Element("testsuite", {
             "name": suite.name,
             "tests": str(len(suite)),
             "errors": str(suite.errors),
             "failures": str(suite.failures),
-            "time": "{0:.2f}".format(suite.time.total_seconds())
+            "time": format_time(suite.time)
         })
+        if suite.phases:
+            # so you can tell whether a slow context is slow to set up, to act or to tear down
+            properties = ET.SubElement(element, "properties")
+            for phase in PHASES:
+                if phase in suite.phases:
+                    ET.SubElement(properties, "property", {
+                        "name": phase + "_time",
+                        "value": format_time(suite.phases[phase], precision=6)
+                    })
         for test in suite.children:
-            self.write_test(builder, test)
+            self.write_test(element, test)
+        self.file.write(ET.tostring(element, encoding="utf-8") + b"\n")
+        # so that if the run is killed, the file contains everything up to the context that was running
+        self.file.flush()
 
-    def write_test(self, builder, test):
-        builder.start("testcase", {
+    def write_test(self, parent, test):
+        element = ET.SubElement(parent, "testcase", {
             "name": test.name,
-            "time": "{0:.2f}".format(test.time.total_seconds())
+            "time": format_time(test.time)
         })
-
-        if(test.failure):
-            builder.start("failure", {
-                "type": "failure",
+        if test.outcome is not None:
+            outcome = ET.SubElement(element, test.outcome, {
+                "type": test.outcome,
                 "message": test.msg
             })
-            builder.data(test.nfo)
-            builder.end("failure")
-        elif(test.error):
-            builder.start("error", {
-                "type": "error",
-                "message": test.msg
-            })
-            builder.data(test.nfo)
-            builder.end("error")
-
-        builder.end('testcase')
+            outcome.text = '\n'.join(test.nfo)
 
-    def end_test_suite(self, builder):
-        builder.end('testsuite')
+    def finish(self, totals):
+        self.file.write(b"</testsuites>\n")
+        start_tag = ET.tostring(ET.Element("testsuites", totals), encoding="utf-8")
+        # an empty element is written as '<testsuites ... />'; only the attributes are wanted
+        attributes = start_tag[len(b"<testsuites"):-len(b" />")]
+        self.file.seek(self.totals_position)
+        self.file.write(b"<testsuites" + attributes.ljust(self.space_for_totals) + b">")
+        self.file.close()
 
-    def end_test_suites(self, builder):
-        builder.end('testsuites')
 
-    def test_run_ended(self):
-        self.suites.stop()
-        builder = ET.TreeBuilder()
-        self.write_test_suites(builder)
-        for suite in self.suites:
-            self.write_test_suite(builder, suite)
-            self.end_test_suite(builder)
-        self.end_test_suites(builder)
-
-        el = ET.ElementTree(element=builder.close())
-        with io.open(self.path, 'wb') as f:
-            el.write(f)
+def format_time(nanoseconds, precision=2):
+    return "{0:.{1}f}".format(nanoseconds / 1e9, precision)
@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from .shuffling import Shuffler
+
+
+class DurationScheduler(object):
+    @classmethod
+    def locate(cls):
+        return (Shuffler, None)
+
+    def setup_parser(self, parser):
+        parser.add_argument('--timings',
+                            action='store',
+                            dest='timings_path',
+                            default=None,
+                            metavar='FILE',
+                            help="Path to a file in which to record how long each test module and class takes to run. "
+                                 "Recorded timings are used to run the slowest tests first.")
+
+    def initialise(self, args, env):
+        self.path = args.timings_path
+        if self.path is None:
+            return False
+        self.timings = Timings.load(self.path)
+        self.stopwatch = Stopwatch()
+        return True
+
+    def process_module_list(self, modules):
+        modules.sort(key=lambda m: longest_first(self.timings.modules.get(m.__name__)), reverse=True)
+
+    def process_class_list(self, module, classes):
+        classes.sort(key=lambda c: longest_first(self.timings.classes.get(class_key(c))), reverse=True)
+
+    def suite_started(self, module):
+        self.stopwatch.start(module)
+
+    def suite_ended(self, module):
+        self.timings.modules[module.__name__] = self.stopwatch.stop(module)
+
+    def test_class_started(self, cls):
+        self.stopwatch.start(cls)
+
+    def test_class_ended(self, cls):
+        self.timings.classes[class_key(cls)] = self.stopwatch.stop(cls)
+
+    def test_class_errored(self, cls, exception):
+        self.test_class_ended(cls)
+
+    def record_timings(self, timings):
+        """Record timings which were measured elsewhere (for example, in a worker process)."""
+        self.timings.update(timings)
+
+    def test_run_ended(self):
+        self.timings.save(self.path)
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+class Timings(object):
+    """Wall-clock durations (in seconds) of test modules and test classes, keyed by name."""
+    def __init__(self, modules=None, classes=None):
+        self.modules = modules if modules is not None else {}
+        self.classes = classes if classes is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.isfile(path):
+            return cls()
+        with open(path, 'r') as f:
+            dct = json.load(f)
+        return cls(dct.get('modules'), dct.get('classes'))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'modules': self.modules, 'classes': self.classes}, f, indent=2, sort_keys=True)
+
+    def update(self, other):
+        self.modules.update(other.modules)
+        self.classes.update(other.classes)
+
+
+class Stopwatch(object):
+    def __init__(self):
+        self.start_times = {}
+
+    def start(self, key):
+        self.start_times[id(key)] = time.perf_counter()
+
+    def stop(self, key):
+        return time.perf_counter() - self.start_times.pop(id(key), time.perf_counter())
+
+
+def class_key(cls):
+    return cls.__module__ + '.' + cls.__qualname__
+
+
+def longest_first(duration):
+    # things we haven't timed yet might be slow, so run them first
+    return duration if duration is not None else float('inf')
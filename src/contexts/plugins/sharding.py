@@ -0,0 +1,94 @@
+import argparse
+import zlib
+from .parallel import ProcessPoolRunner
+from .scheduling import Timings, class_key
+
+
+class ShardSelector(object):
+    @classmethod
+    def locate(cls):
+        return (None, ProcessPoolRunner)
+
+    def setup_parser(self, parser):
+        parser.add_argument('--shard',
+                            action='store',
+                            dest='shard',
+                            type=parse_shard,
+                            default=None,
+                            metavar='I/N',
+                            help="Split the test classes into N shards and only run the I-th one (counting from 1).")
+        parser.add_argument('--shard-by',
+                            action='store',
+                            dest='shard_by',
+                            choices=['hash', 'duration'],
+                            default='hash',
+                            help="How to split the test classes into shards: by a hash of their names (the default), "
+                                 "or balanced using the timings recorded with --timings.")
+
+    def initialise(self, args, env):
+        if args.shard is None:
+            return False
+        self.index, self.count = args.shard
+        self.timings = None
+        if args.shard_by == 'duration':
+            timings_path = getattr(args, 'timings_path', None)
+            if timings_path is None:
+                raise ValueError("--shard-by=duration requires --timings")
+            self.timings = Timings.load(timings_path)
+        return True
+
+    def process_class_list(self, module, classes):
+        if self.timings is None:
+            classes[:] = [c for c in classes if hash_shard(c, self.count) == self.index]
+
+    def run_suites(self, suites):
+        if self.timings is not None:
+            in_shard = balanced_shard(self.timings, [c for s in suites for c in s.classes], self.count, self.index)
+            for suite in suites:
+                suite.classes[:] = [c for c in suite.classes if class_key(c) in in_shard]
+        suites[:] = [s for s in suites if s.classes]
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+def parse_shard(string):
+    try:
+        index, count = (int(x) for x in string.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected I/N, got {!r}".format(string))
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError("shard {} is not between 1 and {}".format(index, count))
+    return (index - 1, count)
+
+
+def hash_shard(cls, count):
+    # the built-in hash() is randomised per process, so it won't agree across machines
+    return zlib.crc32(class_key(cls).encode('utf-8')) % count
+
+
+def balanced_shard(timings, classes, count, index):
+    """
+    Greedily assign the classes to shards, slowest first, always adding to the shard with the least work,
+    and return the keys of the classes in the given shard.
+    Every machine has to come up with the same answer, so ties are broken by name.
+    Classes without a recorded timing are assumed to take the average time.
+    """
+    # a class which has been imported into more than one module turns up in each of their suites,
+    # but it should only be counted (and assigned to a shard) once
+    keys = sorted(set(class_key(c) for c in classes))
+    known = [t for t in (timings.classes.get(k) for k in keys) if t is not None]
+    default = sum(known) / len(known) if known else 1.0
+
+    def duration(key):
+        t = timings.classes.get(key)
+        return t if t is not None else default
+
+    totals = [0.0] * count
+    in_shard = set()
+    for key in sorted(keys, key=lambda k: (-duration(k), k)):
+        shard = totals.index(min(totals))
+        totals[shard] += duration(key)
+        if shard == index:
+            in_shard.add(key)
+    return in_shard
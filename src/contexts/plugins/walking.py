@@ -0,0 +1,43 @@
+import concurrent.futures
+
+
+class ThreadedWalker(object):
+    def setup_parser(self, parser):
+        parser.add_argument('--discovery-threads',
+                            action='store',
+                            dest='discovery_threads',
+                            type=int,
+                            default=None,
+                            metavar='N',
+                            help="Read the folders being searched for tests using N threads. "
+                                 "Useful when the tests are on a network drive or other slow storage.")
+
+    def initialise(self, args, env):
+        self.threads = args.discovery_threads
+        return self.threads is not None and self.threads > 1
+
+    def scan_folder(self, folder, directories):
+        with concurrent.futures.ThreadPoolExecutor(self.threads) as executor:
+            pending = {executor.submit(scan, folder, directories)}
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    for subfolder in future.result():
+                        pending.add(executor.submit(scan, subfolder, directories))
+
+    def __eq__(self, other):
+        return type(self) == type(other)
+
+
+def scan(folder, directories):
+    """
+    Read the folder and identify everything in it, returning the test folders inside it.
+    The test runner walks the folders again afterwards to put the modules in order,
+    but by then the answers are all in the cache.
+    """
+    try:
+        directories.test_files(folder)
+        return directories.test_subfolders(folder)
+    except Exception:
+        # the test runner will run into the same problem (and report it) when it gets to this folder
+        return []
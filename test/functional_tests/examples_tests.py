@@ -1,3 +1,4 @@
+import inspect
 from unittest import mock
 from .tools import run_object
 from contexts.plugin_interface import PluginInterface, EXAMPLES, SETUP, ACTION, ASSERTION, TEARDOWN
@@ -148,6 +149,41 @@ class WhenRunningAParametrisedSpecWithNonParametrisedMethods:
         assert self.ParametrisedSpec.assertions == 2
 
 
+class WhenRunningAParametrisedSpecWithManyExamples:
+    def given_a_parametrised_test_with_a_hundred_cases(self):
+        class ParametrisedSpec:
+            assertions = []
+
+            @classmethod
+            def examples(cls):
+                yield from range(100)
+
+            def it(self, example):
+                self.__class__.assertions.append(example)
+        self.ParametrisedSpec = ParametrisedSpec
+
+        self.plugin = mock.Mock(spec=PluginInterface)
+        self.plugin.identify_method.side_effect = lambda meth: {
+            ParametrisedSpec.examples: EXAMPLES,
+            ParametrisedSpec.it: ASSERTION
+        }[meth]
+        self.plugin.process_assertion_list.return_value = None
+
+    def because_we_run_the_class(self):
+        with mock.patch('inspect.signature', wraps=inspect.signature) as self.signature:
+            run_object(self.ParametrisedSpec, [self.plugin])
+
+    def it_should_run_the_assertion_a_hundred_times(self):
+        assert self.ParametrisedSpec.assertions == list(range(100))
+
+    def it_should_only_ask_the_plugin_to_process_the_assertions_once(self):
+        assert self.plugin.process_assertion_list.call_count == 1
+
+    def it_should_only_inspect_each_methods_signature_once(self):
+        # the assertion and the default action
+        assert self.signature.call_count == 2
+
+
 class WhenNotifyingAPluginOfExamples:
     def context(self):
         class ParametrisedSpec:
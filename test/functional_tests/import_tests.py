@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+
+class WhenATestFileImportsContexts:
+    def because_a_fresh_interpreter_imports_contexts(self):
+        script = "import sys, contexts; print(sorted(m for m in sys.modules if m.startswith('contexts')))"
+        self.imported = subprocess.check_output([sys.executable, '-c', script], universal_newlines=True)
+
+    def it_should_not_import_the_test_runner(self):
+        assert 'contexts.core' not in self.imported
+
+    def it_should_not_import_the_plugin_loader(self):
+        assert 'contexts.plugin_discovery' not in self.imported
+
+
+class WhenAccessingTheTestRunnerThroughThePackage:
+    def because_we_ask_the_package_for_the_runners_modules(self):
+        script = "import contexts; print(contexts.core.__name__, contexts.load_plugins.__module__)"
+        self.output = subprocess.check_output([sys.executable, '-c', script], universal_newlines=True)
+
+    def it_should_import_them_on_demand(self):
+        assert self.output.split() == ['contexts.core', 'contexts.plugin_discovery']
@@ -779,5 +779,63 @@ class WhenRunningASubpackage:
                     f.write('')
 
 
+class WhenRunningADeeplyNestedPackage:
+    def establish_that_there_is_a_package_with_subpackages(self):
+        self.package_name = 'deeply_nested_package'
+        self.folder_path = os.path.join(TEST_DATA_DIR, self.package_name)
+        self.subpackage_path = os.path.join(self.folder_path, "first", "second", "third")
+        os.makedirs(self.subpackage_path)
+        for folder in ["", "first", os.path.join("first", "second"), os.path.join("first", "second", "third")]:
+            for module_name in ["__init__", "test_file"]:
+                with open(os.path.join(self.folder_path, folder, module_name) + ".py", 'w+') as f:
+                    f.write('')
+
+        self.plugin = mock.Mock(spec=PluginInterface)
+        self.plugin.identify_folder.return_value = TEST_FOLDER
+        self.plugin.identify_file.return_value = TEST_FILE
+
+    def because_we_run_the_package(self):
+        with mock.patch('os.scandir', wraps=os.scandir) as self.scandir:
+            run_object(self.folder_path, [self.plugin])
+
+    def it_should_import_the_module_in_the_deepest_package(self):
+        self.plugin.import_module.assert_any_call(TEST_DATA_DIR, self.package_name + ".first.second.third.test_file")
+
+    def it_should_only_read_each_directory_once(self):
+        listed = [c[0][0] for c in self.scandir.call_args_list]
+        assert len(listed) == len(set(listed))
+
+    def cleanup_the_file_system(self):
+        shutil.rmtree(self.folder_path)
+
+
+class WhenRunningAFolderContainingASymlink:
+    def establish_that_there_is_a_symlink_to_a_file_elsewhere(self):
+        self.folder_path = os.path.join(TEST_DATA_DIR, 'folder_with_a_symlink')
+        self.other_folder_path = os.path.join(TEST_DATA_DIR, 'symlink_target')
+        os.mkdir(self.folder_path)
+        os.mkdir(self.other_folder_path)
+        self.target = os.path.join(self.other_folder_path, "real_file.py")
+        with open(self.target, 'w+') as f:
+            f.write('')
+        os.symlink(self.target, os.path.join(self.folder_path, "test_link.py"))
+
+        self.plugin = mock.Mock(spec=PluginInterface)
+        self.plugin.identify_file.return_value = TEST_FILE
+
+    def because_we_run_the_folder(self):
+        run_object(self.folder_path, [self.plugin])
+
+    def it_should_identify_the_file_the_symlink_points_to(self):
+        self.plugin.identify_file.assert_called_once_with(self.target)
+
+    def it_should_import_the_symlink_by_its_own_name(self):
+        self.plugin.import_module.assert_called_once_with(self.folder_path, "test_link")
+
+    def cleanup_the_file_system(self):
+        shutil.rmtree(self.folder_path)
+        shutil.rmtree(self.other_folder_path)
+
+
 if __name__ == "__main__":
     contexts.main()
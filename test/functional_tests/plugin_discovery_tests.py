@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+from unittest import mock
+from contexts import plugin_discovery
+from contexts.plugins.identification import NameBasedIdentifier
+from contexts.plugins.identification.decorators import DecoratorBasedIdentifier
+from contexts.plugins.importing import Importer
+from contexts.plugins.shuffling import Shuffler
+
+
+class PluginCacheSharedContext:
+    def establish_that_there_is_somewhere_to_put_the_cache(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tempdir.name, 'plugins.json')
+
+    def write_cache(self, installation, plugins):
+        with open(self.cache_path, 'w') as f:
+            json.dump({'installation': installation, 'plugins': plugins}, f)
+
+    def load_plugin_classes(self):
+        with mock.patch('importlib.metadata.entry_points', wraps=plugin_discovery.importlib.metadata.entry_points) as entry_points:
+            classes = plugin_discovery.load_plugin_classes(self.cache_path)
+        return classes, entry_points.called
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenLoadingPluginsWithNoCache(PluginCacheSharedContext):
+    def because_we_load_the_plugins(self):
+        self.classes, self.read_entry_points = self.load_plugin_classes()
+
+    def it_should_read_the_installed_entry_points(self):
+        assert self.read_entry_points
+
+    def it_should_find_the_builtin_plugins(self):
+        assert Importer in self.classes
+
+    def it_should_remember_the_plugins_in_the_cache(self):
+        with open(self.cache_path, 'r') as f:
+            plugins = json.load(f)['plugins']
+        assert ['Importer', 'contexts.plugins.importing:Importer'] in plugins
+
+
+class WhenLoadingPluginsWithAnUpToDateCache(PluginCacheSharedContext):
+    def given_a_cache_for_the_current_installation(self):
+        self.write_cache(plugin_discovery.describe_installed_distributions(),
+                         [['Shuffler', 'contexts.plugins.shuffling:Shuffler']])
+
+    def because_we_load_the_plugins(self):
+        self.classes, self.read_entry_points = self.load_plugin_classes()
+
+    def it_should_load_the_plugins_in_the_cache(self):
+        assert self.classes == [Shuffler]
+
+    def it_should_not_read_the_installed_entry_points(self):
+        assert not self.read_entry_points
+
+
+class WhenLoadingPluginsFromACacheWhichIsNotInTheOrderTheyShouldRunIn(PluginCacheSharedContext):
+    def given_a_cache_listing_the_plugins_in_the_wrong_order(self):
+        self.write_cache(plugin_discovery.describe_installed_distributions(), [
+            ['NameBasedIdentifier', 'contexts.plugins.identification:NameBasedIdentifier'],
+            ['DecoratorBasedIdentifier', 'contexts.plugins.identification.decorators:DecoratorBasedIdentifier']
+        ])
+
+    def because_we_load_the_plugins(self):
+        self.classes, self.read_entry_points = self.load_plugin_classes()
+
+    def it_should_put_the_plugins_in_the_order_they_ask_for(self):
+        assert self.classes == [DecoratorBasedIdentifier, NameBasedIdentifier]
+
+
+class WhenLoadingPluginsAfterTheInstalledDistributionsHaveChanged(PluginCacheSharedContext):
+    def given_a_cache_for_a_different_installation(self):
+        self.write_cache('something else', [['Shuffler', 'contexts.plugins.shuffling:Shuffler']])
+
+    def because_we_load_the_plugins(self):
+        self.classes, self.read_entry_points = self.load_plugin_classes()
+
+    def it_should_read_the_installed_entry_points_again(self):
+        assert self.read_entry_points
+
+    def it_should_find_all_the_plugins(self):
+        assert Importer in self.classes
+        assert Shuffler in self.classes
+
+
+class WhenLoadingPluginsWhoseEntryPointsAreListedTwice(PluginCacheSharedContext):
+    def given_a_distribution_which_is_found_twice(self):
+        # the way importlib.metadata lists them before Python 3.10
+        entry_point = plugin_discovery.importlib.metadata.EntryPoint('Importer', 'contexts.plugins.importing:Importer', plugin_discovery.ENTRY_POINT_GROUP)
+        self.installed = {plugin_discovery.ENTRY_POINT_GROUP: [entry_point, entry_point]}
+
+    def because_we_load_the_plugins(self):
+        with mock.patch('importlib.metadata.entry_points', return_value=self.installed):
+            self.classes = plugin_discovery.load_plugin_classes(self.cache_path)
+
+    def it_should_load_each_plugin_once(self):
+        assert self.classes == [Importer]
+
+    def it_should_remember_each_plugin_once(self):
+        with open(self.cache_path, 'r') as f:
+            plugins = json.load(f)['plugins']
+        assert plugins == [['Importer', 'contexts.plugins.importing:Importer']]
@@ -1,3 +1,4 @@
+import asyncio
 import collections.abc
 import types
 from unittest import mock
@@ -333,15 +334,20 @@ class WhenRunningASpecWithPlugins:
     def it_should_call_assertion_passed_for_the_assertion(self):
         assert self.calls[4] == mock.call.assertion_passed(self.spec.instance.method_with_should_in_the_name)
 
+    @assertion
+    def it_should_call_context_timed_with_the_phases_of_the_context(self):
+        assert self.calls[5] == mock.call.context_timed(self.spec, NO_EXAMPLE, mock.ANY)
+        assert set(self.calls[5][1][2]) == {'setup', 'action', 'assertions', 'teardown'}
+
     @assertion
     def it_should_call_context_ended_next(self):
-        assert self.calls[5] == mock.call.context_ended(self.spec, NO_EXAMPLE)
+        assert self.calls[6] == mock.call.context_ended(self.spec, NO_EXAMPLE)
 
     def it_should_call_test_class_ended(self):
-        assert self.calls[6] == mock.call.test_class_ended(self.spec)
+        assert self.calls[7] == mock.call.test_class_ended(self.spec)
 
     def finally_it_should_call_test_run_ended(self):
-        assert self.calls[7] == mock.call.test_run_ended()
+        assert self.calls[8] == mock.call.test_run_ended()
 
     def it_should_do_exactly_the_same_to_the_other_plugin(self):
         assert self.plugin2.mock_calls == self.calls
@@ -752,5 +758,122 @@ class WhenAPluginModifiesAClassList:
         assert not self.ran_reals
 
 
+class WhenDispatchingAHookToPlugins:
+    def given_plugins_which_implement_different_hooks(self):
+        self.calls = []
+
+        class DoesNotImplementIt:
+            pass
+
+        class ReturnsNone:
+            def get_exit_code(s):
+                self.calls.append('returns none')
+
+        class Replies:
+            def get_exit_code(s):
+                self.calls.append('replies')
+                return 3
+
+        class NeverAsked:
+            def get_exit_code(s):
+                self.calls.append('never asked')
+                return 4
+
+        self.composite = contexts.core.PluginComposite([DoesNotImplementIt(), ReturnsNone(), Replies(), NeverAsked()])
+
+    def because_we_call_the_hook(self):
+        self.result = self.composite.get_exit_code()
+
+    def it_should_return_the_first_reply(self):
+        assert self.result == 3
+
+    def it_should_only_ask_the_plugins_which_implement_the_hook_until_one_replies(self):
+        assert self.calls == ['returns none', 'replies']
+
+    def it_should_do_nothing_for_a_hook_nobody_implements(self):
+        assert self.composite.test_run_started() is None
+
+    def it_should_reject_methods_which_are_not_part_of_the_interface(self):
+        exception = contexts.catch(getattr, self.composite, 'not_a_hook')
+        assert isinstance(exception, AttributeError)
+
+
+class WhenRunningASpecWithCoroutineMethods:
+    def context(self):
+        self.log = []
+        self.loops = []
+
+        class TestSpec:
+            async def method_one(s):
+                await asyncio.sleep(0)
+                self.log.append("setup")
+                self.loops.append(asyncio.get_running_loop())
+
+            async def method_two(s):
+                await asyncio.sleep(0)
+                self.log.append("action")
+                self.loops.append(asyncio.get_running_loop())
+
+            async def method_three(s):
+                await asyncio.sleep(0)
+                self.log.append("assertion")
+                self.loops.append(asyncio.get_running_loop())
+
+            async def method_four(s):
+                await asyncio.sleep(0)
+                self.log.append("teardown")
+                self.loops.append(asyncio.get_running_loop())
+
+        self.spec = TestSpec
+        self.plugin = Mock(spec=PluginInterface)
+        self.plugin.identify_method.side_effect = lambda meth: {
+            TestSpec.method_one: SETUP,
+            TestSpec.method_two: ACTION,
+            TestSpec.method_three: ASSERTION,
+            TestSpec.method_four: TEARDOWN
+        }[meth]
+
+    def because_we_run_the_spec(self):
+        run_object(self.spec, [self.plugin])
+
+    def it_should_run_each_coroutine_to_completion_in_order(self):
+        assert self.log == ["setup", "action", "assertion", "teardown"]
+
+    def it_should_run_every_coroutine_on_the_same_event_loop(self):
+        assert len(set(self.loops)) == 1
+
+    def it_should_close_the_event_loop_at_the_end_of_the_run(self):
+        assert self.loops[0].is_closed()
+
+    def it_should_report_that_the_assertion_passed(self):
+        assert self.plugin.assertion_passed.called
+
+
+class WhenACoroutineAssertionFails:
+    def context(self):
+        self.exception = AssertionError()
+
+        class TestSpec:
+            async def failing_should_method(s):
+                await asyncio.sleep(0)
+                raise self.exception
+
+            def __init__(self):
+                TestSpec.instance = self
+
+        self.spec = TestSpec
+        self.plugin = Mock(spec=PluginInterface)
+        self.plugin.identify_method.return_value = ASSERTION
+
+    def because_we_run_the_spec(self):
+        run_object(self.spec, [self.plugin])
+
+    def it_should_call_assertion_failed_with_the_exception(self):
+        self.plugin.assertion_failed.assert_called_once_with(self.spec.instance.failing_should_method, self.exception)
+
+    def it_should_not_say_the_assertion_passed(self):
+        assert not self.plugin.assertion_passed.called
+
+
 if __name__ == "__main__":
     contexts.main()
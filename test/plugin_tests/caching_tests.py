@@ -0,0 +1,404 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import types
+from unittest import mock
+from contexts import core, discovery
+from contexts.plugin_interface import TEST_FOLDER, TEST_FILE, CONTEXT, ASSERTION
+from contexts.plugins.caching import CollectionCache
+from contexts.plugins.identification import NameBasedIdentifier
+from contexts.plugins.identification.decorators import DecoratorBasedIdentifier
+from contexts.plugins.identification.filespec import FileSpecIdentifier
+from contexts.plugins.importing import static
+from .tools import ExceptionThrowingArgumentParser
+
+
+class CollectionCacheSharedContext:
+    def establish_that_there_is_a_test_folder(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tempdir.name, 'tests')
+        os.mkdir(self.root)
+        self.cache_path = os.path.join(self.tempdir.name, 'collection.json')
+        self.asked = []
+        self.exception = None
+        self.write_module('test_cached_module', "class WhenCached:\n    def it_should_be_cached(self):\n        pass\n")
+
+    def write_module(self, name, source):
+        with open(os.path.join(self.root, name + '.py'), 'w') as f:
+            f.write(source)
+
+    def import_module(self, name):
+        spec = importlib.util.spec_from_file_location(name, os.path.join(self.root, name + '.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        return module
+
+    def identify_folder(self, folder):
+        self.asked.append(folder)
+        return TEST_FOLDER
+
+    def identify_file(self, file):
+        self.asked.append(file)
+        return TEST_FILE
+
+    def identify_class(self, cls):
+        self.asked.append(cls)
+        if self.exception is not None:
+            raise self.exception
+        return CONTEXT
+
+    def identify_method(self, method):
+        self.asked.append(method)
+        return ASSERTION
+
+    def start_a_run(self, *argv, identifiers=()):
+        cache = CollectionCache()
+        parser = ExceptionThrowingArgumentParser()
+        cache.setup_parser(parser)
+        parser.add_argument('--verbose', action='store_true')
+        cache.initialise(parser.parse_args(['--collection-cache', self.cache_path] + list(argv)), {})
+        gen = cache.request_plugins()
+        requested = next(gen)
+        try:
+            gen.send({type(plugin): plugin for plugin in identifiers if type(plugin) in requested})
+        except StopIteration:
+            pass
+
+        composite = core.PluginComposite([self])
+        identifiers = {name: getattr(composite, name) for name in core.IDENTIFICATION_HOOKS + core.COLLECTION_FUNCTIONS}
+        cache.process_identifiers(identifiers)
+        for name, identify in identifiers.items():
+            setattr(composite, name, identify)
+        return cache, composite
+
+    def walk(self, cache, composite):
+        directories = discovery.DirectoryCache(composite)
+        cache.scan_folder(self.root, directories)
+        return [(folder, directories.test_files(folder)) for folder in discovery.walk(self.root, directories)]
+
+    def cleanup_the_tempdir(self):
+        sys.modules.pop('test_cached_module', None)
+        self.tempdir.cleanup()
+
+
+class WhenInitialisingCollectionCacheWithoutAFile:
+    def given_a_parser(self):
+        self.plugin = CollectionCache()
+        self.parser = ExceptionThrowingArgumentParser()
+        self.plugin.setup_parser(self.parser)
+
+    def because_we_initialise_the_plugin(self):
+        self.result = self.plugin.initialise(self.parser.parse_args([]), {})
+
+    def it_should_not_be_added_to_the_list(self):
+        assert not self.result
+
+
+class WhenSearchingAnUnchangedFolderInALaterRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_searched_the_folder(self):
+        cache, composite = self.start_a_run()
+        self.first_walk = self.walk(cache, composite)
+        cache.test_run_ended()
+        self.asked.clear()
+
+    def because_we_search_the_folder_again(self):
+        cache, composite = self.start_a_run()
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            self.second_walk = self.walk(cache, composite)
+        self.read_the_folder = scandir.called
+
+    def it_should_find_the_same_test_files(self):
+        assert self.second_walk == self.first_walk == [(self.root, ['test_cached_module.py'])]
+
+    def it_should_not_read_the_folder(self):
+        assert not self.read_the_folder
+
+    def it_should_not_ask_the_plugins_again(self):
+        assert self.asked == []
+
+
+class WhenSearchingAFolderWhichHasChangedSinceThePreviousRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_searched_the_folder(self):
+        cache, composite = self.start_a_run()
+        self.walk(cache, composite)
+        cache.test_run_ended()
+        self.asked.clear()
+
+        self.write_module('test_new_module', '')
+        # make sure the folder looks different even on file systems with coarse timestamps
+        stat = os.stat(self.root)
+        os.utime(self.root, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def because_we_search_the_folder_again(self):
+        cache, composite = self.start_a_run()
+        self.walked = self.walk(cache, composite)
+
+    def it_should_find_the_new_file(self):
+        assert sorted(self.walked[0][1]) == ['test_cached_module.py', 'test_new_module.py']
+
+
+class WhenCollectingTheClassesInAnUnchangedModuleInALaterRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_collected_the_module(self):
+        cache, composite = self.start_a_run()
+        composite.collect_classes(self.import_module('test_cached_module'))
+        cache.test_run_ended()
+        self.asked.clear()
+        self.module = self.import_module('test_cached_module')
+
+    def because_we_collect_the_module_again(self):
+        cache, composite = self.start_a_run()
+        self.classes = composite.collect_classes(self.module)
+
+    def it_should_find_the_same_classes(self):
+        assert self.classes == [self.module.WhenCached]
+
+    def it_should_not_ask_the_plugins_again(self):
+        assert self.asked == []
+
+
+class WhenCollectingTheClassesInAModuleWhichHasChanged(CollectionCacheSharedContext):
+    def given_a_previous_run_which_collected_the_module(self):
+        cache, composite = self.start_a_run()
+        composite.collect_classes(self.import_module('test_cached_module'))
+        cache.test_run_ended()
+        self.asked.clear()
+
+        self.write_module('test_cached_module', "class WhenCached:\n    pass\n\n\nclass WhenAdded:\n    pass\n")
+        self.module = self.import_module('test_cached_module')
+
+    def because_we_collect_the_module_again(self):
+        cache, composite = self.start_a_run()
+        self.classes = composite.collect_classes(self.module)
+
+    def it_should_find_the_new_class(self):
+        assert self.classes == [self.module.WhenAdded, self.module.WhenCached]
+
+    def it_should_ask_the_plugins_again(self):
+        assert self.asked == [self.module.WhenAdded, self.module.WhenCached]
+
+
+class WhenCollectingTheMethodsOfAnUnchangedClassInALaterRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_collected_the_class(self):
+        cache, composite = self.start_a_run()
+        composite.collect_methods(self.import_module('test_cached_module').WhenCached)
+        cache.test_run_ended()
+        self.asked.clear()
+        self.cls = self.import_module('test_cached_module').WhenCached
+
+    def because_we_collect_the_class_again(self):
+        cache, composite = self.start_a_run()
+        self.methods = composite.collect_methods(self.cls)
+
+    def it_should_find_the_same_methods(self):
+        assert self.methods == [('it_should_be_cached', ASSERTION)]
+
+    def it_should_not_ask_the_plugins_again(self):
+        assert self.asked == []
+
+
+class WhenCollectingTheMethodsOfAClassWhoseFileHasChanged(CollectionCacheSharedContext):
+    def given_a_previous_run_which_collected_the_class(self):
+        cache, composite = self.start_a_run()
+        composite.collect_methods(self.import_module('test_cached_module').WhenCached)
+        cache.test_run_ended()
+        self.asked.clear()
+
+        self.write_module('test_cached_module', "class WhenCached:\n    def it_should_be_cached(self):\n        pass\n\n    def it_should_be_new(self):\n        pass\n")
+        self.cls = self.import_module('test_cached_module').WhenCached
+
+    def because_we_collect_the_class_again(self):
+        cache, composite = self.start_a_run()
+        self.methods = composite.collect_methods(self.cls)
+
+    def it_should_find_the_new_method(self):
+        assert self.methods == [('it_should_be_cached', ASSERTION), ('it_should_be_new', ASSERTION)]
+
+
+class WhenCollectingWithADifferentOptionToThePreviousRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_collected_the_module(self):
+        cache, composite = self.start_a_run()
+        composite.collect_classes(self.import_module('test_cached_module'))
+        cache.test_run_ended()
+        self.asked.clear()
+        self.module = self.import_module('test_cached_module')
+
+    def because_we_collect_the_module_with_a_different_option(self):
+        cache, composite = self.start_a_run('--verbose')
+        self.classes = composite.collect_classes(self.module)
+
+    def it_should_find_the_same_classes(self):
+        assert self.classes == [self.module.WhenCached]
+
+    def it_should_not_ask_the_plugins_again(self):
+        assert self.asked == []
+
+
+class WhenCollectingWithDifferentIdentificationPluginsToThePreviousRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_collected_the_module(self):
+        cache, composite = self.start_a_run(identifiers=[NameBasedIdentifier()])
+        composite.collect_classes(self.import_module('test_cached_module'))
+        cache.test_run_ended()
+        self.asked.clear()
+        self.module = self.import_module('test_cached_module')
+
+    def because_we_collect_the_module_with_another_plugin(self):
+        cache, composite = self.start_a_run(identifiers=[NameBasedIdentifier(), DecoratorBasedIdentifier()])
+        composite.collect_classes(self.module)
+
+    def it_should_ask_the_plugins_again(self):
+        assert self.asked == [self.module.WhenCached]
+
+
+class WhenCollectingWithAFileSpecWhichHasChangedSinceThePreviousRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_collected_the_module(self):
+        self.spec_path = os.path.join(self.tempdir.name, 'specs.txt')
+        with open(self.spec_path, 'w') as f:
+            f.write('tests/*.py\n')
+        cache, composite = self.start_a_run(identifiers=[self.file_spec_identifier()])
+        composite.collect_classes(self.import_module('test_cached_module'))
+        cache.test_run_ended()
+        self.asked.clear()
+        self.module = self.import_module('test_cached_module')
+
+        with open(self.spec_path, 'w') as f:
+            f.write('tests/*.py\n!tests/test_cached_module.py\n')
+
+    def because_we_collect_the_module_again(self):
+        cache, composite = self.start_a_run(identifiers=[self.file_spec_identifier()])
+        composite.collect_classes(self.module)
+
+    def it_should_ask_the_plugins_again(self):
+        assert self.asked == [self.module.WhenCached]
+
+    def file_spec_identifier(self):
+        plugin = FileSpecIdentifier()
+        plugin.initialise(types.SimpleNamespace(specs=self.spec_path), cwd=self.tempdir.name)
+        return plugin
+
+
+class WhenSearchingASubfolderOfAFolderSearchedInThePreviousRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_searched_the_whole_tree(self):
+        self.subfolder = os.path.join(self.root, 'sub')
+        os.mkdir(self.subfolder)
+        with open(os.path.join(self.subfolder, 'test_nested_module.py'), 'w') as f:
+            f.write('')
+        cache, composite = self.start_a_run()
+        self.walk(cache, composite)
+        cache.test_run_ended()
+        self.asked.clear()
+
+    def because_we_search_only_the_subfolder(self):
+        cache, composite = self.start_a_run()
+        directories = discovery.DirectoryCache(composite)
+        cache.scan_folder(self.subfolder, directories)
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            self.walked = [(folder, directories.test_files(folder)) for folder in discovery.walk(self.subfolder, directories)]
+        self.read_the_folder = scandir.called
+
+    def it_should_find_the_test_files(self):
+        assert self.walked == [(self.subfolder, ['test_nested_module.py'])]
+
+    def it_should_not_read_the_folder(self):
+        assert not self.read_the_folder
+
+    def it_should_not_ask_the_plugins_again(self):
+        assert self.asked == []
+
+
+class WhenCollectingModulesWithTheSameNameInDifferentFolders(CollectionCacheSharedContext):
+    def given_a_previous_run_which_collected_both_modules(self):
+        self.filenames = []
+        for folder, method in [('one', 'it_should_be_the_first'), ('two', 'it_should_be_the_second')]:
+            os.mkdir(os.path.join(self.root, folder))
+            self.filenames.append(os.path.join(self.root, folder, 'test_twin.py'))
+            with open(self.filenames[-1], 'w') as f:
+                f.write("class WhenTwinned:\n    def {}(self):\n        pass\n".format(method))
+        cache, composite = self.start_a_run()
+        self.collect_both(composite)
+        cache.test_run_ended()
+        self.asked.clear()
+
+    def because_we_collect_them_again(self):
+        self.cache, composite = self.start_a_run()
+        self.methods = self.collect_both(composite)
+        self.cache.test_run_ended()
+
+    def it_should_find_the_methods_of_each_class(self):
+        assert self.methods == [[('it_should_be_the_first', ASSERTION)], [('it_should_be_the_second', ASSERTION)]]
+
+    def it_should_not_ask_the_plugins_again(self):
+        assert self.asked == []
+
+    def it_should_not_need_to_save_the_cache_again(self):
+        assert not self.cache.cache.changed
+
+    def collect_both(self, composite):
+        # the second one replaces the first in sys.modules, as it does when test files in different folders have the same name
+        modules = []
+        for filename in self.filenames:
+            spec = importlib.util.spec_from_file_location('test_twin', filename)
+            modules.append(importlib.util.module_from_spec(spec))
+            sys.modules['test_twin'] = modules[-1]
+            spec.loader.exec_module(modules[-1])
+        classes = [composite.collect_classes(module)[0] for module in modules]
+        return [composite.collect_methods(cls) for cls in classes]
+
+    def cleanup_sys_dot_modules(self):
+        sys.modules.pop('test_twin', None)
+
+
+class WhenReadingTheOutlineOfAnUnchangedFileInALaterRun(CollectionCacheSharedContext):
+    def given_a_previous_run_which_read_the_file(self):
+        self.filename = os.path.join(self.root, 'test_cached_module.py')
+        cache, composite = self.start_a_run()
+        cache.read_outline(self.filename)
+        cache.test_run_ended()
+
+    def because_we_read_the_file_again(self):
+        cache, composite = self.start_a_run()
+        with mock.patch.object(static, 'read_outline', wraps=static.read_outline) as read_outline:
+            self.outline = cache.read_outline(self.filename)
+        self.read_the_file = read_outline.called
+
+    def it_should_give_the_same_outline(self):
+        assert self.outline == static.read_outline(self.filename)
+
+    def it_should_not_read_the_file(self):
+        assert not self.read_the_file
+
+
+class WhenReadingTheOutlineOfAFileWhichHasChanged(CollectionCacheSharedContext):
+    def given_a_previous_run_which_read_the_file(self):
+        self.filename = os.path.join(self.root, 'test_cached_module.py')
+        cache, composite = self.start_a_run()
+        cache.read_outline(self.filename)
+        cache.test_run_ended()
+        self.write_module('test_cached_module', "class WhenCached:\n    pass\n\n\nclass WhenAdded:\n    pass\n")
+
+    def because_we_read_the_file_again(self):
+        cache, composite = self.start_a_run()
+        self.outline = cache.read_outline(self.filename)
+
+    def it_should_find_the_new_class(self):
+        assert [c['name'] for c in self.outline] == ['WhenCached', 'WhenAdded']
+
+
+class WhenAPluginFailsToIdentifyAClass(CollectionCacheSharedContext):
+    def given_a_plugin_which_throws(self):
+        self.exception = ValueError("not this one")
+        self.module = self.import_module('test_cached_module')
+        self.cache, self.composite = self.start_a_run()
+
+    def because_we_collect_the_module_twice(self):
+        self.exceptions = []
+        for _ in range(2):
+            try:
+                self.composite.collect_classes(self.module)
+            except ValueError as e:
+                self.exceptions.append(e)
+
+    def it_should_not_remember_the_failure(self):
+        assert len(self.exceptions) == 2
+        assert self.asked == [self.module.WhenCached, self.module.WhenCached]
@@ -0,0 +1,86 @@
+import sys
+import threading
+from io import StringIO
+from contexts.plugins.capturing import RoutingStream, routing_output, start_capturing, stop_capturing
+
+
+class WhenCapturingOutputInTwoThreadsAtOnce:
+    def given_two_threads_and_some_buffers(self):
+        self.real_stdout = sys.stdout
+        sys.stdout = self.fake_stdout = StringIO()
+        self.buffers = [StringIO(), StringIO()]
+        self.barrier = threading.Barrier(2)
+
+    def because_both_threads_print_while_capturing(self):
+        def capture(buffer, message):
+            token = start_capturing(stdout=buffer)
+            self.barrier.wait()
+            print(message)
+            self.barrier.wait()
+            stop_capturing(token)
+        threads = [
+            threading.Thread(target=capture, args=(self.buffers[0], "from the first")),
+            threading.Thread(target=capture, args=(self.buffers[1], "from the second"))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def it_should_capture_the_output_from_each_thread_separately(self):
+        assert self.buffers[0].getvalue() == "from the first\n"
+        assert self.buffers[1].getvalue() == "from the second\n"
+
+    def it_should_not_write_anything_to_the_real_stdout(self):
+        assert self.fake_stdout.getvalue() == ""
+
+    def it_should_put_the_real_stdout_back(self):
+        assert sys.stdout is self.fake_stdout
+
+    def cleanup_stdout(self):
+        sys.stdout = self.real_stdout
+
+
+class WhenAThreadPrintsWhileAnotherIsCapturing:
+    def given_a_thread_which_is_capturing(self):
+        self.real_stdout = sys.stdout
+        sys.stdout = self.fake_stdout = StringIO()
+        self.buffer = StringIO()
+
+    def because_another_thread_prints(self):
+        with routing_output():
+            token = start_capturing(stdout=self.buffer)
+            thread = threading.Thread(target=print, args=("not captured",))
+            thread.start()
+            thread.join()
+            print("captured")
+            stop_capturing(token)
+
+    def it_should_capture_the_output_of_the_capturing_thread(self):
+        assert self.buffer.getvalue() == "captured\n"
+
+    def it_should_send_the_other_threads_output_to_the_real_stdout(self):
+        assert self.fake_stdout.getvalue() == "not captured\n"
+
+    def cleanup_stdout(self):
+        sys.stdout = self.real_stdout
+
+
+class WhenCapturingInsideRoutedOutput:
+    def given_routed_output(self):
+        self.real_stdout = sys.stdout
+        sys.stdout = self.fake_stdout = StringIO()
+        self.routing = routing_output()
+        self.routing.__enter__()
+        self.router = sys.stdout
+
+    def because_we_start_and_stop_capturing(self):
+        stop_capturing(start_capturing(stdout=StringIO()))
+
+    def it_should_leave_the_router_in_place(self):
+        assert sys.stdout is self.router
+        assert isinstance(sys.stdout, RoutingStream)
+
+    def cleanup_routing(self):
+        self.routing.__exit__(None, None, None)
+        sys.stdout = self.real_stdout
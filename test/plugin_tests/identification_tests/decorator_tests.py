@@ -1,3 +1,5 @@
+import gc
+import weakref
 from contexts.plugin_interface import CONTEXT, EXAMPLES, SETUP, ACTION, ASSERTION, TEARDOWN
 from contexts.plugins.identification.decorators import DecoratorBasedIdentifier, spec, context, examples, setup, action, assertion, teardown
 from contexts import catch
@@ -135,3 +137,37 @@ class WhenMarkingAMethodAsTwoThings:
 
     def it_should_throw_a_ValueError(self):
         assert isinstance(self.exception, ValueError)
+
+
+class WhenSubclassingAClassMarkedAsASpec:
+    def context(self):
+        @spec
+        class LovelyClass(object):
+            pass
+
+        class Subclass(LovelyClass):
+            pass
+        self.cls = Subclass
+        self.identifier = DecoratorBasedIdentifier()
+
+    def because_the_framework_asks_the_plugin_to_identify_the_subclass(self):
+        self.result = self.identifier.identify_class(self.cls)
+
+    @assertion
+    def it_should_not_identify_it(self):
+        assert self.result is None
+
+
+class WhenADecoratedFunctionIsNoLongerInUse:
+    def given_a_decorated_function_which_nothing_refers_to(self):
+        @setup
+        def a_function():
+            pass
+        self.ref = weakref.ref(a_function)
+        del a_function
+
+    def because_the_garbage_collector_runs(self):
+        gc.collect()
+
+    def it_should_have_been_collected(self):
+        assert self.ref() is None
@@ -148,3 +148,89 @@ class When_a_file_is_not_listed_in_the_spec(FileSpecContext):
 
     def it_should_not_identify_the_file_for_tests(self):
         assert(self.result is None)
+
+
+class When_the_spec_has_several_lines(FileSpecContext):
+
+    def given_a_file_spec(self):
+        self.testfile = self.make_path("acceptance", "herbivores", "cows.py")
+        file_spec = io.StringIO(self.testfile + "\n" + self.make_path("another.py") + "\n")
+        self.spec = FileSpecIdentifier()
+        self.spec.initialise(file=file_spec, cwd=self.tempdir.name)
+
+    def because_we_check_the_first_file(self):
+        self.result = self.spec.identify_file(self.testfile)
+
+    def it_should_identify_the_file_for_tests(self):
+        assert(self.result is TEST_FILE)
+
+
+class When_a_folder_shares_the_beginning_of_its_name_with_an_item_in_the_spec(FileSpecContext):
+
+    def given_a_file_spec(self):
+        self.testdir = self.make_path("accept")
+        file_spec = io.StringIO(self.make_path("acceptance", "herbivores", "cows.py"))
+        self.spec = FileSpecIdentifier()
+        self.spec.initialise(file=file_spec, cwd=self.tempdir.name)
+
+    def because_we_check_a_folder(self):
+        self.result = self.spec.identify_folder(self.testdir)
+
+    def it_should_not_identify_the_folder_for_tests(self):
+        assert(self.result is None)
+
+
+class When_the_spec_contains_a_glob_pattern(FileSpecContext):
+
+    def given_a_file_spec(self):
+        file_spec = io.StringIO(path.join("acceptance", "**", "test_*.py"))
+        self.spec = FileSpecIdentifier()
+        self.spec.initialise(file=file_spec, cwd=self.tempdir.name)
+
+    def because_we_check_some_files_and_folders(self):
+        self.deep_file_result = self.spec.identify_file(self.make_path("acceptance", "herbivores", "test_cows.py"))
+        self.shallow_file_result = self.spec.identify_file(self.make_path("acceptance", "test_lions.py"))
+        self.other_file_result = self.spec.identify_file(self.make_path("acceptance", "herbivores", "cows.py"))
+        self.subfolder_result = self.spec.identify_folder(self.make_path("acceptance", "herbivores"))
+        self.other_folder_result = self.spec.identify_folder(self.make_path("unit"))
+
+    def it_should_identify_matching_files_at_any_depth(self):
+        assert(self.deep_file_result is TEST_FILE)
+        assert(self.shallow_file_result is TEST_FILE)
+
+    def it_should_not_identify_files_which_do_not_match(self):
+        assert(self.other_file_result is None)
+
+    def it_should_identify_folders_which_may_contain_matching_files(self):
+        assert(self.subfolder_result is TEST_FOLDER)
+
+    def it_should_not_identify_folders_which_cannot_contain_matching_files(self):
+        assert(self.other_folder_result is None)
+
+
+class When_the_spec_excludes_a_folder(FileSpecContext):
+
+    def given_a_file_spec_and_an_identifier_which_runs_everything(self):
+        file_spec = io.StringIO("acceptance\n!" + path.join("acceptance", "slow") + "\n")
+        self.spec = FileSpecIdentifier()
+        self.spec.initialise(file=file_spec, cwd=self.tempdir.name)
+
+        self.identifiers = {
+            'identify_folder': lambda folder: TEST_FOLDER,
+            'identify_file': lambda file: TEST_FILE
+        }
+        self.spec.process_identifiers(self.identifiers)
+
+    def because_we_check_some_files_and_folders(self):
+        self.excluded_folder_result = self.identifiers['identify_folder'](self.make_path("acceptance", "slow"))
+        self.excluded_file_result = self.identifiers['identify_file'](self.make_path("acceptance", "slow", "test_lions.py"))
+        self.other_file_result = self.identifiers['identify_file'](self.make_path("acceptance", "test_cows.py"))
+
+    def it_should_not_run_the_excluded_folder(self):
+        assert(self.excluded_folder_result is None)
+
+    def it_should_not_run_the_files_in_the_excluded_folder(self):
+        assert(self.excluded_file_result is None)
+
+    def it_should_leave_other_files_to_the_other_identifiers(self):
+        assert(self.other_file_result is TEST_FILE)
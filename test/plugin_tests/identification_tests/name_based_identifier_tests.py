@@ -586,3 +586,18 @@ class WhenAMethodContainsAKeywordAsPartOfAWord:
 
     def it_should_ignore_it(self):
         assert self.result is None
+
+
+class WhenAnAmbiguousMethodNameIsSeenTwice:
+    def establish_that_the_plugin_has_already_seen_the_name(self):
+        def method_with_establish_and_should_in_the_name():
+            pass
+        self.method = method_with_establish_and_should_in_the_name
+        self.identifier = NameBasedIdentifier()
+        contexts.catch(self.identifier.identify_method, self.method)
+
+    def because_the_framework_asks_the_plugin_to_identify_the_method_again(self):
+        self.exception = contexts.catch(self.identifier.identify_method, self.method)
+
+    def it_should_throw_a_MethodNamingError_again(self):
+        assert isinstance(self.exception, contexts.errors.MethodNamingError)
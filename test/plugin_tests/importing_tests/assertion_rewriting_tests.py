@@ -1,10 +1,12 @@
+import ast
 import importlib
 import os
 import shutil
 import sys
+from unittest import mock
 import contexts
 from contexts import action, assertion
-from contexts.plugins.importing.assertion_rewriting import AssertionRewritingImporter
+from contexts.plugins.importing.assertion_rewriting import AssertionRewritingImporter, AssertionRewriter, find_assert_lines
 
 
 THIS_FILE = os.path.realpath(__file__)
@@ -766,3 +768,171 @@ def assertion_func():
     @assertion
     def the_exception_should_be_given_a_generated_message(self):
         assert self.exc.args[0] == "Not all elements of [True, 1, 0, False, '', 'hello'] were truthy. First falsy element: 0 at position 2"
+
+
+class RewrittenCodeCacheSharedContext(AssertionRewritingSharedContext):
+    def establish_that_bytecode_may_be_written(self):
+        self.old_dont_write_bytecode = sys.dont_write_bytecode
+        sys.dont_write_bytecode = False
+
+    def import_fresh_copy(self):
+        sys.modules.pop(self.module_name, None)
+        with mock.patch.object(AssertionRewriter, 'visit', side_effect=AssertionRewriter.visit, autospec=True) as visit:
+            self.module = self.importer.import_module(TEST_DATA_DIR, self.module_name)
+        self.rewrite_count = visit.call_count
+
+    def cleanup_dont_write_bytecode(self):
+        sys.dont_write_bytecode = self.old_dont_write_bytecode
+
+
+class WhenImportingAnUnchangedFileForTheSecondTime(RewrittenCodeCacheSharedContext):
+    def context(self):
+        self.code = """
+def assertion_func():
+    assert 1 == 2
+"""
+        self.write_file()
+        self.import_fresh_copy()
+
+    @action
+    def when_we_import_it_again(self):
+        self.import_fresh_copy()
+        self.exc = contexts.catch(self.module.assertion_func)
+
+    @assertion
+    def it_should_not_rewrite_the_code_again(self):
+        assert self.rewrite_count == 0
+
+    @assertion
+    def it_should_use_the_rewritten_code(self):
+        assert self.exc.args[0] == "Asserted 1 == 2 but found them not to be equal"
+
+
+class WhenImportingAFileWhichHasChangedSinceItWasLastImported(RewrittenCodeCacheSharedContext):
+    def context(self):
+        self.code = """
+def assertion_func():
+    assert 1 == 2
+"""
+        self.write_file()
+        self.import_fresh_copy()
+
+        with open(self.filename, 'w') as f:
+            f.write("""
+def assertion_func():
+    assert 3 == 4
+""")
+
+    @action
+    def when_we_import_it_again(self):
+        self.import_fresh_copy()
+        self.exc = contexts.catch(self.module.assertion_func)
+
+    @assertion
+    def it_should_rewrite_the_new_code(self):
+        assert self.rewrite_count > 0
+
+    @assertion
+    def it_should_use_the_new_code(self):
+        assert self.exc.args[0] == "Asserted 3 == 4 but found them not to be equal"
+
+
+class WhenImportingAFileWithNoAssertions(RewrittenCodeCacheSharedContext):
+    def context(self):
+        self.code = """
+# this comment mentions assert, but isn't one
+assert_count = 0
+message = "nor is this assert"
+
+def assertion_func():
+    return message
+"""
+        self.write_file()
+
+    @action
+    def when_we_import_the_file(self):
+        self.import_fresh_copy()
+
+    @assertion
+    def it_should_not_rewrite_it(self):
+        assert self.rewrite_count == 0
+
+    @assertion
+    def it_should_import_the_module(self):
+        assert self.module.assertion_func() == "nor is this assert"
+
+    @assertion
+    def it_should_cache_the_code_so_the_file_need_not_be_parsed_again(self):
+        assert os.path.exists(importlib.util.cache_from_source(self.filename, optimization='contexts'))
+
+
+class WhenImportingAFileWhichNeverMentionsAssertions(RewrittenCodeCacheSharedContext):
+    def context(self):
+        self.code = """
+def plain_func():
+    return 'plain'
+"""
+        self.write_file()
+
+    @action
+    def when_we_import_the_file(self):
+        self.import_fresh_copy()
+
+    @assertion
+    def it_should_import_the_module(self):
+        assert self.module.plain_func() == 'plain'
+
+    @assertion
+    def it_should_leave_the_caching_to_the_standard_loader(self):
+        assert not os.path.exists(importlib.util.cache_from_source(self.filename, optimization='contexts'))
+        assert os.path.exists(importlib.util.cache_from_source(self.filename))
+
+
+class WhenImportingAnUnchangedFileWithACachedRewrite(RewrittenCodeCacheSharedContext):
+    def context(self):
+        self.code = """
+def assertion_func():
+    assert 1 == 2
+"""
+        self.write_file()
+        self.import_fresh_copy()
+
+    @action
+    def when_we_import_it_again(self):
+        with mock.patch('ast.parse', side_effect=ast.parse) as parse:
+            self.import_fresh_copy()
+        self.parse_count = parse.call_count
+
+    @assertion
+    def it_should_not_parse_the_source(self):
+        assert self.parse_count == 0
+
+
+class WhenRewritingAFileWithAssertionsInOnlyOneFunction:
+    def context(self):
+        self.source = """
+def without_assert():
+    return 1
+
+def with_assert():
+    x = 1
+    assert x == 2
+"""
+        self.visited = []
+        rewriter = self
+
+        class SpyingRewriter(AssertionRewriter):
+            def visit_FunctionDef(self, node):
+                rewriter.visited.append(node.name)
+                return self.generic_visit(node)
+        self.tree = ast.parse(self.source)
+        self.rewriter = SpyingRewriter(find_assert_lines(self.tree))
+
+    def because_we_rewrite_the_source(self):
+        self.rewriter.visit(self.tree)
+
+    def it_should_find_the_line_with_the_assertion(self):
+        assert find_assert_lines(ast.parse(self.source)) == [7]
+
+    def it_should_only_visit_the_function_with_the_assertion(self):
+        assert self.visited == ['with_assert']
@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import tempfile
+from contexts import core
+from contexts.plugins.identification import NameBasedIdentifier
+from contexts.plugins.importing import Importer
+from contexts.plugins.importing.lazy import LazyImporter
+
+
+class OnlySelects:
+    def __init__(self, class_name):
+        self.class_name = class_name
+
+    def process_class_list(self, module, classes):
+        classes[:] = [c for c in classes if c.__name__ == self.class_name]
+
+
+class WhenImportingLazily:
+    def establish_that_there_are_two_test_files(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tempdir.name, 'lazy_selected_spec.py'), 'w') as f:
+            f.write("imported = True\n\nclass WhenSelected:\n    def it_should_run(self):\n        pass\n")
+        with open(os.path.join(self.tempdir.name, 'lazy_unselected_spec.py'), 'w') as f:
+            f.write("raise Exception('should not be imported')\n\nclass WhenNotSelected:\n    def it_should_not_run(self):\n        pass\n")
+
+        self.lazy_importer = LazyImporter()
+        parser = argparse.ArgumentParser()
+        self.lazy_importer.setup_parser(parser)
+        self.lazy_importer.initialise(parser.parse_args(['--lazy-import']), {})
+
+        self.composite = core.PluginComposite([self.lazy_importer, NameBasedIdentifier(), OnlySelects('WhenSelected'), Importer()])
+        self.unexpected_errors = []
+        self.composite.unexpected_error = self.unexpected_errors.append
+
+    def because_we_import_the_modules_and_run_the_suites(self):
+        modules = [self.composite.import_module(self.tempdir.name, name) for name in ('lazy_selected_spec', 'lazy_unselected_spec')]
+        self.suites = [core.Suite(m, self.composite) for m in modules]
+        self.composite.run_suites(self.suites)
+
+    def it_should_only_leave_the_selected_module_to_be_run(self):
+        assert [s.name for s in self.suites] == ['lazy_selected_spec']
+
+    def it_should_import_the_selected_module_for_real(self):
+        assert self.suites[0].module.imported
+
+    def it_should_keep_the_selected_class(self):
+        assert [c.__name__ for c in self.suites[0].classes] == ['WhenSelected']
+
+    def it_should_not_import_the_unselected_module(self):
+        assert 'lazy_unselected_spec' not in sys.modules
+        assert self.unexpected_errors == []
+
+    def cleanup_the_tempdir_and_sys_dot_modules(self):
+        sys.modules.pop('lazy_selected_spec', None)
+        self.tempdir.cleanup()
@@ -0,0 +1,122 @@
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+from io import StringIO
+from contexts import core, plugin_discovery
+from contexts.plugins.importing.assertion_rewriting import AssertionRewritingLoader
+from contexts.plugins.importing.precompiling import Precompiler
+from contexts.plugins.listing import TestLister
+from contexts.plugins.sharding import ShardSelector
+
+
+class WhenPrecompilingTestFiles:
+    def establish_that_there_are_some_test_files(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filenames = []
+        for name in ('precompiled_spec_one', 'precompiled_spec_two'):
+            filename = os.path.join(self.tempdir.name, name + '.py')
+            with open(filename, 'w') as f:
+                f.write("raise Exception('should not be run')\n\ndef assertion_func():\n    assert 1 == 2\n")
+            self.filenames.append(filename)
+
+        self.stream = StringIO()
+        self.precompiler = Precompiler(self.stream)
+        parser = argparse.ArgumentParser()
+        self.precompiler.setup_parser(parser)
+        self.precompiler.initialise(parser.parse_args(['--precompile']), {})
+        self.precompiler.processes = 2
+
+    def because_we_import_the_files_and_run_the_suites(self):
+        composite = core.PluginComposite([])
+        modules = [self.precompiler.import_module(self.tempdir.name, name) for name in ('precompiled_spec_one', 'precompiled_spec_two')]
+        self.suites = [core.Suite(m, composite) for m in modules]
+        self.precompiler.run_suites(self.suites)
+
+    def it_should_not_run_the_files(self):
+        assert 'precompiled_spec_one' not in sys.modules
+        assert 'precompiled_spec_two' not in sys.modules
+
+    def it_should_not_leave_anything_to_be_run(self):
+        assert self.suites == []
+
+    def it_should_write_the_rewritten_code_to_the_cache(self):
+        for filename in self.filenames:
+            assert os.path.isfile(importlib.util.cache_from_source(filename, optimization='contexts'))
+
+    def it_should_not_need_to_rewrite_the_files_again(self):
+        for filename in self.filenames:
+            loader = AssertionRewritingLoader('precompiled_spec', filename)
+            _, from_cache = loader.get_rewritten_code(write_cache=False)
+            assert from_cache
+
+    def it_should_say_how_many_files_it_precompiled(self):
+        assert self.stream.getvalue() == "Precompiled 2 test files (0 were already up to date)\n"
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenPrecompilingTestFilesWhichHaveBeenPrecompiledBefore:
+    def establish_that_one_file_has_been_precompiled_and_one_has_nothing_to_rewrite(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tempdir.name, 'precompiled_spec_asserts.py'), 'w') as f:
+            f.write("def assertion_func():\n    assert 1 == 2\n")
+        with open(os.path.join(self.tempdir.name, 'precompiled_spec_plain.py'), 'w') as f:
+            f.write("x = 1\n")
+        precompile(self.tempdir.name, ['precompiled_spec_asserts', 'precompiled_spec_plain'])
+
+    def because_we_precompile_them_again(self):
+        self.stream = precompile(self.tempdir.name, ['precompiled_spec_asserts', 'precompiled_spec_plain'])
+
+    def it_should_count_the_rewritten_file_and_the_file_with_nothing_to_rewrite(self):
+        assert self.stream.getvalue() == "Precompiled 2 test files (2 were already up to date)\n"
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenPrecompilingAFileWithNothingToRewriteWhichHasChangedSinceItWasPrecompiled:
+    def establish_that_a_precompiled_file_has_been_edited(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tempdir.name, 'precompiled_spec_plain.py')
+        with open(self.filename, 'w') as f:
+            f.write("x = 1\n")
+        precompile(self.tempdir.name, ['precompiled_spec_plain'])
+        with open(self.filename, 'w') as f:
+            f.write("x = 'changed'\n")
+
+    def because_we_precompile_the_file_again(self):
+        self.stream = precompile(self.tempdir.name, ['precompiled_spec_plain'])
+
+    def it_should_not_count_it_as_up_to_date(self):
+        assert self.stream.getvalue() == "Precompiled 1 test files (0 were already up to date)\n"
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenPuttingThePrecompilerInOrder:
+    def given_the_shard_selector_and_the_test_lister(self):
+        self.builder = plugin_discovery.PluginListBuilder()
+        for cls in (TestLister, ShardSelector, Precompiler):
+            self.builder.add(cls)
+
+    def because_we_sort_the_plugins(self):
+        self.plugins = self.builder.to_list()
+
+    def it_should_come_before_the_shard_selector(self):
+        assert self.plugins.index(Precompiler) < self.plugins.index(ShardSelector) < self.plugins.index(TestLister)
+
+
+def precompile(folder, names):
+    stream = StringIO()
+    precompiler = Precompiler(stream)
+    parser = argparse.ArgumentParser()
+    precompiler.setup_parser(parser)
+    precompiler.initialise(parser.parse_args(['--precompile']), {})
+    precompiler.processes = 2
+    modules = [precompiler.import_module(folder, name) for name in names]
+    precompiler.run_suites([core.Suite(m, core.PluginComposite([])) for m in modules])
+    return stream
@@ -0,0 +1,143 @@
+import os
+import sys
+import tempfile
+from io import StringIO
+from contexts import core
+from contexts.plugin_interface import CONTEXT, SETUP, ASSERTION, EXAMPLES
+from contexts.plugins.identification import NameBasedIdentifier
+from contexts.plugins.identification.decorators import DecoratorBasedIdentifier
+from contexts.plugins.importing.static import load_stand_in_module, read_outline
+from contexts.plugins.listing import TestLister
+
+
+class StaticImportSharedContext:
+    def establish_that_there_is_a_test_file(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tempdir.name, 'static_spec.py')
+        with open(self.filename, 'w') as f:
+            f.write(self.code)
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenLoadingAStandInForAModule(StaticImportSharedContext):
+    code = """
+import this_module_does_not_exist
+import contexts
+
+raise Exception("the module should not be run")
+
+
+class WhenSomethingHappens:
+    @classmethod
+    def examples_of_things(cls):
+        yield 1
+
+    def given_something(self):
+        pass
+
+    @contexts.assertion
+    def the_thing_should_happen(self):
+        pass
+
+
+@contexts.spec
+class Unconventional(WhenSomethingHappens):
+    def it_should_inherit_the_setup(self):
+        pass
+"""
+
+    def because_we_load_the_stand_in(self):
+        self.module = load_stand_in_module(self.filename, 'static_spec')
+        self.identifiers = [DecoratorBasedIdentifier(), NameBasedIdentifier()]
+
+    def it_should_not_put_it_in_sys_dot_modules(self):
+        assert 'static_spec' not in sys.modules
+
+    def it_should_give_the_module_the_right_name_and_file(self):
+        assert self.module.__name__ == 'static_spec'
+        assert self.module.__file__ == self.filename
+
+    def it_should_contain_a_stand_in_for_each_class(self):
+        assert self.module.WhenSomethingHappens.__module__ == 'static_spec'
+        assert self.module.Unconventional.__qualname__ == 'Unconventional'
+
+    def it_should_follow_superclasses_in_the_same_file(self):
+        assert issubclass(self.module.Unconventional, self.module.WhenSomethingHappens)
+
+    def it_should_identify_the_classes_by_name_and_by_decorator(self):
+        assert self.identify('identify_class', self.module.WhenSomethingHappens) is CONTEXT
+        assert self.identify('identify_class', self.module.Unconventional) is CONTEXT
+
+    def it_should_identify_the_methods_by_name_and_by_decorator(self):
+        cls = self.module.WhenSomethingHappens
+        assert self.identify('identify_method', cls.examples_of_things) is EXAMPLES
+        assert self.identify('identify_method', cls.given_something) is SETUP
+        assert self.identify('identify_method', cls.the_thing_should_happen) is ASSERTION
+
+    def identify(self, hook, obj):
+        for identifier in self.identifiers:
+            reply = getattr(identifier, hook)(obj)
+            if reply is not None:
+                return reply
+
+
+class WhenLoadingAStandInFromAnOutline(StaticImportSharedContext):
+    code = """
+@contexts.spec
+class WhenSomethingHappens:
+    @contexts.setup
+    def prepare(self):
+        pass
+"""
+
+    def given_the_outline_of_the_file(self):
+        self.outline = read_outline(self.filename)
+        os.remove(self.filename)
+
+    def because_we_load_the_stand_in_from_the_outline(self):
+        self.module = load_stand_in_module(self.filename, 'static_spec', self.outline)
+
+    def it_should_not_need_the_file(self):
+        assert self.module.__file__ == self.filename
+
+    def it_should_identify_the_class_and_its_methods(self):
+        identifier = DecoratorBasedIdentifier()
+        assert identifier.identify_class(self.module.WhenSomethingHappens) is CONTEXT
+        assert identifier.identify_method(self.module.WhenSomethingHappens.prepare) is SETUP
+
+
+class WhenListingTests(StaticImportSharedContext):
+    code = """
+class WhenListingTests:
+    def because_we_list_them(self):
+        raise Exception("the test should not be run")
+
+    def it_should_be_listed(self):
+        pass
+
+    def it_should_also_be_listed(self):
+        pass
+"""
+
+    def given_a_lister(self):
+        self.stream = StringIO()
+        self.lister = TestLister(self.stream)
+        module = self.lister.import_module(self.tempdir.name, 'static_spec')
+        composite = core.PluginComposite([NameBasedIdentifier()])
+        self.suites = [core.Suite(module, composite)]
+
+    def because_we_run_the_suites(self):
+        self.lister.run_suites(self.suites)
+
+    def it_should_list_the_module_the_class_and_its_assertions(self):
+        assert self.stream.getvalue().splitlines() == [
+            'static_spec',
+            '    WhenListingTests',
+            '        it_should_be_listed',
+            '        it_should_also_be_listed'
+        ]
+
+    def it_should_not_leave_anything_to_be_run(self):
+        assert self.suites == []
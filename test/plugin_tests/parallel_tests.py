@@ -0,0 +1,346 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import xml.etree.ElementTree as ET
+from io import StringIO
+from contexts import core
+from contexts.errors import RemoteError
+from contexts.plugin_interface import CONTEXT, ASSERTION, NO_EXAMPLE
+from contexts.plugins.parallel import AsyncioRunner, ProcessPoolRunner, ThreadPoolRunner
+from contexts.plugins.reporting.xml import XmlReporter
+from .tools import ExceptionThrowingArgumentParser
+
+
+class RecordingPlugin(object):
+    def __init__(self):
+        self.calls = []
+
+    def identify_class(self, cls):
+        return CONTEXT
+
+    def identify_method(self, func):
+        return ASSERTION
+
+    def suite_started(self, module):
+        self.calls.append(('suite_started', module))
+
+    def suite_ended(self, module):
+        self.calls.append(('suite_ended', module))
+
+    def context_started(self, cls, example):
+        self.calls.append(('context_started', cls, example))
+
+    def assertion_passed(self, func):
+        self.calls.append(('assertion_passed', func))
+
+    def assertion_failed(self, func, exception):
+        self.calls.append(('assertion_failed', func, exception))
+
+
+class WhenInitialisingProcessPoolRunnerWithoutAProcessCount:
+    def given_a_parser(self):
+        self.plugin = ProcessPoolRunner()
+        self.parser = ExceptionThrowingArgumentParser()
+        self.plugin.setup_parser(self.parser)
+
+    def because_we_initialise_the_plugin(self):
+        self.result = self.plugin.initialise(self.parser.parse_args([]), {})
+
+    def it_should_not_be_added_to_the_list(self):
+        assert not self.result
+
+
+class WhenInitialisingProcessPoolRunnerWithAProcessCount:
+    def given_a_parser(self):
+        self.plugin = ProcessPoolRunner()
+        self.parser = ExceptionThrowingArgumentParser()
+        self.plugin.setup_parser(self.parser)
+
+    def because_we_initialise_the_plugin(self):
+        self.result = self.plugin.initialise(self.parser.parse_args(['--processes', '3']), {})
+
+    def it_should_be_added_to_the_list(self):
+        assert self.result
+
+    def it_should_remember_the_number_of_processes(self):
+        assert self.plugin.processes == 3
+
+
+class WhenRunningSuitesInWorkerProcesses:
+    def given_two_test_modules(self):
+        class Passing:
+            def it_should_pass(s):
+                print("hello from the worker")
+
+        class Failing:
+            def it_should_fail(s):
+                assert False, "oh no"
+
+        self.module1 = types.ModuleType('parallel_spec_one')
+        self.module1.Passing = Passing
+        self.module2 = types.ModuleType('parallel_spec_two')
+        self.module2.Failing = Failing
+        self.Passing, self.Failing = Passing, Failing
+
+        self.plugin = RecordingPlugin()
+        composite = core.PluginComposite([self.plugin])
+        self.suites = [core.Suite(self.module1, composite), core.Suite(self.module2, composite)]
+
+        self.runner = ProcessPoolRunner()
+        self.runner.processes = 2
+
+        self.real_stdout = sys.stdout
+        sys.stdout = self.fake_stdout = StringIO()
+
+    def because_we_run_the_suites(self):
+        self.runner.run_suites(self.suites)
+
+    def it_should_take_the_suites_out_of_the_list(self):
+        assert self.suites == []
+
+    def it_should_report_each_suite_with_the_real_module(self):
+        modules = [call[1] for call in self.plugin.calls if call[0] == 'suite_started']
+        assert sorted(modules, key=lambda m: m.__name__) == [self.module1, self.module2]
+
+    def it_should_report_the_contexts_with_the_real_classes(self):
+        contexts = [call[1:] for call in self.plugin.calls if call[0] == 'context_started']
+        assert sorted(contexts, key=lambda c: c[0].__name__) == [(self.Failing, NO_EXAMPLE), (self.Passing, NO_EXAMPLE)]
+
+    def it_should_report_the_passing_assertion(self):
+        assert ('assertion_passed', self.Passing.it_should_pass) in self.plugin.calls
+
+    def it_should_report_the_failing_assertion_with_its_traceback(self):
+        [(_, func, exception)] = [call for call in self.plugin.calls if call[0] == 'assertion_failed']
+        assert func is self.Failing.it_should_fail
+        assert isinstance(exception, RemoteError)
+        assert str(exception) == "oh no"
+        assert exception.formatted[-1] == "AssertionError: oh no"
+
+    def it_should_report_each_suite_in_one_piece(self):
+        names = [call[0] for call in self.plugin.calls]
+        assert names[0] == names[4] == 'suite_started'
+        assert names[3] == names[7] == 'suite_ended'
+
+    def it_should_write_the_output_from_the_worker(self):
+        assert "hello from the worker" in self.fake_stdout.getvalue()
+
+    def cleanup_stdout(self):
+        sys.stdout = self.real_stdout
+
+
+class WhenTimingASuiteWhichRanInAWorkerProcess:
+    def given_a_slow_test_module_and_an_xml_reporter(self):
+        class Slow:
+            def it_should_take_a_while(s):
+                time.sleep(0.1)
+
+        self.module = types.ModuleType('parallel_spec_slow')
+        self.module.Slow = Slow
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.xml = XmlReporter()
+        self.xml.path = os.path.join(self.tempdir.name, 'output.xml')
+        composite = core.PluginComposite([RecordingPlugin(), self.xml])
+        self.suites = [core.Suite(self.module, composite)]
+
+        self.runner = ProcessPoolRunner()
+        self.runner.processes = 2
+
+    def because_we_run_the_suite_and_write_the_report(self):
+        self.runner.run_suites(self.suites)
+        self.xml.test_run_ended()
+
+    def it_should_report_how_long_the_test_took_rather_than_how_long_replaying_it_took(self):
+        suite = ET.parse(self.xml.path).getroot().find('testsuite')
+        assert float(suite.get('time')) >= 0.09
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenInitialisingAsyncioRunnerWithAConcurrencyLimit:
+    def given_a_parser(self):
+        self.plugin = AsyncioRunner()
+        self.parser = ExceptionThrowingArgumentParser()
+        self.plugin.setup_parser(self.parser)
+
+    def because_we_initialise_the_plugin(self):
+        self.result = self.plugin.initialise(self.parser.parse_args(['--async-concurrency', '10']), {})
+
+    def it_should_be_added_to_the_list(self):
+        assert self.result
+
+    def it_should_remember_the_limit(self):
+        assert self.plugin.concurrency == 10
+
+
+class WhenRunningAsyncClassesConcurrently:
+    def given_two_classes_which_wait_for_each_other(self):
+        # if the classes were run one after the other, the first one would time out
+        class First:
+            async def it_should_hear_from_the_second(s):
+                self.heard_from_second = asyncio.Event()
+                print("hello from the first")
+                await asyncio.wait_for(self.heard_from_second.wait(), 5)
+
+        class Second:
+            async def it_should_speak_to_the_first(s):
+                self.heard_from_second.set()
+                print("hello from the second")
+
+        self.module = types.ModuleType('async_spec')
+        self.module.First = First
+        self.module.Second = Second
+        self.First, self.Second = First, Second
+
+        self.plugin = RecordingPlugin()
+        composite = core.PluginComposite([self.plugin])
+        self.suites = [core.Suite(self.module, composite)]
+        self.suites[0].classes[:] = [First, Second]
+
+        self.runner = AsyncioRunner()
+        self.runner.concurrency = 2
+
+        self.real_stdout = sys.stdout
+        sys.stdout = self.fake_stdout = StringIO()
+
+    def because_we_run_the_suites(self):
+        self.runner.run_suites(self.suites)
+        core.close_event_loop()
+
+    def it_should_take_the_suites_out_of_the_list(self):
+        assert self.suites == []
+
+    def it_should_run_both_classes_at_once(self):
+        assert not [call for call in self.plugin.calls if call[0] == 'assertion_failed']
+        assert len([call for call in self.plugin.calls if call[0] == 'assertion_passed']) == 2
+
+    def it_should_report_the_classes_in_turn(self):
+        contexts = [call[1] for call in self.plugin.calls if call[0] == 'context_started']
+        assert contexts == [self.First, self.Second]
+
+    def it_should_report_the_suite_around_the_classes(self):
+        assert self.plugin.calls[0] == ('suite_started', self.module)
+        assert self.plugin.calls[-1] == ('suite_ended', self.module)
+
+    def it_should_write_the_output_from_each_class(self):
+        assert "hello from the first" in self.fake_stdout.getvalue()
+        assert "hello from the second" in self.fake_stdout.getvalue()
+
+    def cleanup_stdout(self):
+        sys.stdout = self.real_stdout
+
+
+class WhenInitialisingThreadPoolRunnerWithoutAThreadCount:
+    def given_a_parser(self):
+        self.plugin = ThreadPoolRunner()
+        self.parser = ExceptionThrowingArgumentParser()
+        self.plugin.setup_parser(self.parser)
+
+    def because_we_initialise_the_plugin(self):
+        self.result = self.plugin.initialise(self.parser.parse_args([]), {})
+
+    def it_should_not_be_added_to_the_list(self):
+        assert not self.result
+
+
+class WhenRunningClassesInThreads:
+    def given_two_classes_which_wait_for_each_other(self):
+        # if the classes were run one after the other, the first one would time out
+        barrier = threading.Barrier(2, timeout=5)
+
+        class First:
+            def it_should_meet_the_second(s):
+                print("hello from the first")
+                barrier.wait()
+
+        class Second:
+            def it_should_meet_the_first(s):
+                barrier.wait()
+                print("hello from the second")
+
+        self.module = types.ModuleType('threaded_spec')
+        self.module.First = First
+        self.module.Second = Second
+        self.First, self.Second = First, Second
+
+        self.plugin = RecordingPlugin()
+        composite = core.PluginComposite([self.plugin])
+        self.suites = [core.Suite(self.module, composite)]
+        self.suites[0].classes[:] = [First, Second]
+
+        self.runner = ThreadPoolRunner()
+        self.runner.threads = 2
+
+        self.real_stdout = sys.stdout
+        sys.stdout = self.fake_stdout = StringIO()
+
+    def because_we_run_the_suites(self):
+        self.runner.run_suites(self.suites)
+
+    def it_should_take_the_suites_out_of_the_list(self):
+        assert self.suites == []
+
+    def it_should_run_both_classes_at_once(self):
+        assert not [call for call in self.plugin.calls if call[0] == 'assertion_failed']
+        assert len([call for call in self.plugin.calls if call[0] == 'assertion_passed']) == 2
+
+    def it_should_report_the_classes_in_turn(self):
+        contexts = [call[1] for call in self.plugin.calls if call[0] == 'context_started']
+        assert contexts == [self.First, self.Second]
+
+    def it_should_report_the_suite_around_the_classes(self):
+        assert self.plugin.calls[0] == ('suite_started', self.module)
+        assert self.plugin.calls[-1] == ('suite_ended', self.module)
+
+    def it_should_write_the_output_from_each_class_in_turn(self):
+        assert self.fake_stdout.getvalue() == "hello from the first\nhello from the second\n"
+
+    def it_should_put_the_real_stdout_back(self):
+        assert sys.stdout is self.fake_stdout
+
+    def cleanup_stdout(self):
+        sys.stdout = self.real_stdout
+
+
+class WhenRunningAsyncClassesInThreads:
+    def given_more_async_classes_than_threads(self):
+        self.loops = []
+        lock = threading.Lock()
+
+        async def it_should_note_the_loop(s):
+            with lock:
+                self.loops.append(asyncio.get_running_loop())
+
+        self.module = types.ModuleType('threaded_async_spec')
+        for i in range(6):
+            setattr(self.module, 'Spec{}'.format(i), type('Spec{}'.format(i), (), {'it_should_note_the_loop': it_should_note_the_loop}))
+
+        composite = core.PluginComposite([RecordingPlugin()])
+        self.suites = [core.Suite(self.module, composite)]
+        self.suites[0].classes[:] = [getattr(self.module, 'Spec{}'.format(i)) for i in range(6)]
+
+        self.runner = ThreadPoolRunner()
+        self.runner.threads = 2
+
+        self.real_stdout = sys.stdout
+        sys.stdout = StringIO()
+
+    def because_we_run_the_suites(self):
+        self.runner.run_suites(self.suites)
+
+    def it_should_run_every_class(self):
+        assert len(self.loops) == 6
+
+    def it_should_keep_one_loop_per_thread(self):
+        assert len(set(self.loops)) <= 2
+
+    def it_should_close_the_loops_once_the_classes_have_finished(self):
+        assert all(loop.is_closed() for loop in self.loops)
+
+    def cleanup_stdout(self):
+        sys.stdout = self.real_stdout
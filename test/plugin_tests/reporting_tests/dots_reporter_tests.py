@@ -61,3 +61,104 @@ class WhenWatchingForDotsAndAnUnexpectedErrorOccurs(DotsReporterSharedContext):
 
     def it_should_print_an_E_for_the_error(self):
         assert self.stringio.getvalue() == 'E'
+
+
+class FlushCountingStream(StringIO):
+    def __init__(self, tty):
+        super().__init__()
+        self.tty = tty
+        self.flushes = 0
+
+    def isatty(self):
+        return self.tty
+
+    def flush(self):
+        self.flushes += 1
+
+
+class WhenPrintingLotsOfDotsToAPipe:
+    def context(self):
+        self.stream = FlushCountingStream(tty=False)
+        self.reporter = cli.DotsReporter(self.stream)
+        self.reporter.flush_interval = 3600
+
+    def because_lots_of_assertions_pass(self):
+        for _ in range(1000):
+            self.reporter.assertion_passed(lambda: None)
+        self.flushes_after_passing = self.stream.flushes
+        self.reporter.assertion_failed(lambda: None, AssertionError())
+        self.flushes_after_failing = self.stream.flushes
+
+    def it_should_print_all_the_dots(self):
+        assert self.stream.getvalue() == '.' * 1000 + 'F'
+
+    def it_should_not_flush_the_stream_for_every_dot(self):
+        assert self.flushes_after_passing <= 1
+
+    def it_should_flush_the_stream_as_soon_as_an_assertion_fails(self):
+        assert self.flushes_after_failing == self.flushes_after_passing + 1
+
+
+class WhenPrintingDotsToATerminal:
+    def context(self):
+        self.stream = FlushCountingStream(tty=True)
+        self.reporter = cli.DotsReporter(self.stream)
+        self.reporter.flush_interval = 3600
+
+    def because_some_assertions_pass(self):
+        for _ in range(10):
+            self.reporter.assertion_passed(lambda: None)
+
+    def it_should_flush_the_stream_for_every_dot(self):
+        assert self.stream.flushes == 10
+
+
+class WhenADotsReportedTestRunEnds:
+    def context(self):
+        self.stream = FlushCountingStream(tty=False)
+        self.reporter = cli.DotsReporter(self.stream)
+        self.reporter.flush_interval = 3600
+        self.reporter.assertion_passed(lambda: None)
+        self.reporter.assertion_passed(lambda: None)
+        self.flushes_before = self.stream.flushes
+
+    def because_the_test_run_ends(self):
+        self.reporter.test_run_ended()
+
+    def it_should_flush_the_stream(self):
+        assert self.stream.flushes == self.flushes_before + 1
+
+
+class WhenTheNextTestStartsLongerThanTheFlushIntervalAfterTheLastFlush:
+    def context(self):
+        self.stream = FlushCountingStream(tty=False)
+        self.reporter = cli.DotsReporter(self.stream)
+        self.reporter.flush_interval = 3600
+        self.reporter.assertion_passed(lambda: None)
+        self.reporter.assertion_passed(lambda: None)
+        self.flushes_before = self.stream.flushes
+        self.reporter.last_flush -= 3600
+        self.ctx = tools.create_context('WhenSomethingIsSlow')
+
+    def because_the_next_test_starts(self):
+        self.reporter.context_started(self.ctx.cls, self.ctx.example)
+
+    def it_should_flush_the_dots_printed_so_far(self):
+        assert self.stream.flushes == self.flushes_before + 1
+
+
+class WhenTheNextTestStartsWithinTheFlushInterval:
+    def context(self):
+        self.stream = FlushCountingStream(tty=False)
+        self.reporter = cli.DotsReporter(self.stream)
+        self.reporter.flush_interval = 3600
+        self.reporter.assertion_passed(lambda: None)
+        self.reporter.assertion_passed(lambda: None)
+        self.flushes_before = self.stream.flushes
+        self.ctx = tools.create_context('WhenSomethingIsQuick')
+
+    def because_the_next_test_starts(self):
+        self.reporter.context_started(self.ctx.cls, self.ctx.example)
+
+    def it_should_not_flush_the_stream(self):
+        assert self.stream.flushes == self.flushes_before
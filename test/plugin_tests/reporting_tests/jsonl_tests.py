@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+import types
+
+from contexts.plugin_interface import replaying_event
+from contexts.plugins.reporting import jsonl
+from .. import tools
+
+
+class WhenInitialisingTheJsonLinesReporterWithoutAPath:
+    def given_a_parser(self):
+        self.reporter = jsonl.JsonLinesReporter()
+        self.parser = tools.ExceptionThrowingArgumentParser()
+        self.reporter.setup_parser(self.parser)
+
+    def because_we_initialise_the_plugin(self):
+        self.result = self.reporter.initialise(self.parser.parse_args([]), {})
+
+    def it_should_not_be_added_to_the_list(self):
+        assert not self.result
+
+
+class JsonLinesSharedContext:
+    def establish_that_there_is_a_reporter(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tempdir.name, 'events.jsonl')
+        parser = tools.ExceptionThrowingArgumentParser()
+        self.reporter = jsonl.JsonLinesReporter()
+        self.reporter.setup_parser(parser)
+        self.reporter.initialise(parser.parse_args(['--jsonl', self.filename]), {})
+
+    def read_records(self):
+        with open(self.filename, 'r') as f:
+            return [json.loads(line) for line in f]
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenAnAssertionFailsInAJsonLinesRun(JsonLinesSharedContext):
+    def given_a_failing_assertion(self):
+        self.module = types.ModuleType('test_module')
+        self.ctx = tools.create_context('WhenSomethingHappens')
+        self.ctx.cls.__module__ = 'test_module'
+        self.assertion = lambda: None
+        self.assertion.__name__ = 'it_should_work'
+        try:
+            raise AssertionError('it did not work')
+        except AssertionError as e:
+            self.exception = e
+
+    def because_the_run_goes_by(self):
+        self.reporter.test_run_started()
+        self.reporter.suite_started(self.module)
+        self.reporter.test_class_started(self.ctx.cls)
+        self.reporter.context_started(self.ctx.cls, self.ctx.example)
+        self.reporter.assertion_started(self.assertion)
+        self.reporter.assertion_failed(self.assertion, self.exception)
+        self.reporter.context_timed(self.ctx.cls, self.ctx.example, {'setup': 1, 'action': 2, 'assertions': 3, 'teardown': 4})
+        self.reporter.context_ended(self.ctx.cls, self.ctx.example)
+        self.reporter.test_class_ended(self.ctx.cls)
+        self.reporter.suite_ended(self.module)
+        self.reporter.test_run_ended()
+        self.records = self.read_records()
+        with open(self.filename, 'r') as f:
+            self.lines = f.read().splitlines()
+
+    def it_should_write_a_record_for_every_event(self):
+        assert [r['event'] for r in self.records] == [
+            'test_run_started', 'suite_started', 'test_class_started', 'context_started',
+            'assertion_started', 'assertion_failed', 'context_timed',
+            'context_ended', 'test_class_ended', 'suite_ended', 'test_run_ended']
+
+    def it_should_identify_the_assertion_by_its_module_class_and_name(self):
+        assert self.records[5]['id'] == 'test_module.WhenSomethingHappens::it_should_work'
+
+    def it_should_identify_the_class_by_its_qualified_name(self):
+        assert self.records[2]['id'] == 'test_module.WhenSomethingHappens'
+
+    def it_should_give_times_which_never_go_backwards(self):
+        times = [r['time_ns'] for r in self.records]
+        assert times == sorted(times)
+
+    def it_should_say_how_long_each_finished_thing_took(self):
+        for record in self.records:
+            if record['event'].endswith(('_ended', '_failed')):
+                assert record['duration_ns'] >= 0
+
+    def it_should_include_the_formatted_exception(self):
+        assert self.records[5]['message'] == 'AssertionError: it did not work'
+        assert self.records[5]['exception'].startswith('Traceback (most recent call last):')
+
+    def it_should_include_the_phase_timings(self):
+        assert self.records[6]['phases_ns'] == {'setup': 1, 'action': 2, 'assertions': 3, 'teardown': 4}
+
+    def it_should_write_compact_records(self):
+        assert self.lines == [json.dumps(r, separators=(',', ':')) for r in self.records]
+
+    def it_should_forget_everything_which_has_finished(self):
+        assert self.reporter.started == {}
+
+
+class WhenAParametrisedSpecIsReportedAsJsonLines(JsonLinesSharedContext):
+    def given_a_parametrised_spec(self):
+        self.cls = type('WhenSomethingHappens', (), {'__module__': 'test_module'})
+        self.examples = [object(), object()]
+
+    def because_the_spec_runs(self):
+        self.reporter.test_class_started(self.cls)
+        for example in self.examples:
+            self.reporter.context_started(self.cls, example)
+            self.reporter.context_ended(self.cls, example)
+        self.records = self.read_records()
+
+    def it_should_identify_each_test_case_by_its_position(self):
+        assert [r['id'] for r in self.records] == [
+            'test_module.WhenSomethingHappens',
+            'test_module.WhenSomethingHappens[0]', 'test_module.WhenSomethingHappens[0]',
+            'test_module.WhenSomethingHappens[1]', 'test_module.WhenSomethingHappens[1]']
+
+    def it_should_write_the_records_out_before_the_run_finishes(self):
+        assert [r['event'] for r in self.records] == ['test_class_started', 'context_started', 'context_ended', 'context_started', 'context_ended']
+
+    def cleanup_the_file(self):
+        self.reporter.test_run_ended()
+
+
+class WhenAReplayedContextIsReportedAsJsonLines(JsonLinesSharedContext):
+    def given_a_spec(self):
+        self.ctx = tools.create_context('WhenSomethingHappens')
+        self.ctx.cls.__module__ = 'test_module'
+        self.origin = self.reporter.origin
+
+    def because_the_events_are_replayed_some_time_after_they_happened(self):
+        with replaying_event(self.origin + 10 ** 9):
+            self.reporter.context_started(self.ctx.cls, self.ctx.example)
+        with replaying_event(self.origin + 10 ** 9 + 3 * 10 ** 8):
+            self.reporter.context_ended(self.ctx.cls, self.ctx.example)
+        self.reporter.test_run_ended()
+        self.records = self.read_records()
+
+    def it_should_give_the_times_the_events_happened(self):
+        assert [r['time_ns'] for r in self.records[:2]] == [10 ** 9, 10 ** 9 + 3 * 10 ** 8]
+
+    def it_should_time_the_spec_from_the_recorded_event_times(self):
+        assert self.records[1]['duration_ns'] == 3 * 10 ** 8
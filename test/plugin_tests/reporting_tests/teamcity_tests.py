@@ -311,6 +311,34 @@ class WhenSomethingGetsPrintedDuringAFailingAssertionInTeamCity(TeamCitySharedCo
         sys.stdout, sys.stderr = self.real_stdout, self.real_stderr
 
 
+class WhenAFailingAssertionHasPrintedSomethingInTeamCity(TeamCitySharedContext):
+    def establish_that_something_has_been_printed(self):
+        self.stream = WriteCountingStringIO()
+        self.reporter = teamcity.TeamCityReporter(self.stream)
+        self.real_stdout = sys.stdout
+        sys.stdout = StringIO()
+
+        context = tools.create_context()
+        self.reporter.context_started(context.cls, context.example)
+        print("to stdout")
+
+        self.assertion = lambda: None
+        self.assertion.__name__ = "assertion"
+
+    def because_the_assertion_fails(self):
+        self.reporter.assertion_failed(self.assertion, Exception())
+
+    def it_should_send_all_three_messages(self):
+        assert [line.split(' ')[0] for line in self.stream.getvalue().splitlines()] == [
+            "##teamcity[testStdOut", "##teamcity[testFailed", "##teamcity[testFinished"]
+
+    def it_should_write_them_to_the_stream_in_one_go(self):
+        assert len([s for s in self.stream.writes if '##teamcity' in s]) == 1
+
+    def cleanup_stdout(self):
+        sys.stdout = self.real_stdout
+
+
 ###########################################################
 # assertion_errored tests
 ###########################################################
@@ -573,6 +601,29 @@ class WhenASecondContextRunsAfterAnError(TeamCitySharedContext):
         assert self.parse_line(-1)[1]['name'] == 'the second context -> a lovely assertion'
 
 
+###########################################################
+# escaping tests
+###########################################################
+
+class WhenEscapingAValueForTeamCity:
+    @classmethod
+    def examples(self):
+        yield "nothing to escape", "nothing to escape"
+        yield "it's [quoted] | piped", "it|'s |[quoted|] || piped"
+        yield "line one\r\nline two", "line one|r|nline two"
+        yield "caf\u00e9 \u2603", "caf|0x00e9 |0x2603"
+        yield "", ""
+
+    def context(self, example):
+        self.value, self.expected = example
+
+    def because_we_escape_the_value(self):
+        self.result = teamcity.escape(self.value)
+
+    def it_should_escape_the_special_characters(self):
+        assert self.result == self.expected
+
+
 class WhenParsingATeamCityMessage:
     # tests for the test helper method
     @classmethod
@@ -607,3 +658,13 @@ def teamcity_parse(string):
         assignments = {}
 
     return (outer_match.group(1), assignments)
+
+
+class WriteCountingStringIO(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, s):
+        self.writes.append(s)
+        return super().write(s)
@@ -2,6 +2,7 @@ from io import StringIO
 from contexts.plugins.reporting import cli
 from contexts import action
 from .. import tools
+from .dots_reporter_tests import FlushCountingStream
 
 
 class VerboseReporterSharedContext:
@@ -24,6 +25,37 @@ class WhenPrintingVerboselyAndAContextStarts(VerboseReporterSharedContext):
         assert self.stringio.getvalue() == "made up context 1\n"
 
 
+class WhenPrintingVerboselyToAPipeAndASpecStarts:
+    def context(self):
+        self.stream = FlushCountingStream(tty=False)
+        self.reporter = cli.VerboseReporter(self.stream)
+        self.reporter.flush_interval = 3600
+        self.reporter.assertion_passed(lambda: None)
+        self.flushes_before = self.stream.flushes
+        self.ctx = tools.create_context("slow_spec")
+
+    def because_a_spec_starts(self):
+        self.reporter.context_started(self.ctx.cls, self.ctx.example)
+
+    def it_should_flush_the_name_of_the_spec_straight_away(self):
+        assert self.stream.flushes == self.flushes_before + 1
+
+
+class WhenAStreamReportersTestRunEnds:
+    def context(self):
+        self.stream = FlushCountingStream(tty=False)
+        self.reporter = cli.VerboseReporter(self.stream)
+        self.reporter.flush_interval = 3600
+        self.reporter.assertion_passed(lambda: None)
+        self.flushes_before = self.stream.flushes
+
+    def because_the_test_run_ends(self):
+        self.reporter.test_run_ended()
+
+    def it_should_flush_the_stream(self):
+        assert self.stream.flushes == self.flushes_before + 1
+
+
 class WhenPrintingVerboselyAndAnAssertionPasses(VerboseReporterSharedContext):
     def establish_assertion(self):
         self.assertion = lambda: None
@@ -1,8 +1,11 @@
 import collections
+import gc
 import os
 import tempfile
+import weakref
 import xml.etree.ElementTree as ET
 
+from contexts.plugin_interface import replaying_event
 from contexts.plugins.reporting import xml
 from .. import tools
 
@@ -304,3 +307,143 @@ class When_an_assertion_errors(XmlOutputContext):
     @property
     def test(self):
         return self.suite.find('testcase')
+
+
+class When_a_context_ends_before_the_end_of_the_run(XmlOutputContext):
+
+    def because_the_first_spec_finishes(self):
+        ctx = tools.create_context('When_a_context_finishes')
+        assertion = lambda: None
+        assertion.__name__ = 'it_should_be_written_out'
+
+        self.xml.context_started(ctx.cls)
+        self.xml.assertion_started(assertion)
+        self.xml.assertion_passed(assertion)
+        self.xml.context_ended(ctx.cls)
+        with open(self.filename, 'r') as f:
+            self.written_so_far = f.read()
+
+    def it_should_write_the_suite_to_the_file_straight_away(self):
+        assert('name="When a context finishes"' in self.written_so_far)
+        assert('name="it should be written out"' in self.written_so_far)
+
+    def it_should_forget_the_finished_spec(self):
+        assert(self.xml.ctx is None)
+
+
+class When_the_run_ends_after_several_contexts(XmlOutputContext):
+
+    def because_several_contexts_run(self):
+        for i in range(3):
+            ctx = tools.create_context('When_context_number_{}_runs'.format(i))
+            assertion = lambda: None
+            assertion.__name__ = 'it_should_pass'
+            self.xml.context_started(ctx.cls)
+            self.xml.assertion_started(assertion)
+            self.xml.assertion_passed(assertion)
+            self.xml.context_ended(ctx.cls)
+        self.xml.test_run_ended()
+
+    def it_should_include_every_suite(self):
+        assert(len(self.test_suites.findall('testsuite')) == 3)
+
+    def the_suites_element_should_report_the_total_number_of_tests(self):
+        assert(self.test_suites.get("tests") == "3")
+
+
+class When_a_context_reports_its_phase_timings(XmlOutputContext):
+
+    def because_a_timed_spec_runs(self):
+        ctx = tools.create_context('When_a_context_is_timed')
+        assertion = lambda: None
+        assertion.__name__ = 'it_should_pass'
+        self.xml.context_started(ctx.cls)
+        self.xml.assertion_started(assertion)
+        self.xml.assertion_passed(assertion)
+        self.xml.context_timed(ctx.cls, ctx.example, {
+            'setup': 1500000,
+            'action': 2000000000,
+            'assertions': 250,
+            'teardown': 0
+        })
+        self.xml.context_ended(ctx.cls)
+        self.xml.test_run_ended()
+
+    def it_should_list_the_phases_in_order(self):
+        assert([p.get('name') for p in self.properties] == ['setup_time', 'action_time', 'assertions_time', 'teardown_time'])
+
+    def it_should_give_the_times_in_seconds(self):
+        assert([p.get('value') for p in self.properties] == ['0.001500', '2.000000', '0.000000', '0.000000'])
+
+    def it_should_put_the_properties_before_the_testcases(self):
+        assert(self.test_suites.find('testsuite')[0].tag == 'properties')
+
+    @property
+    def properties(self):
+        return self.test_suites.find('testsuite').find('properties').findall('property')
+
+
+class When_a_replayed_context_is_reported(XmlOutputContext):
+
+    def because_the_events_are_replayed_some_time_after_they_happened(self):
+        ctx = tools.create_context('When_a_context_ran_elsewhere')
+        assertion = lambda: None
+        assertion.__name__ = 'it_should_pass'
+        with replaying_event(10 ** 9):
+            self.xml.context_started(ctx.cls)
+        with replaying_event(10 ** 9 + 10 ** 8):
+            self.xml.assertion_started(assertion)
+        with replaying_event(10 ** 9 + 3 * 10 ** 8):
+            self.xml.assertion_passed(assertion)
+            self.xml.context_ended(ctx.cls)
+        self.xml.test_run_ended()
+
+    def it_should_time_the_spec_from_the_recorded_event_times(self):
+        assert(self.test_suites.find('testsuite').get('time') == '0.30')
+
+    def it_should_time_the_assertion_from_the_recorded_event_times(self):
+        assert(self.test_suites.find('testsuite').find('testcase').get('time') == '0.20')
+
+
+class When_an_assertion_fails_with_a_real_exception(XmlOutputContext):
+
+    def given_an_exception_with_a_traceback(self):
+        try:
+            raise TrackableAssertionError("Gotcha")
+        except AssertionError as e:
+            self.exception_ref = weakref.ref(e)
+            exception = e
+        self.ctx = tools.create_context('When_a_test_fails')
+        self.assertion = lambda: None
+        self.assertion.__name__ = 'it_should_be_counted_as_a_failure'
+        self.xml.context_started(self.ctx.cls)
+        self.xml.assertion_started(self.assertion)
+        self.xml.assertion_failed(self.assertion, exception)
+        del exception
+
+    def because_the_run_ends(self):
+        gc.collect()
+        self.exception_survived = self.exception_ref() is not None
+        self.xml.context_ended(self.ctx.cls)
+        self.xml.test_run_ended()
+
+    def it_should_not_hold_on_to_the_exception(self):
+        assert(not self.exception_survived)
+
+    def it_should_include_the_message(self):
+        assert(self.failure.get("message") == "Gotcha")
+
+    def it_should_include_the_traceback(self):
+        assert('TrackableAssertionError: Gotcha' in self.failure.text)
+
+    def the_suites_element_should_report_one_failure(self):
+        assert(self.test_suites.get("failures") == "1")
+
+    @property
+    def failure(self):
+        return self.test_suites.find('testsuite').find('testcase').find('failure')
+
+
+class TrackableAssertionError(AssertionError):
+    # builtin exceptions can't be weakly referenced, but subclasses can
+    pass
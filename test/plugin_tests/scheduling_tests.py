@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import types
+from contexts.plugins.scheduling import DurationScheduler, Timings
+from .tools import ExceptionThrowingArgumentParser
+
+
+class SchedulerSharedContext:
+    def establish_that_there_is_a_timings_file(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'timings.json')
+
+        class Quick:
+            pass
+
+        class Slow:
+            pass
+
+        class Unknown:
+            pass
+        self.classes = [Quick, Slow, Unknown]
+        self.modules = [types.ModuleType('quick'), types.ModuleType('slow'), types.ModuleType('unknown')]
+
+        with open(self.path, 'w') as f:
+            json.dump({
+                'modules': {'quick': 0.1, 'slow': 5.0},
+                'classes': {Quick.__module__ + '.' + Quick.__qualname__: 0.1,
+                            Slow.__module__ + '.' + Slow.__qualname__: 5.0}
+            }, f)
+
+        self.scheduler = DurationScheduler()
+        parser = ExceptionThrowingArgumentParser()
+        self.scheduler.setup_parser(parser)
+        self.scheduler.initialise(parser.parse_args(['--timings', self.path]), {})
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenInitialisingDurationSchedulerWithoutATimingsFile:
+    def given_a_parser(self):
+        self.scheduler = DurationScheduler()
+        self.parser = ExceptionThrowingArgumentParser()
+        self.scheduler.setup_parser(self.parser)
+
+    def because_we_initialise_the_plugin(self):
+        self.result = self.scheduler.initialise(self.parser.parse_args([]), {})
+
+    def it_should_not_be_added_to_the_list(self):
+        assert not self.result
+
+
+class WhenSchedulingModulesWithRecordedTimings(SchedulerSharedContext):
+    def because_we_process_the_module_list(self):
+        self.scheduler.process_module_list(self.modules)
+
+    def it_should_put_the_modules_without_timings_first_and_then_the_slowest(self):
+        assert [m.__name__ for m in self.modules] == ['unknown', 'slow', 'quick']
+
+
+class WhenSchedulingClassesWithRecordedTimings(SchedulerSharedContext):
+    def because_we_process_the_class_list(self):
+        self.scheduler.process_class_list(None, self.classes)
+
+    def it_should_put_the_classes_without_timings_first_and_then_the_slowest(self):
+        assert [c.__name__ for c in self.classes] == ['Unknown', 'Slow', 'Quick']
+
+
+class WhenTheSchedulerTimesATestRun(SchedulerSharedContext):
+    def given_the_scheduler_has_timed_a_module_and_a_class(self):
+        self.scheduler.suite_started(self.modules[2])
+        self.scheduler.test_class_started(self.classes[2])
+        self.scheduler.test_class_ended(self.classes[2])
+        self.scheduler.suite_ended(self.modules[2])
+        self.scheduler.record_timings(Timings({'from_a_worker': 2.0}, {}))
+
+    def because_the_test_run_ends(self):
+        self.scheduler.test_run_ended()
+
+    def it_should_save_the_new_module_timing(self):
+        assert 'unknown' in Timings.load(self.path).modules
+
+    def it_should_save_the_new_class_timing(self):
+        classes = Timings.load(self.path).classes
+        assert self.classes[2].__module__ + '.' + self.classes[2].__qualname__ in classes
+
+    def it_should_save_the_timings_recorded_elsewhere(self):
+        assert Timings.load(self.path).modules['from_a_worker'] == 2.0
+
+    def it_should_keep_the_old_timings(self):
+        assert Timings.load(self.path).modules['slow'] == 5.0
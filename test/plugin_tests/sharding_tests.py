@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+import types
+from contexts.plugins.sharding import ShardSelector
+from contexts.plugins.scheduling import DurationScheduler
+from .tools import ExceptionThrowingArgumentParser
+
+
+def make_classes(names):
+    return [type(name, (), {}) for name in names]
+
+
+def initialise_shard_selector(*args):
+    plugin = ShardSelector()
+    parser = ExceptionThrowingArgumentParser()
+    plugin.setup_parser(parser)
+    DurationScheduler().setup_parser(parser)
+    result = plugin.initialise(parser.parse_args(list(args)), {})
+    return plugin, result
+
+
+class WhenInitialisingShardSelectorWithoutAShard:
+    def because_we_initialise_the_plugin(self):
+        self.plugin, self.result = initialise_shard_selector()
+
+    def it_should_not_be_added_to_the_list(self):
+        assert not self.result
+
+
+class WhenInitialisingShardSelectorWithAShard:
+    def because_we_initialise_the_plugin(self):
+        self.plugin, self.result = initialise_shard_selector('--shard', '2/3')
+
+    def it_should_be_added_to_the_list(self):
+        assert self.result
+
+    def it_should_count_shards_from_zero(self):
+        assert (self.plugin.index, self.plugin.count) == (1, 3)
+
+
+class WhenInitialisingShardSelectorWithAShardOutOfRange:
+    def because_we_initialise_the_plugin(self):
+        try:
+            initialise_shard_selector('--shard', '4/3')
+        except Exception as e:
+            self.exception = e
+
+    def it_should_complain(self):
+        assert 'not between 1 and 3' in str(self.exception)
+
+
+class WhenShardingByDurationWithoutTimings:
+    def because_we_initialise_the_plugin(self):
+        try:
+            initialise_shard_selector('--shard', '1/2', '--shard-by', 'duration')
+        except ValueError as e:
+            self.exception = e
+
+    def it_should_complain(self):
+        assert '--timings' in str(self.exception)
+
+
+class WhenShardingClassesByHash:
+    def given_a_class_list_and_a_shard_selector_for_each_shard(self):
+        self.classes = make_classes(['Class' + str(i) for i in range(50)])
+        self.plugins = [initialise_shard_selector('--shard', '{}/3'.format(i))[0] for i in (1, 2, 3)]
+
+    def because_each_shard_processes_the_class_list(self):
+        self.shards = []
+        for plugin in self.plugins:
+            classes = self.classes.copy()
+            plugin.process_class_list(None, classes)
+            self.shards.append(classes)
+
+    def it_should_run_every_class_in_exactly_one_shard(self):
+        assert sorted(c.__name__ for shard in self.shards for c in shard) == sorted(c.__name__ for c in self.classes)
+
+    def it_should_not_leave_any_shard_empty(self):
+        assert all(self.shards)
+
+    def it_should_give_the_same_answer_every_time(self):
+        classes = self.classes.copy()
+        self.plugins[0].process_class_list(None, classes)
+        assert classes == self.shards[0]
+
+
+class WhenShardingClassesByDuration:
+    def given_recorded_timings_and_a_shard_selector_for_each_shard(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tempdir.name, 'timings.json')
+        self.classes = make_classes(['Slow', 'Medium', 'Quick', 'AlsoQuick'])
+        timings = dict(zip([c.__module__ + '.' + c.__qualname__ for c in self.classes], [10.0, 6.0, 5.0, 2.0]))
+        with open(path, 'w') as f:
+            json.dump({'classes': timings}, f)
+
+        self.suites = [types.SimpleNamespace(classes=self.classes[:2]), types.SimpleNamespace(classes=self.classes[2:])]
+        self.plugin = initialise_shard_selector('--shard', '2/2', '--shard-by', 'duration', '--timings', path)[0]
+
+    def because_the_shard_selector_chooses_its_suites(self):
+        self.plugin.process_class_list(None, self.suites[0].classes)
+        self.plugin.run_suites(self.suites)
+
+    def it_should_keep_only_the_classes_in_its_shard(self):
+        assert [c.__name__ for s in self.suites for c in s.classes] == ['Medium', 'Quick']
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenShardingByDurationAClassWhichIsInTwoModules:
+    def given_a_class_imported_into_two_suites_and_a_shard_selector_for_each_shard(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tempdir.name, 'timings.json')
+        self.shared, self.first, self.second = make_classes(['Shared', 'First', 'Second'])
+        timings = {c.__module__ + '.' + c.__qualname__: t for c, t in [(self.shared, 6.0), (self.first, 5.0), (self.second, 5.0)]}
+        with open(path, 'w') as f:
+            json.dump({'classes': timings}, f)
+        self.plugins = [initialise_shard_selector('--shard', '{}/2'.format(i), '--shard-by', 'duration', '--timings', path)[0] for i in (1, 2)]
+
+    def because_each_shard_chooses_its_suites(self):
+        self.shards = []
+        for plugin in self.plugins:
+            suites = [types.SimpleNamespace(classes=[self.shared, self.first]), types.SimpleNamespace(classes=[self.shared, self.second])]
+            plugin.run_suites(suites)
+            self.shards.append([c for s in suites for c in s.classes])
+
+    def it_should_put_the_class_in_only_one_shard(self):
+        assert self.shards[0] == [self.shared, self.shared]
+
+    def it_should_only_count_its_duration_once(self):
+        assert self.shards[1] == [self.first, self.second]
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenAShardHasNoClassesInAModule:
+    def given_suites_with_and_without_classes(self):
+        self.suites = [types.SimpleNamespace(classes=[]), types.SimpleNamespace(classes=make_classes(['Class']))]
+        self.plugin = initialise_shard_selector('--shard', '1/2')[0]
+
+    def because_the_shard_selector_chooses_its_suites(self):
+        self.plugin.run_suites(self.suites)
+
+    def it_should_not_run_the_empty_module(self):
+        assert len(self.suites) == 1 and self.suites[0].classes
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+from contexts import discovery
+from contexts.plugin_interface import TEST_FOLDER, TEST_FILE
+from contexts.plugins.walking import ThreadedWalker
+from .tools import ExceptionThrowingArgumentParser
+
+
+class FakeIdentifiers(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.asked = []
+
+    def identify_folder(self, folder):
+        with self.lock:
+            self.asked.append(folder)
+        if os.path.basename(folder) != 'not_tests':
+            return TEST_FOLDER
+
+    def identify_file(self, file):
+        with self.lock:
+            self.asked.append(file)
+        return TEST_FILE
+
+
+class WhenInitialisingThreadedWalkerWithoutAThreadCount:
+    def given_a_parser(self):
+        self.plugin = ThreadedWalker()
+        self.parser = ExceptionThrowingArgumentParser()
+        self.plugin.setup_parser(self.parser)
+
+    def because_we_initialise_the_plugin(self):
+        self.result = self.plugin.initialise(self.parser.parse_args([]), {})
+
+    def it_should_not_be_added_to_the_list(self):
+        assert not self.result
+
+
+class WhenScanningAFolderTreeOnSeveralThreads:
+    def establish_that_there_is_a_tree_of_folders(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = self.tempdir.name
+        for folder in ['a', os.path.join('a', 'b'), os.path.join('a', 'b', 'c'), 'd', 'not_tests']:
+            os.mkdir(os.path.join(self.root, folder))
+            for filename in ['test_one.py', 'test_two.py']:
+                with open(os.path.join(self.root, folder, filename), 'w') as f:
+                    f.write('')
+        self.not_tests = os.path.join(self.root, 'not_tests')
+
+        parser = ExceptionThrowingArgumentParser()
+        self.plugin = ThreadedWalker()
+        self.plugin.setup_parser(parser)
+        self.plugin.initialise(parser.parse_args(['--discovery-threads', '4']), {})
+
+        self.identifiers = FakeIdentifiers()
+        self.directories = discovery.DirectoryCache(self.identifiers)
+
+    def because_we_scan_the_folder_before_walking_the_tree(self):
+        self.plugin.scan_folder(self.root, self.directories)
+        self.asked_while_scanning = list(self.identifiers.asked)
+        self.walked = [(folder, self.directories.test_files(folder))
+                       for folder in discovery.walk(self.root, self.directories)]
+
+    def it_should_read_every_test_folder(self):
+        expected = [os.path.join(self.root, f) for f in ['a', os.path.join('a', 'b'), os.path.join('a', 'b', 'c'), 'd']]
+        for folder in expected:
+            assert folder in self.directories.listings
+
+    def it_should_not_read_the_folder_which_is_not_a_test_folder(self):
+        assert self.not_tests not in self.directories.listings
+
+    def it_should_not_ask_the_plugins_anything_while_walking(self):
+        assert self.identifiers.asked == self.asked_while_scanning
+
+    def it_should_only_ask_about_each_thing_once(self):
+        assert len(self.identifiers.asked) == len(set(self.identifiers.asked))
+
+    def it_should_walk_the_folders_in_the_same_order_as_without_threads(self):
+        sequential = discovery.DirectoryCache(FakeIdentifiers())
+        assert self.walked == [(folder, sequential.test_files(folder))
+                               for folder in discovery.walk(self.root, sequential)]
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()
+
+
+class WhenWalkingATreeContainingAFolderWhichCannotBeRead:
+    def establish_that_one_of_the_folders_is_unreadable(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = self.tempdir.name
+        for folder in ['readable', 'unreadable']:
+            os.mkdir(os.path.join(self.root, folder))
+            with open(os.path.join(self.root, folder, 'test_one.py'), 'w') as f:
+                f.write('')
+        self.unreadable = os.path.join(self.root, 'unreadable')
+        self.directories = discovery.DirectoryCache(FakeIdentifiers())
+
+    def because_we_walk_the_tree(self):
+        # a chmod wouldn't stop the tests from reading the folder when they're run as root
+        scandir = os.scandir
+
+        def fake_scandir(path):
+            if path == self.unreadable:
+                raise PermissionError(13, 'Permission denied', path)
+            return scandir(path)
+
+        with mock.patch('os.scandir', fake_scandir):
+            self.walked = [(folder, self.directories.test_files(folder))
+                           for folder in discovery.walk(self.root, self.directories)]
+
+    def it_should_treat_the_unreadable_folder_as_empty(self):
+        assert (self.unreadable, []) in self.walked
+
+    def it_should_still_find_the_tests_in_the_other_folders(self):
+        assert (os.path.join(self.root, 'readable'), ['test_one.py']) in self.walked
+
+    def cleanup_the_tempdir(self):
+        self.tempdir.cleanup()